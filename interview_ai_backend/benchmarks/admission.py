@@ -0,0 +1,147 @@
+"""Show how admission control keeps interview turns fast while analyze-job calls flood in.
+
+Usage: ``python -m benchmarks.admission [--duration 15] [--flood-rps 40] [--interviews 8]``
+
+A local ``tools.fake_llm_server`` serves at most ``--provider-capacity``
+calls at once and queues the rest, like a provider at its rate limit. For
+``--duration`` seconds one client sends ``--flood-rps`` new analyze-job
+requests per second, open loop. Meanwhile ``--interviews`` candidates, each
+with their own client id, answer questions back to back. The same load runs
+with admission control off, then with ``--max-inflight`` slots. For
+evaluate-answer the table lists latency percentiles and how many answers got
+deterministic feedback. For analyze-job it lists completed and shed (503)
+counts.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Dict, List
+
+from tools.fake_llm_server import FakeLLMConfig, FakeLLMServer, LatencyModel
+
+_JOB_ANALYSIS = {
+    "skills": ["Python", "Kubernetes"],
+    "responsibilities": ["Operate payment APIs"],
+    "competencies": ["Ownership"],
+    "values": ["Candor"],
+    "themes": ["Reliability"],
+    "summary": "Backend engineer for payments.",
+}
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _run(app: Any, args: argparse.Namespace, label: str) -> Dict[str, Any]:
+    import httpx
+
+    result: Dict[str, Any] = {"label": label, "eval": [], "degraded": 0, "analysis": {}}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        stop_at = time.perf_counter() + args.duration
+
+        async def _candidate(index: int) -> None:
+            headers = {"X-Client-Id": f"candidate-{index}"}
+            response = await client.post(
+                "/api/start-interview",
+                json={"mode": "behavioral", "job_analysis": _JOB_ANALYSIS, "include_job_analysis": False},
+                headers=headers,
+            )
+            session_id = response.json()["session_id"]
+            turn = 0
+            while time.perf_counter() < stop_at:
+                turn += 1
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/evaluate-answer",
+                    json={
+                        "session_id": session_id,
+                        "question": "Tell me about a migration you led.",
+                        "answer": f"Candidate {index} turn {turn}: I moved billing and cut errors by {turn}%.",
+                    },
+                    headers=headers,
+                )
+                result["eval"].append(time.perf_counter() - started)
+                body = response.json()
+                if response.status_code != 200 or body.get("provisional"):
+                    result["degraded"] += 1
+
+        async def _analysis(index: int) -> None:
+            response = await client.post(
+                "/api/analyze-job",
+                json={"job_description": f"Posting {index}: senior backend engineer for payments. " * 4},
+                headers={"X-Client-Id": "bulk-importer"},
+            )
+            result["analysis"][response.status_code] = result["analysis"].get(response.status_code, 0) + 1
+
+        flood: List["asyncio.Task[None]"] = []
+
+        async def _flood() -> None:
+            index = 0
+            while time.perf_counter() < stop_at:
+                flood.append(asyncio.create_task(_analysis(index)))
+                index += 1
+                await asyncio.sleep(1 / args.flood_rps)
+
+        await asyncio.gather(_flood(), *(_candidate(index) for index in range(args.interviews)))
+        await asyncio.gather(*flood)
+    return result
+
+
+async def _bench(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from main import create_app
+    from routers import interview
+
+    app = create_app()
+    results = []
+    for label, slots in (("off", 0), (f"{args.max_inflight} slots", args.max_inflight)):
+        interview.admission.max_inflight = slots
+        results.append(await _run(app, args, label))
+    await interview.llm_client.aclose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--flood-rps", type=float, default=40.0)
+    parser.add_argument("--interviews", type=int, default=8)
+    parser.add_argument("--max-inflight", type=int, default=16)
+    parser.add_argument("--provider-capacity", type=int, default=16)
+    parser.add_argument("--latency", default="lognormal:0.4,0.3", help="Fake LLM latency model")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(
+        FakeLLMConfig(latency=LatencyModel.parse(args.latency), max_concurrency=args.provider_capacity)
+    ).start()
+    os.environ.update(
+        OPENAI_API_KEY="fake-key",
+        LLM_BASE_URL=server.base_url,
+        TRANSCRIPT_LOG_PATH="",
+        TRACE_LOG="0",
+        ANSWER_CACHE_MAX_ENTRIES="0",  # every turn must reach the LLM
+    )
+    try:
+        results = asyncio.run(_bench(args))
+    finally:
+        server.stop()
+
+    print(f"{'admission':<10} {'eval p50':>9} {'eval p99':>9} {'turns':>6} {'degraded':>9} {'jobs ok':>8} {'shed':>6}")
+    for result in results:
+        latencies = result["eval"]
+        print(
+            f"{result['label']:<10} {_percentile(latencies, 50) * 1000:>9.0f} "
+            f"{_percentile(latencies, 99) * 1000:>9.0f} {len(latencies):>6} {result['degraded']:>9} "
+            f"{result['analysis'].get(200, 0):>8} {result['analysis'].get(503, 0):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
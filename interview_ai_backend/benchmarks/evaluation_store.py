@@ -0,0 +1,124 @@
+"""Time chunked appends and aggregate queries on the columnar evaluation store.
+
+Usage: ``python -m benchmarks.evaluation_store [--rows 10000000] [--json-rows 200000]``
+
+``--rows`` synthetic evaluations are appended in ``--chunk-rows`` chunks,
+spread over ``--jobs`` job analyses with themes drawn from a fixed pool and
+over 90 days of timestamps. Each aggregate query then runs ``--repeat``
+times and the median is reported. These are the cohort-dashboard queries:
+overall, by mode, by bank question, by theme and the last week by mode. As a
+baseline, ``--json-rows`` rows are written as JSON lines and grouped by mode
+in Python. That time is scaled linearly to ``--rows``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from services.evaluation_store import COLUMNS, MODES, EvaluationStore
+from services.interning import QUESTION_BANK
+
+_THEMES = [
+    "Reliability at scale", "Payments", "Developer experience", "Data pipelines", "Security",
+    "Customer empathy", "Mentoring", "Cost efficiency", "Experimentation", "Mobile",
+    "Machine learning", "Compliance", "Growth", "Platform migration", "Observability",
+]
+_DAY = 24 * 60 * 60
+
+
+def _synthetic(rows: int, jobs: np.ndarray, rng: np.random.Generator, now: float) -> Dict[str, np.ndarray]:
+    modes = rng.integers(0, len(MODES), rows, dtype=np.uint8)
+    question_ids = rng.integers(0, len(QUESTION_BANK), rows).astype(np.int16)
+    question_ids[modes == MODES.index("role")] = -1
+    return {
+        "score": rng.choice(np.arange(1, 6, dtype=np.uint8), rows, p=[0.05, 0.15, 0.35, 0.3, 0.15]),
+        "mode": modes,
+        "question_id": question_ids,
+        "job_hash": jobs[rng.integers(0, len(jobs), rows)],
+        "timestamp": now - rng.random(rows) * 90 * _DAY,
+    }
+
+
+def _median_time(function: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def _json_baseline(path: str, columns: Dict[str, np.ndarray]) -> float:
+    """Seconds to group scores by mode from row-oriented JSON lines."""
+
+    with open(path, "w", encoding="utf-8") as handle:
+        for row in zip(*(columns[name].tolist() for name in COLUMNS)):
+            handle.write(json.dumps(dict(zip(COLUMNS, row))) + "\n")
+    started = time.perf_counter()
+    groups: Dict[int, List[int]] = defaultdict(list)
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            record = json.loads(line)
+            groups[record["mode"]].append(record["score"])
+    for scores in groups.values():
+        scores.sort()
+        statistics.fmean(scores)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--json-rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    now = time.time()
+    jobs = np.unique(rng.integers(1, 2**63, args.jobs, dtype=np.uint64))
+    themes = {int(hashed): list(rng.choice(_THEMES, 3, replace=False)) for hashed in jobs}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EvaluationStore(os.path.join(tmp, "store"))
+        append_seconds = 0.0
+        for start in range(0, args.rows, args.chunk_rows):
+            chunk = _synthetic(min(args.chunk_rows, args.rows - start), jobs, rng, now)
+            started = time.perf_counter()
+            store.append(chunk, jobs=themes)
+            append_seconds += time.perf_counter() - started
+        disk = sum(entry.stat().st_size for entry in os.scandir(store.directory))
+
+        print(f"rows: {len(store):,}  on disk: {disk / 2**20:.1f} MiB")
+        print(f"append: {append_seconds:.2f}s ({args.rows / append_seconds / 1e6:.1f}M rows/s)")
+        print(f"{'query':<26} {'median ms':>10} {'groups':>7}")
+        queries = {
+            "overall": lambda: store.aggregate(),
+            "by mode": lambda: store.aggregate("mode"),
+            "by question": lambda: store.aggregate("question"),
+            "by theme": lambda: store.aggregate("theme"),
+            "last 7 days by mode": lambda: store.aggregate("mode", since=now - 7 * _DAY),
+            "role, by theme": lambda: store.aggregate("theme", mode="role"),
+        }
+        for name, query in queries.items():
+            seconds = _median_time(query, args.repeat)
+            print(f"{name:<26} {seconds * 1000:>10.1f} {len(query()['groups']):>7}")
+
+        if args.json_rows:
+            sample = _synthetic(args.json_rows, jobs, rng, now)
+            seconds = _json_baseline(os.path.join(tmp, "rows.jsonl"), sample) * args.rows / args.json_rows
+            print(f"{'JSONL by mode (scaled)':<26} {seconds * 1000:>10.1f} {len(MODES):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare single-shot and map-reduce job analysis across description sizes.
+
+Usage: ``python -m benchmarks.job_analysis_mapreduce [--sizes-kb 4,16,64,256]``
+
+Runs against a local ``tools.fake_llm_server`` whose latency grows with prompt
+length (``--prompt-latency`` seconds per 1k prompt tokens on top of
+``--latency``), which is what makes one huge prompt slow in practice. Each
+size is analyzed ``--repeat`` times per strategy and the median wall time is
+reported alongside the number of LLM calls.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+from benchmarks.job_analyzer import build_description
+from services import prompts
+from services.job_mapreduce import MapReduceConfig, analyze_in_chunks, chunk_description
+from tools.fake_llm_server import FakeLLMConfig, FakeLLMServer, LatencyModel
+
+
+async def _run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from services.llm_client import LLMClient
+
+    client = LLMClient()
+    config = MapReduceConfig(
+        threshold_chars=0, chunk_chars=args.chunk_chars, max_chunks=args.max_chunks, concurrency=args.concurrency
+    )
+
+    async def single(text: str) -> Dict[str, Any]:
+        return await client.request_json(prompts.build_job_analysis_prompt(text), prompt_type="job_analysis")
+
+    async def chunk(text: str, index: int, total: int) -> Dict[str, Any]:
+        prompt = prompts.build_job_analysis_chunk_prompt(text, index, total)
+        return await client.request_json(prompt, prompt_type="job_analysis_chunk")
+
+    rows = []
+    try:
+        for size_kb in args.sizes_kb:
+            text = build_description(size_kb)
+            timings: Dict[str, List[float]] = {"single": [], "mapreduce": []}
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                await single(text)
+                timings["single"].append(time.perf_counter() - started)
+                started = time.perf_counter()
+                await analyze_in_chunks(text, chunk, config)
+                timings["mapreduce"].append(time.perf_counter() - started)
+            rows.append(
+                {
+                    "size_kb": size_kb,
+                    "chunks": len(chunk_description(text, config.chunk_chars, config.max_chunks)),
+                    "single_ms": statistics.median(timings["single"]) * 1000,
+                    "mapreduce_ms": statistics.median(timings["mapreduce"]) * 1000,
+                }
+            )
+    finally:
+        await client.aclose()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Job analysis map-reduce benchmark")
+    parser.add_argument("--sizes-kb", default="4,16,64,256", type=lambda raw: [int(part) for part in raw.split(",")])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", default="fixed:0.3", help="Base fake LLM latency spec")
+    parser.add_argument("--prompt-latency", type=float, default=0.05, help="Fake seconds per 1k prompt tokens")
+    parser.add_argument("--chunk-chars", type=int, default=MapReduceConfig.chunk_chars)
+    parser.add_argument("--max-chunks", type=int, default=MapReduceConfig.max_chunks)
+    parser.add_argument("--concurrency", type=int, default=MapReduceConfig.concurrency)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(
+        FakeLLMConfig(latency=LatencyModel.parse(args.latency), prompt_latency_per_1k_tokens=args.prompt_latency)
+    ).start()
+    os.environ["OPENAI_API_KEY"] = "fake-key"
+    os.environ["LLM_BASE_URL"] = server.base_url
+    try:
+        rows = asyncio.run(_run(args))
+    finally:
+        server.stop()
+
+    print(f"{'size KB':>8}{'chunks':>8}{'single ms':>12}{'map-reduce ms':>15}")
+    for row in rows:
+        print(f"{row['size_kb']:>8}{row['chunks']:>8}{row['single_ms']:>12.0f}{row['mapreduce_ms']:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Time the local job analyzer against the original fallback implementation.
+
+Usage: ``python -m benchmarks.job_analyzer [--size-kb 100] [--repeat 20]``
+
+A synthetic posting of roughly ``--size-kb`` kilobytes is assembled from the
+bundled background corpus plus role-specific bullets, then each implementation
+analyzes it ``--repeat`` times. The legacy variant is a verbatim copy of the
+pre-engine fallback (list-based de-duplication, inline regexes) and is skipped
+above ``--legacy-max-kb`` because its cost grows quadratically.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from services.job_analyzer import JobAnalyzer, _load_corpus
+
+_ROLE_LINES = [
+    "- Design and operate Kubernetes clusters running Python and Go microservices",
+    "- Own observability with Prometheus, Grafana and OpenTelemetry",
+    "- Build streaming pipelines on Kafka and Flink feeding PostgreSQL",
+    "- Lead incident reviews and mentor engineers on reliability practices",
+    "- Partner with product on roadmap, capacity planning and SLOs",
+]
+
+
+def legacy_extract_keywords(text: str) -> List[str]:
+    tokens = re.findall(r"[A-Za-z][A-Za-z+]{3,}", text)
+    unique: List[str] = []
+    for token in tokens:
+        word = token.capitalize()
+        if word not in unique:
+            unique.append(word)
+    return unique
+
+
+def legacy_analyze(job_description: str) -> Dict[str, Any]:
+    lines = [line.strip("•- ").strip() for line in job_description.splitlines() if line.strip()]
+    sentences = [segment.strip() for segment in re.split(r"[.\\n]", job_description) if segment.strip()]
+
+    keywords = legacy_extract_keywords(job_description)
+    skills = keywords[:6]
+    responsibilities = lines[:6] or sentences[:6]
+
+    competencies = [kw for kw in keywords if kw.lower().endswith(("ship", "ment"))][:4]
+    if len(competencies) < 2:
+        competencies.extend([kw for kw in keywords if kw not in competencies][: (4 - len(competencies))])
+
+    values = [phrase for phrase in lines if any(word in phrase.lower() for word in ["value", "culture", "mission"])]
+    if not values:
+        values = [f"Emphasis on {kw.lower()} excellence" for kw in keywords[:2]]
+
+    themes = [kw for kw in keywords if kw.lower() not in {k.lower() for k in skills}][:3]
+    summary = sentences[0] if sentences else "Review the full job description for details."
+
+    return {
+        "skills": skills,
+        "responsibilities": responsibilities,
+        "competencies": competencies,
+        "values": values,
+        "themes": themes,
+        "summary": summary,
+    }
+
+
+def _letters(number: int) -> str:
+    # The tokenizer only keeps letters, so unique identifiers are spelled in base 26.
+    digits = []
+    while number:
+        number, remainder = divmod(number, 26)
+        digits.append(chr(ord("a") + remainder))
+    return "".join(digits)
+
+
+def build_description(size_kb: int, seed: int = 7) -> str:
+    """Assemble a posting of about ``size_kb`` KB with a realistic long-tail vocabulary."""
+
+    rng = random.Random(seed)
+    paragraphs = _load_corpus()
+    parts = ["Staff Platform Engineer", *_ROLE_LINES]
+    length = sum(len(part) + 1 for part in parts)
+    counter = 0
+    while length < size_kb * 1024:
+        counter += 1
+        words = rng.choice(paragraphs).split()
+        rng.shuffle(words)
+        # Sprinkle unique identifiers so the vocabulary keeps growing like real pasted text.
+        words.insert(rng.randrange(len(words)), "Vendor" + _letters(counter))
+        line = " ".join(words) + "."
+        parts.append(line)
+        length += len(line) + 1
+    return "\n".join(parts)
+
+
+def _time(function: Callable[[str], Any], text: str, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(text)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Job analyzer benchmark")
+    parser.add_argument("--size-kb", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--legacy-max-kb", type=int, default=400)
+    args = parser.parse_args()
+
+    text = build_description(args.size_kb)
+    started = time.perf_counter()
+    analyzer = JobAnalyzer()
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"description: {len(text) / 1024:.1f} KB, analyzer built in {build_ms:.1f} ms")
+
+    variants = [("engine", analyzer.analyze)]
+    if args.size_kb <= args.legacy_max_kb:
+        variants.append(("legacy", legacy_analyze))
+    for name, function in variants:
+        samples = _time(function, text, args.repeat)
+        print(
+            f"{name:<8} median {statistics.median(samples):8.2f} ms  "
+            f"min {min(samples):8.2f} ms  max {max(samples):8.2f} ms"
+        )
+
+    print("top skills:", ", ".join(analyzer.analyze(text)["skills"]))
+
+
+if __name__ == "__main__":
+    main()
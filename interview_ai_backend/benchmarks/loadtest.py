@@ -0,0 +1,226 @@
+"""Drive realistic interview flows and report per-endpoint throughput and latency.
+
+Usage::
+
+    python -m benchmarks.loadtest --users 50 --duration 30
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --users 20
+
+Without ``--base-url`` the FastAPI app runs in-process behind an ASGI
+transport and, unless ``--no-fake-llm`` is given, LLM calls go to a local
+``tools.fake_llm_server`` instance so no tokens are spent. Each virtual user
+loops: analyze a job, start an interview in a random mode, then answer a few
+questions. ``--json`` writes the summary for tracking across changes and
+``--max-p99-ms`` turns the run into a pass/fail regression gate.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+_JOB_TEMPLATES = [
+    "Senior Backend Engineer\nWe are hiring an engineer to build Python APIs with FastAPI.\n"
+    "- Own service reliability and on-call\n- Design distributed systems\n- Mentor teammates\n"
+    "Our values: customer obsession, ownership and a culture of learning.",
+    "Product Manager, Growth\nLead experiments that grow activation and retention.\n"
+    "- Partner with design and engineering\n- Define roadmap and success metrics\n"
+    "Mission: make hiring fair for everyone.",
+    "Data Scientist\nBuild forecasting models and self-serve analytics.\n"
+    "- SQL, Python and experimentation\n- Communicate insights to leadership\n"
+    "We value curiosity, rigor and collaboration.",
+]
+
+_ANSWER = (
+    "In my last role our checkout service started timing out during a holiday launch. "
+    "I owned the incident, added caching in front of the pricing service, shed non-critical load "
+    "and coordinated with the payments team. As a result latency fell by 60 percent within an hour "
+    "and we processed record revenue that weekend."
+)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[rank]
+
+
+class Recorder:
+    """Collects per-endpoint latencies and errors."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, name: str, path: str, payload: Dict[str, Any]) -> Optional[Any]:
+        started = time.perf_counter()
+        try:
+            response = await client.post(path, json=payload)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append(elapsed)
+        return response.json()
+
+    def summary(self, wall_seconds: float) -> Dict[str, Dict[str, float]]:
+        report: Dict[str, Dict[str, float]] = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            samples = self.latencies.get(name, [])
+            report[name] = {
+                "requests": len(samples),
+                "errors": self.errors.get(name, 0),
+                "throughput_rps": len(samples) / wall_seconds if wall_seconds else 0.0,
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+            }
+        return report
+
+
+async def _user_flow(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    rng: random.Random,
+    stop_at: float,
+    turns: int,
+    job_variants: int,
+) -> None:
+    while time.perf_counter() < stop_at:
+        variant = rng.randrange(job_variants)
+        description = f"{_JOB_TEMPLATES[variant % len(_JOB_TEMPLATES)]}\nPosting #{variant}"
+        analysis = await recorder.call(client, "analyze-job", "/api/analyze-job", {"job_description": description})
+        if analysis is None:
+            continue
+
+        mode = rng.choice(["behavioral", "general", "role"])
+        started = await recorder.call(
+            client,
+            "start-interview",
+            "/api/start-interview",
+            {"mode": mode, "analysis_id": analysis["analysis_id"], "include_job_analysis": False},
+        )
+        if started is None:
+            continue
+
+        question = started["question"]
+        for _ in range(turns):
+            if time.perf_counter() >= stop_at:
+                break
+            feedback = await recorder.call(
+                client,
+                "evaluate-answer",
+                "/api/evaluate-answer",
+                {"session_id": started["session_id"], "question": question, "answer": _ANSWER},
+            )
+            if feedback is None:
+                break
+            question = feedback["next_question"]
+
+
+async def run_load(
+    client: httpx.AsyncClient, *, users: int, duration: float, turns: int, job_variants: int, seed: int
+) -> Dict[str, Any]:
+    recorder = Recorder()
+    started = time.perf_counter()
+    stop_at = started + duration
+    await asyncio.gather(
+        *(
+            _user_flow(client, recorder, random.Random(seed + index), stop_at, turns, job_variants)
+            for index in range(users)
+        )
+    )
+    wall = time.perf_counter() - started
+    return {"users": users, "duration_seconds": wall, "endpoints": recorder.summary(wall)}
+
+
+def _print_report(result: Dict[str, Any]) -> None:
+    print(f"{result['users']} users for {result['duration_seconds']:.1f}s")
+    print(f"{'endpoint':<18}{'reqs':>8}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in result["endpoints"].items():
+        print(
+            f"{name:<18}{stats['requests']:>8}{stats['errors']:>8}{stats['throughput_rps']:>9.1f}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    fake_server = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    else:
+        if not args.no_fake_llm:
+            from tools.fake_llm_server import FakeLLMConfig, FakeLLMServer, LatencyModel
+
+            fake_server = FakeLLMServer(
+                FakeLLMConfig(
+                    latency=LatencyModel.parse(args.llm_latency), error_rate=args.llm_error_rate, seed=args.seed
+                )
+            ).start()
+            os.environ["OPENAI_API_KEY"] = "fake-key"
+            os.environ["LLM_BASE_URL"] = fake_server.base_url
+        # Import after the environment is prepared: the router builds its LLM client at import.
+        from main import create_app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_app()), base_url="http://loadtest", timeout=args.timeout
+        )
+
+    try:
+        async with client:
+            return await run_load(
+                client,
+                users=args.users,
+                duration=args.duration,
+                turns=args.turns,
+                job_variants=args.job_variants,
+                seed=args.seed,
+            )
+    finally:
+        if fake_server is not None:
+            fake_server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Interview AI load generator")
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--turns", type=int, default=3, help="Answers per interview")
+    parser.add_argument("--job-variants", type=int, default=10, help="Distinct job descriptions in rotation")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-fake-llm", action="store_true", help="Use the configured LLM (or fallbacks)")
+    parser.add_argument("--llm-latency", default="lognormal:0.3,0.4")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="Write the summary to this path")
+    parser.add_argument("--max-p99-ms", type=float, help="Exit non-zero if any endpoint's p99 exceeds this")
+    args = parser.parse_args()
+
+    result = asyncio.run(_main(args))
+    _print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+
+    if args.max_p99_ms is not None:
+        slow = [name for name, stats in result["endpoints"].items() if stats["p99_ms"] > args.max_p99_ms]
+        if slow:
+            print(f"p99 above {args.max_p99_ms} ms for: {', '.join(slow)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Measure token and latency savings from budgeted STAR-evaluation prompts.
+
+Usage: ``python -m benchmarks.prompt_budget [--answer-words 300,1000,3000]``
+
+Each synthetic answer is evaluated ``--repeat`` times with the token budget
+disabled and with ``--budget`` tokens, against a local
+``tools.fake_llm_server`` whose latency grows by ``--prompt-latency`` seconds
+per 1k prompt tokens. The table lists the local token estimate, the prompt
+tokens the server reported, the median call latency and the time spent
+building the prompt.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from models.job_models import JobAnalysisResult
+from services import prompts
+from tools.fake_llm_server import FakeLLMConfig, FakeLLMServer, LatencyModel
+
+JOB_ANALYSIS = JobAnalysisResult(
+    skills=["Python", "Go", "Kubernetes", "AWS", "Terraform", "PostgreSQL", "Kafka", "gRPC", "Redis", "Spark"],
+    responsibilities=[
+        "Design and operate payment APIs",
+        "Lead incident response and postmortems",
+        "Own the billing platform migration",
+        "Mentor engineers on reliability practices",
+        "Improve observability across services",
+        "Partner with product on roadmap trade-offs",
+    ],
+    competencies=["Ownership", "Clear communication", "Systems thinking", "Bias for action", "Mentoring"],
+    values=["Customer obsession", "Craft", "Candor", "Frugality"],
+    themes=["Reliability at scale", "Payments", "Developer experience", "Data pipelines"],
+    summary="Senior backend engineer owning reliability of the payments platform.",
+)
+QUESTION = "Tell me about a time you led a risky migration. How did you keep customers safe?"
+
+_SUBJECTS = ["the billing service", "our ledger database", "the payments queue", "the on-call team", "the dashboard"]
+_VERBS = ["migrated", "rebuilt", "measured", "split", "load tested", "rolled back", "documented", "reviewed"]
+_FILLER = [
+    "At the time there was a lot going on across the organisation and priorities shifted often.",
+    "I remember the conversations with stakeholders were long and sometimes went in circles.",
+    "We also had a few people on vacation which made scheduling harder than expected.",
+    "Looking back there were many small details that I have not mentioned yet.",
+]
+
+
+def build_answer(words: int, seed: int = 7) -> str:
+    """A rambling STAR-ish answer of roughly ``words`` words with figures sprinkled in."""
+
+    rng = random.Random(seed)
+    sentences = ["Last year I was the tech lead when we had to move billing off a legacy database."]
+    count = len(sentences[0].split())
+    while count < words:
+        if rng.random() < 0.35:
+            sentence = (
+                f"I {rng.choice(_VERBS)} {rng.choice(_SUBJECTS)} and cut error rates by {rng.randint(5, 80)}% "
+                f"within {rng.randint(2, 12)} weeks."
+            )
+        else:
+            sentence = rng.choice(_FILLER)
+        sentences.append(sentence)
+        count += len(sentence.split())
+    sentences.append("As a result we finished the migration with zero customer-facing incidents.")
+    return " ".join(sentences)
+
+
+async def _run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from services.llm_client import LLMClient
+
+    client = LLMClient()
+    reported: List[int] = []
+    client.add_usage_hook(lambda stats: reported.append(stats.prompt_tokens or 0))
+
+    rows = []
+    try:
+        for words in args.answer_words:
+            answer = build_answer(words)
+            for label, budget in (("off", 0), (str(args.budget), args.budget)):
+                latencies, build_times = [], []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    prompt = prompts.build_star_prompt(
+                        question=QUESTION,
+                        answer=answer,
+                        job_analysis=JOB_ANALYSIS,
+                        mode="role",
+                        include_next_question=True,
+                        budget=budget,
+                    )
+                    build_times.append(time.perf_counter() - started)
+                    started = time.perf_counter()
+                    await client.request_json(prompt, prompt_type="star_evaluation")
+                    latencies.append(time.perf_counter() - started)
+                rows.append(
+                    {
+                        "words": words,
+                        "budget": label,
+                        "estimated": prompts.estimate_tokens(prompt),
+                        "reported": reported[-1],
+                        "latency_ms": statistics.median(latencies) * 1000,
+                        "build_ms": statistics.median(build_times) * 1000,
+                    }
+                )
+    finally:
+        await client.aclose()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--answer-words", default="300,1000,3000", type=lambda raw: [int(part) for part in raw.split(",")]
+    )
+    parser.add_argument("--budget", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", default="fixed:0.2", help="Base fake LLM latency model")
+    parser.add_argument("--prompt-latency", type=float, default=0.25, help="Extra seconds per 1k prompt tokens")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(
+        FakeLLMConfig(latency=LatencyModel.parse(args.latency), prompt_latency_per_1k_tokens=args.prompt_latency)
+    ).start()
+    os.environ["OPENAI_API_KEY"] = "fake-key"
+    os.environ["LLM_BASE_URL"] = server.base_url
+    try:
+        rows = asyncio.run(_run(args))
+    finally:
+        server.stop()
+
+    print(f"{'words':>6} {'budget':>7} {'est tokens':>11} {'srv tokens':>11} {'latency ms':>11} {'build ms':>9}")
+    baseline: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        baseline.setdefault(row["words"], row)
+        saved = 1 - row["reported"] / baseline[row["words"]]["reported"]
+        print(
+            f"{row['words']:>6} {row['budget']:>7} {row['estimated']:>11} {row['reported']:>11} "
+            f"{row['latency_ms']:>11.1f} {row['build_ms']:>9.2f}"
+            + (f"   ({saved:.0%} fewer tokens)" if row is not baseline[row["words"]] else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
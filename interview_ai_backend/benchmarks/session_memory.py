@@ -0,0 +1,123 @@
+"""Compare the memory footprint of legacy and compact interview sessions.
+
+Usage: ``python -m benchmarks.session_memory [--sessions 1000000] [--postings 20]``
+
+Each variant runs in a fresh interpreter and reports the Python heap growth
+measured by ``tracemalloc`` after building every session. The workload cycles
+through behavioral, general and role sessions; every session receives its own
+freshly validated ``JobAnalysisResult`` (as a request body would), and role
+sessions carry unique generated questions.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from models.job_models import JobAnalysisResult
+from services.question_bank import BEHAVIORAL_QUESTIONS, GENERAL_QUESTIONS
+
+_MODES = ("behavioral", "general", "role")
+
+
+@dataclass
+class LegacySessionState:
+    """Mirror of the original dataclass-based session layout."""
+
+    session_id: str
+    mode: str
+    job_analysis: JobAnalysisResult
+    pointer: int = 1
+    asked_questions: List[str] = field(default_factory=list)
+
+
+def _posting(index: int) -> Dict[str, Any]:
+    return {
+        "skills": [f"Skill {index}-{n}" for n in range(8)],
+        "responsibilities": [f"Own responsibility area {n} for team {index}" for n in range(6)],
+        "competencies": ["Leadership", "Communication", "Execution"],
+        "values": ["Customer obsession", "Integrity"],
+        "themes": [f"Theme {index}-{n}" for n in range(4)],
+        "summary": f"Lead the platform group for posting number {index} across several product areas.",
+    }
+
+
+def _questions(mode: str, index: int) -> List[str]:
+    if mode == "behavioral":
+        return [BEHAVIORAL_QUESTIONS[n % len(BEHAVIORAL_QUESTIONS)] for n in range(3)]
+    if mode == "general":
+        return [GENERAL_QUESTIONS[n % len(GENERAL_QUESTIONS)] for n in range(3)]
+    return [f"How would you scale system {index} when traffic grows by {n + 2}x?" for n in range(3)]
+
+
+def _build(variant: str, sessions: int, postings: int) -> Dict[str, float]:
+    payloads = [_posting(index) for index in range(postings)]
+    if variant == "compact":
+        from services.session_store import InterviewSessionState
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    store: Dict[str, Any] = {}
+    for index in range(sessions):
+        session_id = str(uuid.uuid4())
+        mode = _MODES[index % 3]
+        analysis = JobAnalysisResult(**payloads[index % postings])
+        asked = _questions(mode, index)
+        if variant == "legacy":
+            state: Any = LegacySessionState(session_id, mode, analysis, 1, asked)
+        else:
+            state = InterviewSessionState(session_id, mode, analysis, 1, asked)
+            state.retain()
+        store[session_id] = state
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = current - baseline
+    return {
+        "bytes": total,
+        "bytes_per_session": total / sessions,
+        "seconds": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session memory footprint benchmark")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--postings", type=int, default=20)
+    parser.add_argument("--variant", choices=("legacy", "compact"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(_build(args.variant, args.sessions, args.postings)))
+        return
+
+    results = {}
+    for variant in ("legacy", "compact"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.session_memory", "--variant", variant,
+             "--sessions", str(args.sessions), "--postings", str(args.postings)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[variant] = json.loads(output)
+
+    print(f"{args.sessions:,} sessions over {args.postings} job postings")
+    for variant, stats in results.items():
+        print(
+            f"  {variant:<8} {stats['bytes'] / 2**20:9.1f} MiB  "
+            f"{stats['bytes_per_session']:7.0f} B/session  build {stats['seconds']:.1f}s"
+        )
+    ratio = results["legacy"]["bytes"] / max(1, results["compact"]["bytes"])
+    print(f"  compact sessions use {ratio:.1f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Measure cold-start cost: importing the app, running its lifespan and the first LLM call.
+
+Usage: ``python -m benchmarks.startup [--runs 5] [--warmup 4] [--top 10]``
+
+Every sample runs in a fresh interpreter so nothing is already imported. For
+each run the child reports how long ``import main`` took, when the lifespan
+let the app start serving, when the LLM client finished opening in the
+background (SDK import plus optional connection warm-up) and the latency of
+the first ``request_json`` call after that against a local
+``tools.fake_llm_server``. Runs are repeated with warm-up disabled and with
+``--warmup`` connections, and the slowest modules from ``-X importtime`` are
+listed so regressions can be traced to a specific import.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from tools.fake_llm_server import FakeLLMConfig, FakeLLMServer, LatencyModel
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def run():
+    from routers import interview
+    app = main.app
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        await interview.llm_client.open()
+        opened = time.perf_counter()
+        await interview.llm_client.request_json("Say hi as JSON", prompt_type="benchmark")
+        first = time.perf_counter()
+    return ready, opened, first
+
+lifespan_started = time.perf_counter()
+ready, opened, first = asyncio.run(run())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "serving_ms": (ready - lifespan_started) * 1000,
+    "client_ready_ms": (opened - lifespan_started) * 1000,
+    "first_call_ms": (first - opened) * 1000,
+}))
+"""
+
+
+def _child_env(base_url: str, warmup: int, queue_path: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        OPENAI_API_KEY="fake",
+        LLM_BASE_URL=base_url,
+        LLM_WARMUP_CONNECTIONS=str(warmup),
+        ANALYSIS_QUEUE_PATH=queue_path,
+    )
+    return env
+
+
+def _sample(env: Dict[str, str]) -> Dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=_BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> List[Tuple[str, float]]:
+    """Top-level-ish modules with the largest cumulative import time, in milliseconds."""
+
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=_BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 2:
+            rows.append((name.strip(), int(cumulative) / 1000))
+    return sorted(rows, key=lambda row: -row[1])[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=4, help="Connections to pre-open in the warm-up runs")
+    parser.add_argument("--latency", default="fixed:0.05", help="Fake LLM latency model")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(FakeLLMConfig(latency=LatencyModel.parse(args.latency))).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # One discarded run so .pyc files exist, as they would on a deployed worker.
+            _sample(_child_env(server.base_url, 0, os.path.join(tmp, "queue.db")))
+            print(f"{'warmup':>6} {'import ms':>10} {'serving ms':>11} {'client ready ms':>16} {'first call ms':>14}")
+            for warmup in (0, args.warmup):
+                samples = [
+                    _sample(_child_env(server.base_url, warmup, os.path.join(tmp, f"queue-{warmup}-{run}.db")))
+                    for run in range(args.runs)
+                ]
+                medians = {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+                print(
+                    f"{warmup:>6} {medians['import_ms']:>10.1f} {medians['serving_ms']:>11.1f} "
+                    f"{medians['client_ready_ms']:>16.1f} {medians['first_call_ms']:>14.1f}"
+                )
+    finally:
+        server.stop()
+
+    print("\nSlowest imports under `import main` (cumulative ms):")
+    for name, millis in slowest_imports(args.top):
+        print(f"  {millis:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
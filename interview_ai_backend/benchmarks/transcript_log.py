@@ -0,0 +1,109 @@
+"""Compare write-behind group commit with a synchronous fsync per transcript record.
+
+Usage: ``python -m benchmarks.transcript_log [--records 5000] [--concurrency 32]``
+
+``--concurrency`` asyncio tasks each append their share of graded-answer
+records, as concurrent evaluate-answer requests would. The synchronous
+baseline writes and fsyncs every record inline, which is what a naive DB write
+on the request path costs; the write-behind run only queues the record and
+then waits once for the log to become durable. Per-append latency
+percentiles, total time and the number of fsync batches are reported.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from services.transcript_log import TranscriptLog
+
+_EVALUATION = {
+    "star": {"situation": "Migrating billing", "task": "Own the cutover", "action": "Dual writes", "result": "0 loss"},
+    "strengths": ["Clear ownership", "Quantified result"],
+    "weaknesses": ["Light on trade-offs"],
+    "fit_summary": "Strong match for the platform role.",
+    "score": 8,
+    "improvements": ["Explain the rollback plan"],
+}
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _drive(append: Callable[[int], None], records: int, concurrency: int) -> List[float]:
+    latencies: List[float] = []
+
+    async def _client(offset: int) -> None:
+        for index in range(offset, records, concurrency):
+            started = time.perf_counter()
+            append(index)
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0)  # yield like a request handler awaiting the LLM
+
+    await asyncio.gather(*(_client(offset) for offset in range(concurrency)))
+    return latencies
+
+
+def _sync_run(path: str, records: int, concurrency: int) -> Dict[str, Any]:
+    with open(path, "a", encoding="utf-8") as handle:
+
+        def append(index: int) -> None:
+            record = {"type": "answer", "session_id": f"s{index % 100}", "answer": "...", "evaluation": _EVALUATION}
+            handle.write(json.dumps(dict(record, ts=time.time()), separators=(",", ":")) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+        started = time.perf_counter()
+        latencies = asyncio.run(_drive(append, records, concurrency))
+        total = time.perf_counter() - started
+    return {"latencies": latencies, "total": total, "batches": records}
+
+
+def _write_behind_run(path: str, records: int, concurrency: int, flush_interval: float) -> Dict[str, Any]:
+    log = TranscriptLog(path, flush_interval=flush_interval)
+
+    def append(index: int) -> None:
+        log.answer_graded(f"s{index % 100}", "Tell me about a migration.", "...", _EVALUATION, source="llm")
+
+    started = time.perf_counter()
+    latencies = asyncio.run(_drive(append, records, concurrency))
+    log.flush()
+    total = time.perf_counter() - started
+    batches = log.stats()["batches"]
+    log.close()
+    return {"latencies": latencies, "total": total, "batches": batches}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--flush-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            "sync fsync": _sync_run(os.path.join(tmp, "sync.jsonl"), args.records, args.concurrency),
+            "write-behind": _write_behind_run(
+                os.path.join(tmp, "log.jsonl"), args.records, args.concurrency, args.flush_interval
+            ),
+        }
+
+    print(f"{'strategy':<14} {'p50 us':>9} {'p99 us':>9} {'mean us':>9} {'total ms':>9} {'fsyncs':>7}")
+    for name, result in results.items():
+        latencies = result["latencies"]
+        print(
+            f"{name:<14} {_percentile(latencies, 50) * 1e6:>9.1f} {_percentile(latencies, 99) * 1e6:>9.1f} "
+            f"{statistics.fmean(latencies) * 1e6:>9.1f} {result['total'] * 1000:>9.1f} {result['batches']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,51 @@
 """FastAPI application for the Interview AI MVP."""
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from routers import interview
+from services import admission, metrics, prompts, tracing
 
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application instance."""
+    # Load .env before the router module reads its configuration.
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    from routers import interview
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        # Load the OpenAI SDK and pre-warm its connection pool in the
+        # background so the worker starts serving immediately; calls that
+        # arrive first wait for it. Also resume interviews and jobs persisted
+        # by a previous process, and drain everything on shutdown.
+        opening = asyncio.create_task(interview.llm_client.open())
+        interview.interview_manager.resume_sessions()
+        interview.analysis_queue.open()
+        interview.analysis_queue.start()
+        await asyncio.to_thread(interview.evaluation_store.open)
+        try:
+            yield
+        finally:
+            opening.cancel()
+            await asyncio.gather(opening, return_exceptions=True)
+            await interview.analysis_queue.stop()
+            interview.analysis_queue.close()
+            interview.job_cache.close()
+            await interview.llm_client.aclose()
+            interview.transcript_log.close()
+            interview.evaluation_store.close()
+
     app = FastAPI(
         title="Interview AI Backend",
         description="Backend APIs for the interview coaching MVP",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -21,12 +56,25 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.add_middleware(admission.AdmissionMiddleware)
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.add_middleware(tracing.TracingMiddleware)
+    app.add_exception_handler(admission.AdmissionRejected, admission.rejected_response)
+
     app.include_router(interview.router, prefix="/api")
+    metrics.instrument_llm_client(interview.llm_client)
+    metrics.instrument_prompts(prompts)
+    metrics.instrument_admission(interview.admission)
+    metrics.instrument_interview_manager(interview.interview_manager)
 
     @app.get("/")
     async def root() -> dict:
         return {"status": "ok", "message": "Interview AI backend is running"}
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint() -> Response:
+        return Response(metrics.REGISTRY.render(), media_type=metrics.Registry.CONTENT_TYPE)
+
     return app
 
 
@@ -1,7 +1,7 @@
 """Interview flow related models."""
-from typing import Literal, List
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from .job_models import JobAnalysisResult
 
@@ -12,7 +12,17 @@ class StartInterviewRequest(BaseModel):
     """Payload for initializing an interview session."""
 
     mode: InterviewMode
-    job_analysis: JobAnalysisResult
+    job_analysis: Optional[JobAnalysisResult] = None
+    analysis_id: Optional[str] = Field(
+        None, description="Handle returned by /analyze-job; job_analysis, if also sent, is used when it has expired"
+    )
+    include_job_analysis: bool = Field(True, description="Echo the job analysis back in the response")
+
+    @model_validator(mode="after")
+    def _require_analysis(self) -> "StartInterviewRequest":
+        if self.job_analysis is None and not self.analysis_id:
+            raise ValueError("Either job_analysis or analysis_id is required")
+        return self
 
 
 class StartInterviewResponse(BaseModel):
@@ -21,7 +31,9 @@ class StartInterviewResponse(BaseModel):
     session_id: str
     mode: InterviewMode
     question: str
-    job_analysis: JobAnalysisResult
+    job_analysis: Optional[JobAnalysisResult] = None
+    analysis_id: Optional[str] = None
+    provisional: bool = Field(False, description="Fallback question served because the deadline ran out")
 
 
 class STARBreakdown(BaseModel):
@@ -51,3 +63,56 @@ class EvaluateAnswerResponse(BaseModel):
     score: int = Field(..., ge=1, le=5)
     improvements: List[str]
     next_question: str
+    cached: bool = Field(False, description="Feedback was reused from a near-identical earlier answer")
+    provisional: bool = Field(False, description="Deterministic feedback served because the deadline ran out")
+    evaluation_id: Optional[str] = Field(
+        None, description="Poll /api/evaluations/{evaluation_id} for the full evaluation still in progress"
+    )
+
+
+class DeferredEvaluationResponse(BaseModel):
+    """Status of an evaluation that kept running after a provisional response."""
+
+    evaluation_id: str
+    status: Literal["pending", "ready", "failed"]
+    result: Optional[EvaluateAnswerResponse] = None
+    error: Optional[str] = None
+
+
+class BatchEvaluateRequest(BaseModel):
+    """Many answers to grade in one call, e.g. when replaying recorded interviews."""
+
+    items: List[EvaluateAnswerRequest] = Field(..., min_length=1)
+    max_concurrency: Optional[int] = Field(
+        None, ge=1, description="Upper bound on concurrent LLM calls (capped by the server limit)"
+    )
+    ordered: bool = Field(False, description="Emit results in input order instead of completion order")
+
+
+class BatchEvaluateItemResult(BaseModel):
+    """Outcome for a single batch item, streamed as one NDJSON line."""
+
+    index: int
+    session_id: str
+    status: Literal["ok", "fallback", "error"]
+    result: Optional[EvaluateAnswerResponse] = None
+    error: Optional[str] = None
+
+
+class ScoreGroup(BaseModel):
+    """Score distribution for one group of stored evaluations."""
+
+    key: str
+    count: int
+    mean: Optional[float] = None
+    histogram: Dict[str, int] = Field(..., description="Answers per score, keyed 1 to 5")
+    percentiles: Dict[str, Optional[int]]
+
+
+class ScoreAggregateResponse(BaseModel):
+    """Aggregate over the columnar evaluation store."""
+
+    group_by: Optional[Literal["mode", "question", "theme"]] = None
+    rows: int = Field(..., description="Evaluations stored")
+    matched: int = Field(..., description="Evaluations that passed the filters and fell into a group")
+    groups: List[ScoreGroup]
@@ -1,5 +1,5 @@
 """Models related to job description analysis."""
-from typing import List
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -32,3 +32,33 @@ class JobAnalysisResult(BaseModel):
             }
         }
     }
+
+
+class JobAnalysisResponse(JobAnalysisResult):
+    """Job analysis plus the server-side handle that start-interview accepts."""
+
+    analysis_id: str = Field(..., description="Content hash of the analysis; pass it to /start-interview")
+
+
+class BulkJobAnalysisRequest(BaseModel):
+    """Many job descriptions to analyze in the background."""
+
+    job_descriptions: List[str] = Field(..., min_length=1)
+
+
+class AnalysisJobStatus(BaseModel):
+    """Progress of a queued job analysis."""
+
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    attempts: int = 0
+    result: Optional[JobAnalysisResult] = None
+    analysis_id: Optional[str] = None
+    error: Optional[str] = None
+    fallback: bool = Field(False, description="Result came from the local analyzer after the LLM kept failing")
+
+
+class BulkJobAnalysisResponse(BaseModel):
+    """Job ids for a bulk submission, in input order."""
+
+    jobs: List[AnalysisJobStatus]
@@ -1,128 +1,687 @@
 """Primary API routes for the Interview AI backend."""
 from __future__ import annotations
 
-import re
-from typing import Any, Dict, List
-
-from fastapi import APIRouter, HTTPException
-
-from models.job_models import JobAnalysisRequest, JobAnalysisResult
+import asyncio
+import json
+import os
+from functools import partial
+from typing import AbstractSet, Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import APIRouter, Header, HTTPException, Response
+from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+
+from models.job_models import (
+    AnalysisJobStatus,
+    BulkJobAnalysisRequest,
+    BulkJobAnalysisResponse,
+    JobAnalysisRequest,
+    JobAnalysisResponse,
+    JobAnalysisResult,
+)
 from models.interview_models import (
+    BatchEvaluateItemResult,
+    BatchEvaluateRequest,
+    DeferredEvaluationResponse,
     EvaluateAnswerRequest,
     EvaluateAnswerResponse,
+    ScoreAggregateResponse,
     STARBreakdown,
     StartInterviewRequest,
     StartInterviewResponse,
 )
+from services.admission import AdmissionController, AdmissionRejected, create_task as create_admitted_task, demote
+from services.analysis_handles import AnalysisHandleStore
+from services.analysis_queue import AnalysisQueue, QueueFullError
+from services.answer_cache import AnswerEvaluationCache, Signature
+from services.deadlines import Deadline, DeferredResults, request_deadline
+from services.evaluation_store import EvaluationStore
+from services.job_cache import JobAnalysisCache
+from services.job_mapreduce import MapReduceConfig, analyze_in_chunks
 from services.interview_manager import (
     BEHAVIORAL_QUESTIONS,
     GENERAL_QUESTIONS,
     InterviewManager,
+    InterviewSessionState,
 )
-from services.llm_client import LLMClient
-from services import prompts
+from services.json_stream import IncrementalJSONParser
+from services.llm_client import LLMClient, LLMTimeoutError
+from services.question_index import QuestionIndex
+from services.transcript_log import TranscriptLog
+from services import interning, job_analyzer, metrics, prompts, tracing
 
 router = APIRouter()
-llm_client = LLMClient()
-interview_manager = InterviewManager()
+admission = AdmissionController.from_env()
+llm_client = LLMClient(admission=admission)
+transcript_log = TranscriptLog.from_env()
+interview_manager = InterviewManager(
+    role_question_factory=lambda job_analysis, avoid: _generate_role_question(job_analysis, avoid),
+    transcript=transcript_log,
+)
+job_cache = JobAnalysisCache.from_env()
+analysis_handles = AnalysisHandleStore.from_env(shared=interview_manager.store)
+answer_cache = AnswerEvaluationCache.from_env()
+question_index = QuestionIndex.from_env()
+deferred_results = DeferredResults.from_env()
+evaluation_store = EvaluationStore.from_env()
+job_mapreduce_config = MapReduceConfig.from_env()
+
+analysis_queue = AnalysisQueue.from_env(lambda description, final: _process_queued_analysis(description, final))
+
+ANALYSIS_BULK_MAX_ITEMS = int(os.getenv("ANALYSIS_BULK_MAX_ITEMS", "1000"))
+BATCH_EVAL_MAX_CONCURRENCY = int(os.getenv("BATCH_EVAL_MAX_CONCURRENCY", "8"))
+# Let evaluations that miss the request deadline finish for a later fetch instead of abandoning them.
+EVALUATION_BACKGROUND_COMPLETION = os.getenv("EVALUATION_BACKGROUND_COMPLETION", "1").lower() in {"1", "true", "yes"}
+
 
+class _EvaluationOutcome(NamedTuple):
+    evaluation: Dict[str, Any]
+    source: str  # "llm", "cache", "fallback" or "provisional"
+    pending: Optional["asyncio.Future[Dict[str, Any]]"] = None
+    signature: Optional[Signature] = None  # the answer's MinHash, for caching the pending evaluation
 
-@router.post("/analyze-job", response_model=JobAnalysisResult)
-async def analyze_job(payload: JobAnalysisRequest) -> JobAnalysisResult:
-    """Analyze a job description and return structured JSON."""
 
-    prompt = prompts.build_job_analysis_prompt(payload.job_description)
+@router.post("/analyze-job", response_model=JobAnalysisResponse)
+async def analyze_job(payload: JobAnalysisRequest) -> Response:
+    """Analyze a job description and return structured JSON.
+
+    Descriptions above ``JOB_ANALYSIS_MAPREDUCE_THRESHOLD_CHARS`` are split on
+    section boundaries and analyzed chunk by chunk before being merged. The
+    response carries an ``analysis_id`` that /start-interview accepts; the body
+    is pre-serialized once per distinct analysis.
+    """
+
     try:
-        data = await llm_client.request_json(prompt)
-    except (RuntimeError, ValueError):
-        data = _fallback_job_analysis(payload.job_description)
+        normalized = await job_cache.get_or_compute(
+            payload.job_description, partial(_analyze_with_llm, payload.job_description)
+        )
+    except (RuntimeError, ValueError) as exc:
+        if _is_shed(exc):
+            raise  # answered with 503 and Retry-After by the app's handler
+        # Fallback results are never cached so a recovered LLM is used next time.
+        normalized = _normalize_job_analysis(_fallback_job_analysis(payload.job_description))
     except Exception as exc:  # pragma: no cover - network errors
         raise HTTPException(status_code=500, detail=f"Job analysis failed: {exc}") from exc
 
-    normalized = _normalize_job_analysis(data)
-    return JobAnalysisResult(**normalized)
+    return Response((await analysis_handles.register(normalized)).body, media_type="application/json")
+
+
+@router.post("/analyze-job/async", response_model=AnalysisJobStatus, status_code=202)
+async def submit_job_analysis(payload: JobAnalysisRequest) -> AnalysisJobStatus:
+    """Queue a job description for background analysis and return its job id immediately."""
+
+    try:
+        job_id = await analysis_queue.submit(payload.job_description)
+    except QueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return AnalysisJobStatus(job_id=job_id, status="queued")
+
+
+@router.post("/analyze-job/bulk", response_model=BulkJobAnalysisResponse, status_code=202)
+async def submit_job_analyses(payload: BulkJobAnalysisRequest) -> BulkJobAnalysisResponse:
+    """Queue many job descriptions in one call; poll each job id for its result."""
+
+    if len(payload.job_descriptions) > ANALYSIS_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {ANALYSIS_BULK_MAX_ITEMS} descriptions per request")
+    try:
+        job_ids = await analysis_queue.submit_many(payload.job_descriptions)
+    except QueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return BulkJobAnalysisResponse(jobs=[AnalysisJobStatus(job_id=job_id, status="queued") for job_id in job_ids])
+
+
+@router.get("/analyze-job/jobs/{job_id}", response_model=AnalysisJobStatus)
+async def get_job_analysis(job_id: str) -> AnalysisJobStatus:
+    """Poll a queued analysis; ``result`` is set once ``status`` is ``done``."""
+
+    job = await analysis_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    # The worker registered the handle when it finished; the id rides along in the stored result.
+    result = dict(job.result) if job.result else None
+    analysis_id = result.pop("analysis_id", None) if result else None
+    return AnalysisJobStatus(
+        job_id=job.job_id,
+        status=job.status,
+        attempts=job.attempts,
+        result=result,
+        analysis_id=analysis_id,
+        error=job.error,
+        fallback=job.fallback,
+    )
+
+
+@router.get("/analyze-job/queue-stats")
+async def analysis_queue_stats() -> Dict[str, int]:
+    """Expose job counts by status and the number of live workers."""
+
+    return await analysis_queue.stats()
+
+
+@router.post("/analyze-job/quick", response_model=JobAnalysisResponse)
+async def analyze_job_quick(payload: JobAnalysisRequest) -> Response:
+    """Analyze a job description locally, without calling the LLM."""
+
+    analysis = job_analyzer.get_analyzer().analyze(payload.job_description)
+    handle = await analysis_handles.register(_normalize_job_analysis(analysis))
+    return Response(handle.body, media_type="application/json")
+
+
+@router.get("/analyze-job/cache-stats")
+async def analyze_job_cache_stats() -> Dict[str, int]:
+    """Expose hit, miss and coalesce counters for the job-analysis cache."""
+
+    return job_cache.stats()
 
 
 @router.post("/start-interview", response_model=StartInterviewResponse)
-async def start_interview(payload: StartInterviewRequest) -> StartInterviewResponse:
-    """Kick off an interview session and return the first question."""
+async def start_interview(
+    payload: StartInterviewRequest, x_request_deadline_ms: Optional[str] = Header(None)
+) -> Response:
+    """Kick off an interview session and return the first question.
+
+    The job analysis is either uploaded in full or referenced by the
+    ``analysis_id`` from /analyze-job; a full analysis sent along with the id
+    is used if the handle has expired. Set ``include_job_analysis`` to false
+    to skip echoing it back.
+    """
+
+    deadline = request_deadline("start_interview", x_request_deadline_ms)
+    provisional = False
+    handle = await analysis_handles.get(payload.analysis_id) if payload.analysis_id else None
+    if handle is not None:
+        job_analysis = handle.analysis
+    elif payload.job_analysis is not None:
+        job_analysis = payload.job_analysis
+    else:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired; analyze the job again")
 
     if payload.mode not in {"behavioral", "general", "role"}:
         raise HTTPException(status_code=400, detail="Unsupported interview mode")
 
     if payload.mode == "behavioral":
         question = BEHAVIORAL_QUESTIONS[0]
+        session_id = interview_manager.create_session(payload.mode, job_analysis, question)
     elif payload.mode == "general":
         question = GENERAL_QUESTIONS[0]
+        session_id = interview_manager.create_session(payload.mode, job_analysis, question)
     else:
-        question = await _generate_role_question(payload.job_analysis)
-
-    session_id = interview_manager.create_session(payload.mode, payload.job_analysis, question)
-    return StartInterviewResponse(
-        session_id=session_id,
-        mode=payload.mode,
-        question=question,
-        job_analysis=payload.job_analysis,
+        session_id = interview_manager.create_session(payload.mode, job_analysis)
+        question, provisional = await _next_role_question(session_id, job_analysis, deadline)
+
+    return _json_response(
+        StartInterviewResponse(
+            session_id=session_id,
+            mode=payload.mode,
+            question=question,
+            job_analysis=job_analysis if payload.include_job_analysis else None,
+            analysis_id=payload.analysis_id,
+            provisional=provisional,
+        )
     )
 
 
 @router.post("/evaluate-answer", response_model=EvaluateAnswerResponse)
-async def evaluate_answer(payload: EvaluateAnswerRequest) -> EvaluateAnswerResponse:
-    """Evaluate an answer, return STAR feedback, and provide the next question."""
+async def evaluate_answer(
+    payload: EvaluateAnswerRequest, x_request_deadline_ms: Optional[str] = Header(None)
+) -> Response:
+    """Evaluate an answer, return STAR feedback, and provide the next question.
+
+    If the deadline runs out first, deterministic feedback is returned marked
+    ``provisional``; when background completion is enabled it carries an
+    ``evaluation_id`` for fetching the real evaluation later.
+    """
+
+    deadline = request_deadline("evaluate_answer", x_request_deadline_ms)
 
     try:
         session = interview_manager.get_session(payload.session_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    include_next_question = session.mode == "role"
-    prompt = prompts.build_star_prompt(
-        question=payload.question,
-        answer=payload.answer,
-        job_analysis=session.job_analysis,
-        mode=session.mode,
-        include_next_question=include_next_question,
-    )
-
     try:
-        evaluation = await llm_client.request_json(prompt)
-    except (RuntimeError, ValueError):
-        evaluation = _fallback_star_response(payload.question, payload.answer, session.job_analysis)
+        outcome = await _evaluate_with_llm(session, payload.question, payload.answer, deadline)
+    except AdmissionRejected:
+        raise
     except Exception as exc:  # pragma: no cover - network errors
         raise HTTPException(status_code=500, detail=f"Answer evaluation failed: {exc}") from exc
 
-    star_block = evaluation.get("star", {})
-    star = STARBreakdown(
-        situation=star_block.get("situation", ""),
-        task=star_block.get("task", ""),
-        action=star_block.get("action", ""),
-        result=star_block.get("result", ""),
+    response = await _build_evaluation_response(
+        session, payload.question, payload.answer, outcome.evaluation, source=outcome.source, deadline=deadline
     )
-    strengths = _ensure_list(evaluation.get("strengths"))
-    weaknesses = _ensure_list(evaluation.get("weaknesses"))
-    fit_summary = evaluation.get("fit_summary", "")
-    score = _clamp_score(evaluation.get("score"))
-    improvements = _ensure_list(evaluation.get("improvements"))
-
-    if session.mode == "role":
-        next_question = evaluation.get("next_question")
-        if not next_question:
-            next_question = await _generate_role_question(session.job_analysis)
-        interview_manager.record_question(session.session_id, next_question)
-    else:
-        next_question = interview_manager.next_fixed_question(session.session_id)
+    if outcome.pending is not None:
+        response.evaluation_id = deferred_results.track(
+            outcome.pending,
+            partial(
+                _finalize_deferred,
+                session,
+                payload.question,
+                payload.answer,
+                outcome.signature,
+                response.next_question,
+            ),
+        )
+    return _json_response(response)
+
+
+@router.get("/evaluations/{evaluation_id}", response_model=DeferredEvaluationResponse)
+async def get_deferred_evaluation(evaluation_id: str) -> DeferredEvaluationResponse:
+    """Fetch the full evaluation behind a provisional response."""
+
+    entry = deferred_results.get(evaluation_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Evaluation not found or expired")
+    return DeferredEvaluationResponse(
+        evaluation_id=evaluation_id, status=entry.status, result=entry.value, error=entry.error
+    )
+
+
+@router.get("/evaluate-answer/cache-stats")
+async def evaluate_answer_cache_stats() -> Dict[str, int]:
+    """Expose hit, miss and eviction counters for the near-duplicate answer cache."""
+
+    return answer_cache.stats()
+
+
+@router.post("/evaluate-answers/batch")
+async def evaluate_answers_batch(payload: BatchEvaluateRequest) -> StreamingResponse:
+    """Evaluate many answers concurrently and stream NDJSON results as they finish.
+
+    Every line is a ``BatchEvaluateItemResult`` tagged with its input index.
+    Items that share a session are evaluated in input order so the session's
+    question sequence matches a sequential replay.
+    """
+
+    limit = min(payload.max_concurrency or BATCH_EVAL_MAX_CONCURRENCY, BATCH_EVAL_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(limit)
+    session_locks: Dict[str, asyncio.Lock] = {}
+
+    async def _run(index: int, item: EvaluateAnswerRequest) -> BatchEvaluateItemResult:
+        lock = session_locks.setdefault(item.session_id, asyncio.Lock())
+        async with lock, semaphore:
+            try:
+                session = interview_manager.get_session(item.session_id)
+            except ValueError:
+                return BatchEvaluateItemResult(
+                    index=index, session_id=item.session_id, status="error", error="Session not found"
+                )
+            try:
+                outcome = await _evaluate_with_llm(session, item.question, item.answer)
+                result = await _build_evaluation_response(
+                    session, item.question, item.answer, outcome.evaluation, source=outcome.source
+                )
+            except Exception as exc:  # pragma: no cover - network errors
+                return BatchEvaluateItemResult(
+                    index=index,
+                    session_id=item.session_id,
+                    status="error",
+                    error=f"Answer evaluation failed: {exc}",
+                )
+        return BatchEvaluateItemResult(
+            index=index,
+            session_id=item.session_id,
+            status="fallback" if outcome.source == "fallback" else "ok",
+            result=result,
+        )
+
+    async def _lines() -> AsyncIterator[str]:
+        # Locks are acquired in task-creation order, which keeps same-session items sequential.
+        tasks = [asyncio.ensure_future(_run(index, item)) for index, item in enumerate(payload.items)]
+        try:
+            if payload.ordered:
+                for task in tasks:
+                    yield (await task).model_dump_json() + "\n"
+            else:
+                for finished in asyncio.as_completed(tasks):
+                    yield (await finished).model_dump_json() + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@router.post("/evaluate-answer/stream")
+async def evaluate_answer_stream(payload: EvaluateAnswerRequest) -> StreamingResponse:
+    """Stream STAR feedback as Server-Sent Events while the LLM is generating.
+
+    Each completed field is pushed as a ``field`` event carrying its path and
+    normalized value; the final ``result`` event has the
+    ``EvaluateAnswerResponse`` shape. If the LLM stream fails after fields were
+    sent, a ``reset`` event tells the client to discard them before the
+    fallback ``result`` arrives.
+    """
+
+    try:
+        session = interview_manager.get_session(payload.session_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    async def _events() -> AsyncIterator[str]:
+        signature = await asyncio.to_thread(answer_cache.sign, payload.answer)
+        cached = answer_cache.get(payload.question, session.job_key, session.mode, signature)
+        if cached is not None:
+            response = await _build_evaluation_response(
+                session, payload.question, payload.answer, dict(cached[0]), source="cache"
+            )
+            yield _sse_event("result", response.model_dump())
+            return
+
+        with tracing.phase("prompt_build"):
+            prompt = prompts.build_star_prompt(
+                question=payload.question,
+                answer=payload.answer,
+                job_analysis=session.job_analysis,
+                mode=session.mode,
+                include_next_question=session.mode == "role",
+            )
+        parser = IncrementalJSONParser()
+        fields_sent = 0
+        try:
+            async for chunk in llm_client.stream_json(prompt, prompt_type="star_evaluation"):
+                for path, value in parser.feed(chunk):
+                    fields_sent += 1
+                    yield _sse_event("field", {"path": list(path), "value": _normalize_star_field(path, value)})
+            try:
+                evaluation = json.loads(parser.text)
+            except json.JSONDecodeError as exc:
+                raise ValueError("LLM response was not valid JSON") from exc
+            _remember_evaluation(session, payload.question, signature, evaluation)
+            source = "llm"
+        except (RuntimeError, ValueError) as exc:
+            if _is_shed(exc):
+                yield _sse_event("error", {"detail": str(exc), "retry_after": exc.retry_after})
+                return
+            if fields_sent:
+                # The fields streamed so far belong to the failed evaluation, not to the fallback below.
+                yield _sse_event("reset", {"discard_fields": fields_sent, "source": "fallback"})
+            evaluation = _fallback_star_response(payload.question, payload.answer, session.job_analysis)
+            source = "fallback"
+        except Exception as exc:  # pragma: no cover - network errors
+            yield _sse_event("error", {"detail": f"Answer evaluation failed: {exc}"})
+            return
+
+        response = await _build_evaluation_response(
+            session, payload.question, payload.answer, evaluation, source=source
+        )
+        yield _sse_event("result", response.model_dump())
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/sessions/transcript-stats")
+async def transcript_stats() -> Dict[str, int]:
+    """Expose queued, durable and dropped record counts for the transcript log."""
+
+    return transcript_log.stats()
+
+
+@router.get("/analytics/scores", response_model=ScoreAggregateResponse)
+async def score_analytics(
+    group_by: Optional[str] = None,
+    mode: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+) -> Response:
+    """Score histogram, mean and percentiles over stored evaluations, optionally grouped.
+
+    ``group_by`` is "mode", "question" (fixed bank questions) or "theme";
+    ``since`` and ``until`` are Unix timestamps. The scan runs on a worker thread.
+    """
+
+    try:
+        result = await asyncio.to_thread(evaluation_store.aggregate, group_by, mode=mode, since=since, until=until)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _json_response(ScoreAggregateResponse(group_by=group_by, **result))
+
+
+@router.get("/admission-stats")
+async def admission_stats() -> Dict[str, Any]:
+    """Expose LLM slots in use, queue depth per priority class, and admitted and shed counts."""
+
+    return admission.stats()
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def close_session(session_id: str) -> Response:
+    """End an interview session and release its server-side state."""
+
+    interview_manager.close_session(session_id)
+    return Response(status_code=204)
+
+
+async def _build_evaluation_response(
+    session: InterviewSessionState,
+    question: str,
+    answer: str,
+    evaluation: Dict[str, Any],
+    *,
+    source: str = "llm",
+    deadline: Optional[Deadline] = None,
+) -> EvaluateAnswerResponse:
+    """Normalize raw evaluation JSON, log the graded turn and advance the session to its next question."""
+
+    with tracing.phase("normalize"):
+        fields = _evaluation_fields(evaluation)
+    with tracing.phase("transcript"):
+        interview_manager.record_answer(
+            session.session_id, question, answer, dict(fields, star=fields["star"].model_dump()), source
+        )
+        _store_score(session, question, fields["score"], source)
+    provisional = source == "provisional"
+    with tracing.phase("next_question"):
+        if session.mode == "role":
+            next_question = evaluation.get("next_question")
+            if next_question:
+                interview_manager.record_question(session.session_id, next_question)
+            else:
+                next_question, late = await _next_role_question(session.session_id, session.job_analysis, deadline)
+                provisional = provisional or late
+        else:
+            next_question = interview_manager.next_fixed_question(session.session_id)
 
     return EvaluateAnswerResponse(
-        star=star,
-        strengths=strengths,
-        weaknesses=weaknesses,
-        fit_summary=fit_summary,
-        score=score,
-        improvements=improvements,
+        **fields,
         next_question=next_question,
+        cached=source == "cache",
+        provisional=provisional,
     )
 
 
+def _store_score(session: InterviewSessionState, question: str, score: int, source: str) -> None:
+    """Add a graded answer to the analytics store; deterministic fallback scores are left out."""
+
+    if source in {"fallback", "provisional"} or not evaluation_store.enabled:
+        return
+    question_id = interning.questions.lookup(question)
+    evaluation_store.record(
+        score=score,
+        mode=session.mode,
+        question_id=question_id if question_id is not None and interning.questions.is_bank(question_id) else -1,
+        job_key=session.job_key,
+        themes=session.job_analysis.themes,
+    )
+
+
+def _evaluation_fields(evaluation: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize the feedback part of raw evaluation JSON."""
+
+    star_block = evaluation.get("star", {})
+    return {
+        "star": STARBreakdown(
+            situation=star_block.get("situation", ""),
+            task=star_block.get("task", ""),
+            action=star_block.get("action", ""),
+            result=star_block.get("result", ""),
+        ),
+        "strengths": _ensure_list(evaluation.get("strengths")),
+        "weaknesses": _ensure_list(evaluation.get("weaknesses")),
+        "fit_summary": evaluation.get("fit_summary", ""),
+        "score": _clamp_score(evaluation.get("score")),
+        "improvements": _ensure_list(evaluation.get("improvements")),
+    }
+
+
+def _finalize_deferred(
+    session: InterviewSessionState,
+    question: str,
+    answer: str,
+    signature: Optional[Signature],
+    next_question: str,
+    evaluation: Dict[str, Any],
+) -> EvaluateAnswerResponse:
+    """Turn a late LLM evaluation into the response a follow-up fetch returns.
+
+    The session already moved on with the provisional response, so the next
+    question is kept rather than advancing again.
+    """
+
+    _remember_evaluation(session, question, signature, evaluation)
+    fields = _evaluation_fields(evaluation)
+    interview_manager.record_answer(
+        session.session_id, question, answer, dict(fields, star=fields["star"].model_dump()), "deferred"
+    )
+    _store_score(session, question, fields["score"], "deferred")
+    return EvaluateAnswerResponse(**fields, next_question=next_question)
+
+
+async def _next_role_question(
+    session_id: str, job_analysis: JobAnalysisResult, deadline: Optional[Deadline]
+) -> Tuple[str, bool]:
+    """Serve the next role question within the deadline; returns it and whether it is a fallback."""
+
+    timeout = deadline.remaining() if deadline is not None else None
+    try:
+        return await interview_manager.next_role_question(session_id, timeout=timeout), False
+    except asyncio.TimeoutError:
+        asked = set(interview_manager.get_session(session_id).asked_questions)
+        question = _fallback_role_question(job_analysis, asked)
+        interview_manager.record_question(session_id, question)
+        return question, True
+
+
+def _is_shed(exc: BaseException) -> bool:
+    """True for an admission rejection whose priority class must fail with 503 rather than fall back."""
+
+    return isinstance(exc, AdmissionRejected) and not exc.fallback
+
+
+def _json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize with pydantic-core directly, skipping FastAPI's re-validation and jsonable_encoder pass."""
+
+    with tracing.phase("serialize"):
+        body = model.model_dump_json()
+    return Response(body, status_code=status_code, media_type="application/json")
+
+
+def _normalize_star_field(path: Tuple[str, ...], value: Any) -> Any:
+    """Apply the same normalization as the final response to a streamed field."""
+
+    if path == ("score",):
+        return _clamp_score(value)
+    if path[0] in {"strengths", "weaknesses", "improvements"} and len(path) == 1:
+        return _ensure_list(value)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def _evaluate_with_llm(
+    session: InterviewSessionState, question: str, answer: str, deadline: Optional[Deadline] = None
+) -> _EvaluationOutcome:
+    """Run the STAR evaluation, returning the raw JSON and its source.
+
+    The source is ``"cache"`` when a near-duplicate answer to the same question
+    was already graded, ``"llm"`` for a fresh evaluation, ``"fallback"`` when
+    the LLM failed and ``"provisional"`` when the deadline ran out first. In the
+    last case ``pending`` holds the LLM call if it keeps running in the background.
+    """
+
+    with tracing.phase("answer_cache"):
+        # Signed once, off the event loop, and reused when the fresh evaluation is stored.
+        signature = await asyncio.to_thread(answer_cache.sign, answer)
+        cached = answer_cache.get(question, session.job_key, session.mode, signature)
+    if cached is not None:
+        return _EvaluationOutcome(dict(cached[0]), "cache")
+
+    with tracing.phase("prompt_build"):
+        prompt = prompts.build_star_prompt(
+            question=question,
+            answer=answer,
+            job_analysis=session.job_analysis,
+            mode=session.mode,
+            include_next_question=session.mode == "role",
+        )
+    remaining = deadline.remaining() if deadline is not None else None
+    try:
+        if remaining is not None and EVALUATION_BACKGROUND_COMPLETION:
+            # The call keeps its own full budget; only this request stops waiting for it.
+            task = create_admitted_task(llm_client.request_json(prompt, prompt_type="star_evaluation"))
+            done, _ = await asyncio.wait({task}, timeout=remaining)
+            if not done:
+                demote(task)  # nobody waits for it now; keep it behind live turns
+                fallback = _fallback_star_response(question, answer, session.job_analysis)
+                return _EvaluationOutcome(fallback, "provisional", task, signature)
+            evaluation = task.result()
+        else:
+            evaluation = await llm_client.request_json(prompt, prompt_type="star_evaluation", deadline=remaining)
+    except LLMTimeoutError:
+        source = "provisional" if remaining is not None else "fallback"
+        return _EvaluationOutcome(_fallback_star_response(question, answer, session.job_analysis), source)
+    except (RuntimeError, ValueError) as exc:
+        if _is_shed(exc):
+            raise
+        return _EvaluationOutcome(_fallback_star_response(question, answer, session.job_analysis), "fallback")
+    _remember_evaluation(session, question, signature, evaluation)
+    return _EvaluationOutcome(evaluation, "llm")
+
+
+def _remember_evaluation(
+    session: InterviewSessionState, question: str, signature: Optional[Signature], evaluation: Dict[str, Any]
+) -> None:
+    # The follow-up question is per-turn; a cache hit asks the session for a fresh one instead.
+    reusable = {key: value for key, value in evaluation.items() if key != "next_question"}
+    answer_cache.set(question, session.job_key, session.mode, signature, reusable)
+
+
+async def _analyze_with_llm(job_description: str) -> Dict[str, Any]:
+    if job_mapreduce_config.should_split(job_description):
+        data = await analyze_in_chunks(job_description, _analyze_job_chunk, job_mapreduce_config)
+    else:
+        prompt = prompts.build_job_analysis_prompt(job_description)
+        data = await llm_client.request_json(prompt, prompt_type="job_analysis")
+    return _normalize_job_analysis(data)
+
+
+async def _process_queued_analysis(job_description: str, final_attempt: bool) -> Tuple[Dict[str, Any], bool]:
+    """Queue worker body: retry LLM failures, settling for the local analyzer on the last attempt."""
+
+    try:
+        normalized = await job_cache.get_or_compute(job_description, partial(_analyze_with_llm, job_description))
+        fallback = False
+    except (RuntimeError, ValueError):
+        if not final_attempt:
+            raise
+        normalized, fallback = _normalize_job_analysis(_fallback_job_analysis(job_description)), True
+    # Registered once here so status polls only read the stored id.
+    handle = await analysis_handles.register(normalized)
+    return dict(normalized, analysis_id=handle.analysis_id), fallback
+
+
+async def _analyze_job_chunk(chunk: str, index: int, total: int) -> Dict[str, Any]:
+    prompt = prompts.build_job_analysis_chunk_prompt(chunk, index, total)
+    return await llm_client.request_json(prompt, prompt_type="job_analysis_chunk")
+
+
 def _normalize_job_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
     """Ensure the job analysis payload has every required key."""
 
@@ -140,16 +699,30 @@ def _normalize_job_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
     return normalized
 
 
-async def _generate_role_question(job_analysis: JobAnalysisResult) -> str:
+async def _generate_role_question(
+    job_analysis: JobAnalysisResult, avoid: AbstractSet[str] = frozenset()
+) -> str:
+    """Reuse a stored question for a similar job, or ask the LLM and index its answer."""
+
+    # The index reads its sidecar, takes a file lock and embeds the analysis: keep that off the loop.
+    reused = await asyncio.to_thread(question_index.best_match, job_analysis, exclude=avoid)
+    if reused is not None:
+        metrics.ROLE_QUESTIONS.inc(source="index")
+        return reused
+
     prompt = prompts.build_role_question_prompt(job_analysis)
     try:
-        response = await llm_client.request_json(prompt)
+        response = await llm_client.request_json(prompt, prompt_type="role_question")
     except (RuntimeError, ValueError):
-        return _fallback_role_question(job_analysis)
+        # Shed calls fall back too, whatever their class policy: a turn never fails for want of a question.
+        return _fallback_role_question(job_analysis, avoid)
     question = response.get("question")
     if not question:
-        return _fallback_role_question(job_analysis)
-    return question.strip()
+        return _fallback_role_question(job_analysis, avoid)
+    question = question.strip()
+    await asyncio.to_thread(question_index.add, job_analysis, question)
+    metrics.ROLE_QUESTIONS.inc(source="llm")
+    return question
 
 
 def _ensure_list(value: Any) -> List[str]:
@@ -175,38 +748,15 @@ def _clamp_score(value: Any) -> int:
 def _fallback_job_analysis(job_description: str) -> Dict[str, Any]:
     """Provide a deterministic job analysis when the LLM is unavailable."""
 
-    lines = [line.strip("•- ").strip() for line in job_description.splitlines() if line.strip()]
-    sentences = [segment.strip() for segment in re.split(r"[.\\n]", job_description) if segment.strip()]
+    metrics.FALLBACKS.inc(kind="job_analysis")
+    return job_analyzer.get_analyzer().analyze(job_description)
 
-    keywords = _extract_keywords(job_description)
-    skills = keywords[:6]
-    responsibilities = lines[:6] or sentences[:6]
 
-    competencies = [kw for kw in keywords if kw.lower().endswith(("ship", "ment"))][:4]
-    if len(competencies) < 2:
-        competencies.extend([kw for kw in keywords if kw not in competencies][: (4 - len(competencies))])
-
-    values = [phrase for phrase in lines if any(word in phrase.lower() for word in ["value", "culture", "mission"])]
-    if not values:
-        values = [f"Emphasis on {kw.lower()} excellence" for kw in keywords[:2]]
-
-    themes = [kw for kw in keywords if kw.lower() not in {k.lower() for k in skills}][:3]
-    summary = sentences[0] if sentences else "Review the full job description for details."
-
-    return {
-        "skills": skills or ["Communication", "Problem solving"],
-        "responsibilities": responsibilities or ["Deliver high-quality work", "Collaborate across teams"],
-        "competencies": competencies or ["Leadership", "Execution"],
-        "values": values or ["Customer focus", "Integrity"],
-        "themes": themes or ["Impact", "Ownership"],
-        "summary": summary,
-    }
-
-
-def _fallback_role_question(job_analysis: JobAnalysisResult) -> str:
-    focus_pool = job_analysis.themes or job_analysis.responsibilities or ["impact"]
-    focus = focus_pool[0]
-    return f"How have you demonstrated {focus.lower()} in your previous roles?"
+def _fallback_role_question(job_analysis: JobAnalysisResult, avoid: AbstractSet[str] = frozenset()) -> str:
+    metrics.FALLBACKS.inc(kind="role_question")
+    focus_pool = [*job_analysis.themes, *job_analysis.responsibilities] or ["impact"]
+    candidates = [f"How have you demonstrated {focus.lower()} in your previous roles?" for focus in focus_pool]
+    return next((candidate for candidate in candidates if candidate not in avoid), candidates[0])
 
 
 def _fallback_star_response(
@@ -214,6 +764,8 @@ def _fallback_star_response(
 ) -> Dict[str, Any]:
     """Deterministic placeholder for STAR feedback."""
 
+    metrics.FALLBACKS.inc(kind="star_evaluation")
+
     word_count = len(answer.split())
     score = 5 if word_count > 180 else 4 if word_count > 120 else 3 if word_count > 60 else 2
 
@@ -248,12 +800,3 @@ def _fallback_star_response(
         "improvements": improvements,
     }
 
-
-def _extract_keywords(text: str) -> List[str]:
-    tokens = re.findall(r"[A-Za-z][A-Za-z+]{3,}", text)
-    unique: List[str] = []
-    for token in tokens:
-        word = token.capitalize()
-        if word not in unique:
-            unique.append(word)
-    return unique
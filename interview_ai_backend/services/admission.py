@@ -0,0 +1,397 @@
+"""Admission control for LLM work: bounded concurrency, priorities and fair share.
+
+Every LLM call takes one of ``max_inflight`` slots. When none is free the
+call waits in a queue for its priority class. Classes are served strictly
+in order: ``interview`` (turns of a running interview), then ``analysis``
+(new job analyses), then ``background`` (queue workers and anything outside
+a request). Within a class the next slot goes to the waiting client with
+the fewest calls in flight, and no client may hold more than
+``max_per_client`` slots.
+
+A call that waits longer than its class allows, or finds the class queue
+full, is shed with :class:`AdmissionRejected`. That exception is a
+:class:`~services.llm_client.LLMUnavailableError`, so endpoints with a
+deterministic fallback use it. Classes configured to ``reject`` answer 503
+with a ``Retry-After`` estimate instead.
+
+:class:`AdmissionMiddleware` tags each request with its class and client id
+through context variables. Tasks spawned by a request (prefetches, deferred
+evaluations) inherit them; speculative work is started with
+:func:`create_task` under the ``background`` class instead, and a deferred
+call the request stops waiting for is moved there with :func:`demote`. The client id is the peer address; the
+``x-client-id`` header only overrides it when the peer is one of
+``ADMISSION_TRUSTED_PROXIES``, so callers cannot pick their own fair-share
+bucket.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import math
+import os
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Coroutine,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from services import tracing
+from services.llm_client import LLMUnavailableError
+
+T = TypeVar("T")
+
+PRIORITY_CLASSES = ("interview", "analysis", "background")
+
+# Request path prefixes served as interview turns; every other request is "analysis".
+# Queue workers run outside any request and so default to "background".
+ROUTE_CLASSES: Tuple[Tuple[str, str], ...] = (
+    ("/api/evaluate-answer", "interview"),  # also /evaluate-answers/batch and /evaluate-answer/stream
+    ("/api/start-interview", "interview"),
+)
+
+_DEFAULT_POLICIES = {
+    "interview": ("10", "1000", "fallback"),
+    "analysis": ("2", "200", "reject"),
+    "background": ("0", "0", "reject"),
+}
+
+_request_class: "contextvars.ContextVar[str]" = contextvars.ContextVar("admission_class", default="background")
+_request_client: "contextvars.ContextVar[str]" = contextvars.ContextVar("admission_client", default="internal")
+# Contexts of tasks started by create_task, so demote() can reclassify them later.
+_task_contexts: "weakref.WeakKeyDictionary[asyncio.Task, contextvars.Context]" = weakref.WeakKeyDictionary()
+
+
+class AdmissionRejected(LLMUnavailableError):
+    """Raised when a call is shed; ``fallback`` says whether its class may degrade instead of failing."""
+
+    def __init__(self, priority_class: str, reason: str, retry_after: int, fallback: bool) -> None:
+        super().__init__(f"LLM admission rejected ({priority_class}: {reason}); retry after {retry_after}s")
+        self.priority_class = priority_class
+        self.reason = reason  # "queue_full", "queue_timeout" or "client_limit"
+        self.retry_after = retry_after
+        self.fallback = fallback
+
+
+@dataclass
+class ClassPolicy:
+    """Queueing limits for one priority class; ``0`` means unbounded."""
+
+    max_wait: float
+    max_queue: int
+    fallback: bool
+
+    @classmethod
+    def from_env(cls, priority_class: str) -> "ClassPolicy":
+        wait, queue, shed = _DEFAULT_POLICIES[priority_class]
+        prefix = f"ADMISSION_{priority_class.upper()}"
+        return cls(
+            max_wait=float(os.getenv(f"{prefix}_MAX_WAIT_SECONDS", wait)),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", queue)),
+            fallback=os.getenv(f"{prefix}_SHED", shed).lower() == "fallback",
+        )
+
+
+class _Waiter:
+    __slots__ = ("client", "future", "enqueued_at")
+
+    def __init__(self, client: str, future: "asyncio.Future[None]") -> None:
+        self.client = client
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """Grants LLM slots by priority class with per-client fair share."""
+
+    def __init__(
+        self,
+        *,
+        max_inflight: int = 64,
+        max_per_client: int = 16,
+        max_queued_per_client: int = 64,
+        policies: Optional[Dict[str, ClassPolicy]] = None,
+    ) -> None:
+        self.max_inflight = max_inflight
+        self.max_per_client = max_per_client
+        self.max_queued_per_client = max_queued_per_client
+        self.policies = policies or {name: ClassPolicy.from_env(name) for name in PRIORITY_CLASSES}
+        self._queues: Dict[str, Deque[_Waiter]] = {name: deque() for name in PRIORITY_CLASSES}
+        self._inflight = 0
+        self._client_inflight: Dict[str, int] = {}
+        self._client_queued: Dict[str, int] = {}
+        self._hold_ewma = 1.0  # seconds a slot is typically held, for Retry-After
+        self.shed: Dict[Tuple[str, str], int] = {}
+        self.admitted: Dict[str, int] = {name: 0 for name in PRIORITY_CLASSES}
+        self._shed_hooks: List[Callable[[str, str], None]] = []
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Build a controller configured from ADMISSION_* variables."""
+
+        return cls(
+            max_inflight=int(os.getenv("ADMISSION_MAX_INFLIGHT", "64")),
+            max_per_client=int(os.getenv("ADMISSION_MAX_PER_CLIENT", "16")),
+            max_queued_per_client=int(os.getenv("ADMISSION_MAX_QUEUED_PER_CLIENT", "64")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_inflight > 0
+
+    def add_shed_hook(self, hook: Callable[[str, str], None]) -> None:
+        """Register a callback invoked with the priority class and reason of every shed call."""
+
+        self._shed_hooks.append(hook)
+
+    @asynccontextmanager
+    async def slot(self, priority_class: Optional[str] = None, client: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold one LLM slot for the duration of the block.
+
+        Class and client default to the values the middleware set for the current request.
+        """
+
+        if not self.enabled:
+            yield
+            return
+        priority_class = priority_class or _request_class.get()
+        client = client or _request_client.get()
+        with tracing.phase("admission_wait"):
+            await self._acquire(priority_class, client)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._hold_ewma += 0.1 * (time.monotonic() - started - self._hold_ewma)
+            self._release(client)
+
+    def queued(self) -> Dict[str, int]:
+        return {name: len(queue) for name, queue in self._queues.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": self._inflight,
+            "max_inflight": self.max_inflight,
+            "queued": self.queued(),
+            "admitted": dict(self.admitted),
+            "shed": {f"{name}:{reason}": count for (name, reason), count in self.shed.items()},
+        }
+
+    async def _acquire(self, priority_class: str, client: str) -> None:
+        policy = self.policies[priority_class]
+        queue = self._queues[priority_class]
+        if self._can_run(client) and not self._has_eligible_waiters_at_or_above(priority_class):
+            self._grant(priority_class, client)
+            return
+        if policy.max_queue and len(queue) >= policy.max_queue:
+            raise self._reject(priority_class, "queue_full")
+        if self.max_queued_per_client and self._client_queued.get(client, 0) >= self.max_queued_per_client:
+            raise self._reject(priority_class, "client_limit")
+
+        waiter = _Waiter(client, asyncio.get_running_loop().create_future())
+        queue.append(waiter)
+        self._client_queued[client] = self._client_queued.get(client, 0) + 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), policy.max_wait or None)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we gave up: hand the slot back before leaving.
+                self._release(client)
+            else:
+                waiter.future.cancel()
+                self._forget(priority_class, waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            raise self._reject(priority_class, "queue_timeout") from None
+
+    def _release(self, client: str) -> None:
+        self._inflight -= 1
+        remaining = self._client_inflight.get(client, 1) - 1
+        if remaining:
+            self._client_inflight[client] = remaining
+        else:
+            self._client_inflight.pop(client, None)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the best eligible waiters."""
+
+        while self._inflight < self.max_inflight:
+            picked = self._pick()
+            if picked is None:
+                return
+            priority_class, waiter = picked
+            self._forget(priority_class, waiter)
+            self._grant(priority_class, waiter.client)
+            waiter.future.set_result(None)
+
+    def _pick(self) -> Optional[Tuple[str, _Waiter]]:
+        for priority_class in PRIORITY_CLASSES:
+            best: Optional[_Waiter] = None
+            best_load = 0
+            for waiter in self._queues[priority_class]:
+                if waiter.future.done() or not self._can_run(waiter.client):
+                    continue
+                load = self._client_inflight.get(waiter.client, 0)
+                if best is None or load < best_load:
+                    best, best_load = waiter, load
+                    if load == 0:
+                        break
+            if best is not None:
+                return priority_class, best
+        return None
+
+    def _can_run(self, client: str) -> bool:
+        if self._inflight >= self.max_inflight:
+            return False
+        return self._under_client_limit(client)
+
+    def _under_client_limit(self, client: str) -> bool:
+        return not self.max_per_client or self._client_inflight.get(client, 0) < self.max_per_client
+
+    def _has_eligible_waiters_at_or_above(self, priority_class: str) -> bool:
+        """Whether a waiter that could take a free slot now is queued at this class or above.
+
+        Waiters held back only by their own client's limit are skipped, so they
+        do not block other clients' fast path until the next release.
+        """
+
+        for name in PRIORITY_CLASSES:
+            for waiter in self._queues[name]:
+                if not waiter.future.done() and self._under_client_limit(waiter.client):
+                    return True
+            if name == priority_class:
+                return False
+        return False
+
+    def _grant(self, priority_class: str, client: str) -> None:
+        self._inflight += 1
+        self._client_inflight[client] = self._client_inflight.get(client, 0) + 1
+        self.admitted[priority_class] += 1
+
+    def _forget(self, priority_class: str, waiter: _Waiter) -> None:
+        try:
+            self._queues[priority_class].remove(waiter)
+        except ValueError:
+            return
+        remaining = self._client_queued.get(waiter.client, 1) - 1
+        if remaining:
+            self._client_queued[waiter.client] = remaining
+        else:
+            self._client_queued.pop(waiter.client, None)
+
+    def _reject(self, priority_class: str, reason: str) -> AdmissionRejected:
+        key = (priority_class, reason)
+        self.shed[key] = self.shed.get(key, 0) + 1
+        for hook in self._shed_hooks:
+            hook(priority_class, reason)
+        return AdmissionRejected(
+            priority_class, reason, self.retry_after(priority_class), self.policies[priority_class].fallback
+        )
+
+    def retry_after(self, priority_class: str) -> int:
+        """Seconds until the work queued at or above ``priority_class`` should have drained."""
+
+        ahead = 0
+        for name in PRIORITY_CLASSES:
+            ahead += len(self._queues[name])
+            if name == priority_class:
+                break
+        slots = max(1, self.max_inflight)
+        return max(1, min(60, math.ceil((ahead + self._inflight) * self._hold_ewma / slots)))
+
+
+def create_task(coro: Coroutine[Any, Any, T], priority_class: Optional[str] = None) -> "asyncio.Task[T]":
+    """Start ``coro`` with the request's client id and, if given, another priority class.
+
+    Speculative work (role-question prefetches) passes ``"background"`` so it
+    never competes with live interview turns for LLM slots.
+    """
+
+    context = contextvars.copy_context()
+    if priority_class is not None:
+        context.run(_request_class.set, priority_class)
+    task = asyncio.get_running_loop().create_task(coro, context=context)
+    _task_contexts[task] = context
+    return task
+
+
+def demote(task: "asyncio.Task[Any]", priority_class: str = "background") -> None:
+    """Move a task from :func:`create_task` to ``priority_class`` for the slots it takes from now on.
+
+    Used once no request is waiting for the task any more; a call it already
+    has queued keeps its place.
+    """
+
+    context = _task_contexts.get(task)
+    if context is not None and not task.done():
+        context.run(_request_class.set, priority_class)
+
+
+def classify_path(path: str) -> str:
+    for prefix, priority_class in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return priority_class
+    return "analysis"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that tags each request with its priority class and client id."""
+
+    def __init__(
+        self, app: Any, client_header: Optional[str] = None, trusted_proxies: Optional[Iterable[str]] = None
+    ) -> None:
+        self.app = app
+        self.client_header = (client_header or os.getenv("ADMISSION_CLIENT_HEADER", "x-client-id")).lower().encode()
+        if trusted_proxies is None:
+            trusted_proxies = os.getenv("ADMISSION_TRUSTED_PROXIES", "").split(",")
+        # Peers allowed to name the client in the header; "*" trusts any peer.
+        self.trusted_proxies = frozenset(proxy.strip() for proxy in trusted_proxies if proxy.strip())
+
+    def client_id(self, scope: Dict[str, Any]) -> str:
+        """The header's client id when the peer is a trusted proxy, otherwise the peer address."""
+
+        peer = (scope.get("client") or ("unknown",))[0]
+        if peer in self.trusted_proxies or "*" in self.trusted_proxies:
+            for name, value in scope["headers"]:
+                if name == self.client_header and value:
+                    return value.decode("latin-1")
+        return peer
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        client = self.client_id(scope)
+        class_token = _request_class.set(classify_path(scope.get("path", "")))
+        client_token = _request_client.set(client)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_class.reset(class_token)
+            _request_client.reset(client_token)
+
+
+async def rejected_response(request: Request, exc: AdmissionRejected) -> JSONResponse:
+    """Exception handler turning a shed call into 503 with ``Retry-After``."""
+
+    return JSONResponse(
+        {"detail": "Server is busy; please retry shortly.", "reason": exc.reason},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
@@ -0,0 +1,124 @@
+"""Server-side handles for job analyses.
+
+``/analyze-job`` registers each result under its content hash and returns that
+id, so ``/start-interview`` can reference the analysis instead of uploading it
+again. Every handle keeps the validated model and its pre-serialized JSON
+response body, so repeated analyses are answered without re-validating or
+re-encoding anything. With a shared session store (SQLite or Redis) the body
+is written there as well, so a /start-interview served by another worker can
+still resolve the id; those reads and writes run on a worker thread, as the
+shared stores block on SQLite locks or Redis round trips.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from models.job_models import JobAnalysisResult
+from services.interning import job_analysis_key
+from services.session_store import SessionStore
+
+_IDENTITY_CACHE_SIZE = 1024
+
+
+class AnalysisHandle:
+    """A stored analysis, its content-hash id and its JSON response body."""
+
+    __slots__ = ("analysis_id", "analysis", "body")
+
+    def __init__(self, analysis_id: str, analysis: JobAnalysisResult, body: bytes) -> None:
+        self.analysis_id = analysis_id
+        self.analysis = analysis
+        self.body = body
+
+
+class AnalysisHandleStore:
+    """LRU+TTL map of content-hash ids to analysis handles, backed by the shared session store."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 4096,
+        ttl_seconds: float = 24 * 60 * 60,
+        shared: Optional[SessionStore] = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._shared = shared
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, AnalysisHandle]]" = OrderedDict()
+        # The job cache hands back the same dict on every hit, so remember handles by identity too.
+        self._by_identity: "OrderedDict[int, Tuple[Dict[str, Any], AnalysisHandle]]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls, shared: Optional[SessionStore] = None) -> "AnalysisHandleStore":
+        """Build a store configured from ANALYSIS_HANDLE_* environment variables."""
+
+        return cls(
+            max_entries=int(os.getenv("ANALYSIS_HANDLE_MAX_ENTRIES", "4096")),
+            ttl_seconds=float(os.getenv("ANALYSIS_HANDLE_TTL_SECONDS", str(24 * 60 * 60))),
+            shared=shared,
+        )
+
+    async def register(self, normalized: Dict[str, Any]) -> AnalysisHandle:
+        """Return the handle for a normalized analysis dict, creating it on first sight."""
+
+        cached = self._by_identity.get(id(normalized))
+        if cached is not None and cached[0] is normalized and self._get_local(cached[1].analysis_id) is cached[1]:
+            return cached[1]
+
+        analysis = JobAnalysisResult(**normalized)
+        analysis_id = job_analysis_key(analysis)
+        handle = self._get_local(analysis_id)
+        if handle is None:
+            payload = dict(analysis.model_dump(), analysis_id=analysis_id)
+            body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            handle = self._remember(AnalysisHandle(analysis_id, analysis, body))
+            if self._shared is not None:
+                await asyncio.to_thread(self._shared.put_analysis, analysis_id, body, self._ttl)
+
+        with self._lock:
+            self._by_identity[id(normalized)] = (normalized, handle)
+            if len(self._by_identity) > _IDENTITY_CACHE_SIZE:
+                self._by_identity.popitem(last=False)
+        return handle
+
+    async def get(self, analysis_id: str) -> Optional[AnalysisHandle]:
+        """Resolve an id locally, then from the shared store another worker may have written."""
+
+        handle = self._get_local(analysis_id)
+        if handle is not None or self._shared is None:
+            return handle
+        body = await asyncio.to_thread(self._shared.get_analysis, analysis_id)
+        if body is None:
+            return None
+        payload = json.loads(body)
+        payload.pop("analysis_id", None)
+        return self._remember(AnalysisHandle(analysis_id, JobAnalysisResult(**payload), bytes(body)))
+
+    def _remember(self, handle: AnalysisHandle) -> AnalysisHandle:
+        with self._lock:
+            self._entries[handle.analysis_id] = (time.monotonic(), handle)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def _get_local(self, analysis_id: str) -> Optional[AnalysisHandle]:
+        with self._lock:
+            entry = self._entries.get(analysis_id)
+            if entry is None:
+                return None
+            stored_at, handle = entry
+            if self._ttl and time.monotonic() - stored_at > self._ttl:
+                del self._entries[analysis_id]
+                return None
+            self._entries.move_to_end(analysis_id)
+            return handle
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,351 @@
+"""Persistent job-analysis queue drained by a bounded in-process worker pool.
+
+Submissions are written to SQLite (WAL) and acknowledged immediately with a
+job id; ``workers`` asyncio tasks claim queued rows one at a time, so
+throughput is set by the worker count rather than by how many client
+connections stay open. Several processes may drain the same file: a claimed
+row records its owner and a lease that the owner's heartbeat keeps renewing,
+and only rows whose lease has run out (their owner crashed) are re-queued.
+Finished rows are purged after the retention period.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (description, final_attempt) -> (analysis, used_fallback)
+Processor = Callable[[str, bool], Awaitable[Tuple[Dict[str, Any], bool]]]
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFullError(RuntimeError):
+    """Raised when accepting more work would exceed the pending limit."""
+
+
+@dataclass
+class AnalysisJob:
+    """Snapshot of one queued job-analysis request."""
+
+    job_id: str
+    status: str
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    fallback: bool = False
+
+
+class AnalysisQueue:
+    """SQLite-backed FIFO of job descriptions with retrying workers.
+
+    ``processor(description, final_attempt)`` returns the analysis and
+    whether it is a fallback; any exception counts as a failed attempt and is
+    retried after ``retry_delay`` until ``max_attempts`` is reached.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        processor: Processor,
+        *,
+        workers: int = 4,
+        max_attempts: int = 3,
+        retry_delay: float = 2.0,
+        max_pending: int = 10_000,
+        retention_seconds: float = 24 * 60 * 60,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0,
+        owner: Optional[str] = None,
+    ) -> None:
+        self.path = path
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._processor = processor
+        self._workers = max(1, workers)
+        self._max_attempts = max(1, max_attempts)
+        self._retry_delay = retry_delay
+        self._max_pending = max_pending
+        self._retention = retention_seconds
+        self._poll_interval = poll_interval
+        self._lease = max(lease_seconds, 3 * poll_interval)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._tasks: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @classmethod
+    def from_env(cls, processor: Processor) -> "AnalysisQueue":
+        """Build a queue configured from ANALYSIS_QUEUE_* environment variables."""
+
+        return cls(
+            os.getenv("ANALYSIS_QUEUE_PATH", "analysis_queue.db"),
+            processor,
+            workers=int(os.getenv("ANALYSIS_QUEUE_WORKERS", "4")),
+            max_attempts=int(os.getenv("ANALYSIS_QUEUE_MAX_ATTEMPTS", "3")),
+            retry_delay=float(os.getenv("ANALYSIS_QUEUE_RETRY_DELAY_SECONDS", "2")),
+            max_pending=int(os.getenv("ANALYSIS_QUEUE_MAX_PENDING", "10000")),
+            retention_seconds=float(os.getenv("ANALYSIS_QUEUE_RETENTION_SECONDS", str(24 * 60 * 60))),
+            lease_seconds=float(os.getenv("ANALYSIS_QUEUE_LEASE_SECONDS", "60")),
+        )
+
+    def open(self) -> None:
+        """Open (and if needed create) the database; called from the app lifespan, idempotent."""
+
+        with self._lock:
+            if self._conn is not None:
+                return
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_jobs ("
+                "job_id TEXT PRIMARY KEY, description TEXT NOT NULL, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, fallback INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, available_at REAL NOT NULL, updated_at REAL NOT NULL, "
+                "owner TEXT, lease_until REAL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(analysis_jobs)")}
+            for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+                if column not in columns:  # databases created before leases existed
+                    conn.execute(f"ALTER TABLE analysis_jobs ADD COLUMN {column} {kind}")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS analysis_jobs_ready ON analysis_jobs (status, available_at, created_at)"
+            )
+            self._conn = conn
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("Analysis queue is not open")
+        return self._conn
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def submit(self, description: str) -> str:
+        return (await self.submit_many([description]))[0]
+
+    async def submit_many(self, descriptions: Sequence[str]) -> List[str]:
+        """Persist every description in one transaction and return their job ids."""
+
+        job_ids = await asyncio.to_thread(self._insert, descriptions)
+        self.start()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_ids
+
+    async def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def stats(self) -> Dict[str, int]:
+        counts = await asyncio.to_thread(self._stats)
+        counts["workers"] = sum(1 for task in self._tasks if not task.done())
+        return counts
+
+    # SQLite calls below block for up to the connection timeout while another
+    # process holds the write lock, so they only ever run on worker threads.
+
+    def _insert(self, descriptions: Sequence[str]) -> List[str]:
+        now = time.time()
+        rows = [(uuid.uuid4().hex, description, QUEUED, now, now, now) for description in descriptions]
+        with self._lock:
+            (pending,) = self.db.execute(
+                "SELECT COUNT(*) FROM analysis_jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()
+            if pending + len(rows) > self._max_pending:
+                raise QueueFullError(f"Analysis queue is full ({pending} pending)")
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                "INSERT INTO analysis_jobs (job_id, description, status, created_at, available_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.db.execute("COMMIT")
+        return [row[0] for row in rows]
+
+    def _get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT status, attempts, result, error, fallback FROM analysis_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, attempts, result, error, fallback = row
+        return AnalysisJob(
+            job_id=job_id,
+            status=status,
+            attempts=attempts,
+            result=json.loads(result) if result else None,
+            error=error,
+            fallback=bool(fallback),
+        )
+
+    def _stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self.db.execute("SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+    def start(self) -> None:
+        """Spawn the worker pool on the running loop; a no-op if already running, not open, or no loop."""
+
+        if self.running or self._conn is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._worker(index)) for index in range(self._workers)]
+        self._heartbeat = loop.create_task(self._renew_leases())
+
+    async def stop(self) -> None:
+        tasks = [*self._tasks, *([self._heartbeat] if self._heartbeat else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._heartbeat = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def _worker(self, index: int) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await self._run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A locked or broken database must not silently shrink the pool.
+                logger.exception("analysis queue worker %d failed; retrying", index)
+                await asyncio.sleep(self._poll_interval)
+
+    async def _run_once(self) -> None:
+        assert self._wakeup is not None
+        claimed = await asyncio.to_thread(self._claim)
+        if claimed is None:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self._requeue_expired)
+                await asyncio.to_thread(self._purge)
+            return
+
+        job_id, description, attempts = claimed
+        final = attempts >= self._max_attempts
+        try:
+            result, fallback = await self._processor(description, final)
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self._release, job_id)
+            raise
+        except Exception as exc:
+            logger.warning("analysis job %s attempt %d failed: %s", job_id, attempts, exc)
+            await asyncio.to_thread(self._fail, job_id, str(exc) or type(exc).__name__, retry=not final)
+        else:
+            await asyncio.to_thread(self._complete, job_id, result, fallback)
+
+    async def _renew_leases(self) -> None:
+        """Heartbeat: push out the lease on every row this queue is processing."""
+
+        while True:
+            await asyncio.sleep(self._lease / 3)
+            try:
+                await asyncio.to_thread(self._renew)
+            except Exception:
+                logger.exception("analysis queue lease renewal failed")
+
+    def _renew(self) -> None:
+        with self._lock:
+            self.db.execute(
+                "UPDATE analysis_jobs SET lease_until = ? WHERE status = ? AND owner = ?",
+                (time.time() + self._lease, RUNNING, self.owner),
+            )
+
+    def _claim(self) -> Optional[tuple]:
+        now = time.time()
+        with self._lock:
+            return self.db.execute(
+                "UPDATE analysis_jobs SET status = ?, attempts = attempts + 1, owner = ?, lease_until = ?, "
+                "updated_at = ? "
+                "WHERE job_id = (SELECT job_id FROM analysis_jobs WHERE status = ? AND available_at <= ? "
+                "ORDER BY created_at LIMIT 1) "
+                "RETURNING job_id, description, attempts",
+                (RUNNING, self.owner, now + self._lease, now, QUEUED, now),
+            ).fetchone()
+
+    def _requeue_expired(self) -> int:
+        """Put back rows whose owner stopped renewing its lease, i.e. crashed mid-job."""
+
+        now = time.time()
+        with self._lock:
+            return self.db.execute(
+                "UPDATE analysis_jobs SET status = ?, owner = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)",
+                (QUEUED, now, RUNNING, now),
+            ).rowcount
+
+    # Finishing updates match on the owner so a worker whose lease already
+    # expired cannot overwrite the row another worker has since claimed.
+
+    def _complete(self, job_id: str, result: Dict[str, Any], fallback: bool) -> None:
+        with self._lock:
+            self.db.execute(
+                "UPDATE analysis_jobs SET status = ?, result = ?, fallback = ?, error = NULL, owner = NULL, "
+                "lease_until = NULL, updated_at = ? WHERE job_id = ? AND status = ? AND owner = ?",
+                (
+                    DONE,
+                    json.dumps(result, separators=(",", ":")),
+                    int(fallback),
+                    time.time(),
+                    job_id,
+                    RUNNING,
+                    self.owner,
+                ),
+            )
+
+    def _fail(self, job_id: str, error: str, *, retry: bool) -> None:
+        now = time.time()
+        with self._lock:
+            self.db.execute(
+                "UPDATE analysis_jobs SET status = ?, error = ?, available_at = ?, owner = NULL, lease_until = NULL, "
+                "updated_at = ? WHERE job_id = ? AND status = ? AND owner = ?",
+                (QUEUED if retry else FAILED, error, now + self._retry_delay, now, job_id, RUNNING, self.owner),
+            )
+
+    def _release(self, job_id: str) -> None:
+        """Put a job interrupted by shutdown back in line without charging the attempt."""
+
+        with self._lock:
+            self.db.execute(
+                "UPDATE analysis_jobs SET status = ?, attempts = attempts - 1, owner = NULL, lease_until = NULL, "
+                "updated_at = ? WHERE job_id = ? AND status = ? AND owner = ?",
+                (QUEUED, time.time(), job_id, RUNNING, self.owner),
+            )
+
+    def _purge(self) -> None:
+        if not self._retention:
+            return
+        with self._lock:
+            self.db.execute(
+                "DELETE FROM analysis_jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, time.time() - self._retention),
+            )
@@ -0,0 +1,216 @@
+"""Near-duplicate cache for STAR evaluations.
+
+Candidates often resubmit an answer after small edits. Entries are scoped by
+(question, job analysis hash, mode) and matched on a MinHash signature of the
+answer's word shingles. A banded LSH index turns lookups into a handful of
+bucket probes, so a near-duplicate above the similarity threshold is found in
+constant time regardless of how many answers are cached. Signatures are
+computed with NumPy over every permutation at once; callers sign an answer
+once and pass the signature to both :meth:`AnswerEvaluationCache.get` and
+:meth:`AnswerEvaluationCache.set`.
+"""
+from __future__ import annotations
+
+import os
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+_WORD_RE = re.compile(r"\w+")
+# Largest prime below 2**32: with 32-bit shingles and parameters, a * x + b
+# stays below 2**64, so the permutations are exact in uint64 arithmetic.
+_PRIME = 4294967291
+_SHINGLE_WORDS = 3
+
+Signature = Tuple[int, ...]
+
+Scope = Tuple[str, str, str]
+BandKey = Tuple[Scope, int, Signature]
+
+
+def answer_shingles(answer: str) -> Set[int]:
+    """Hashed, case-insensitive word 3-grams of ``answer``."""
+
+    words = _WORD_RE.findall(answer.lower())
+    if len(words) < _SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {
+        zlib.crc32(" ".join(words[index : index + _SHINGLE_WORDS]).encode("utf-8"))
+        for index in range(len(words) - _SHINGLE_WORDS + 1)
+    }
+
+
+class MinHasher:
+    """Fixed family of universal hash permutations producing MinHash signatures."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._a = np.array([a for a, _ in params], dtype=np.uint64)[:, None]
+        self._b = np.array([b for _, b in params], dtype=np.uint64)[:, None]
+
+    def signature(self, shingles: Set[int]) -> Signature:
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))[None, :]
+        return tuple(((self._a * values + self._b) % _PRIME).min(axis=1).tolist())
+
+
+def estimate_similarity(left: Signature, right: Signature) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+@dataclass
+class AnswerCacheStats:
+    """Counters describing near-duplicate cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+@dataclass
+class _Entry:
+    scope: Scope
+    signature: Signature
+    evaluation: Dict[str, Any]
+    stored_at: float
+
+
+class AnswerEvaluationCache:
+    """LRU+TTL cache of evaluations with a banded MinHash LSH index.
+
+    Signatures of ``bands * rows`` values are split into ``bands`` slices;
+    two answers become candidates when any slice matches exactly, then the
+    full signature decides whether they clear ``threshold``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 4096,
+        ttl_seconds: float = 60 * 60,
+        threshold: float = 0.8,
+        bands: int = 16,
+        rows: int = 4,
+    ) -> None:
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self.threshold = threshold
+        self._bands = bands
+        self._rows = rows
+        self._hasher = MinHasher(bands * rows)
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[BandKey, Set[int]] = {}
+        self._next_id = 0
+        self._stats = AnswerCacheStats()
+
+    @classmethod
+    def from_env(cls) -> "AnswerEvaluationCache":
+        """Build a cache configured from ANSWER_CACHE_* environment variables."""
+
+        return cls(
+            max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "4096")),
+            ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(60 * 60))),
+            threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.8")),
+            bands=int(os.getenv("ANSWER_CACHE_BANDS", "16")),
+            rows=int(os.getenv("ANSWER_CACHE_ROWS", "4")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    def sign(self, answer: str) -> Optional[Signature]:
+        """MinHash signature of ``answer``, or None when it has no words or the cache is off."""
+
+        if not self.enabled:
+            return None
+        shingles = answer_shingles(answer)
+        return self._hasher.signature(shingles) if shingles else None
+
+    def get(
+        self, question: str, job_key: str, mode: str, signature: Optional[Signature]
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return the cached evaluation of the most similar answer and its similarity."""
+
+        if not self.enabled or signature is None:
+            return None
+        scope = _scope(question, job_key, mode)
+
+        best: Optional[Tuple[float, int]] = None
+        seen: Set[int] = set()
+        now = time.monotonic()
+        for band_key in self._band_keys(scope, signature):
+            for entry_id in tuple(self._buckets.get(band_key, ())):
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                entry = self._entries[entry_id]
+                if self._ttl and now - entry.stored_at > self._ttl:
+                    self._remove(entry_id)
+                    continue
+                similarity = estimate_similarity(signature, entry.signature)
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, entry_id)
+
+        if best is None:
+            self._stats.misses += 1
+            return None
+        similarity, entry_id = best
+        self._entries.move_to_end(entry_id)
+        self._stats.hits += 1
+        return self._entries[entry_id].evaluation, similarity
+
+    def set(
+        self, question: str, job_key: str, mode: str, signature: Optional[Signature], evaluation: Dict[str, Any]
+    ) -> None:
+        if not self.enabled or signature is None:
+            return
+        scope = _scope(question, job_key, mode)
+        entry_id = self._next_id
+        self._next_id += 1
+        entry = _Entry(scope, signature, evaluation, time.monotonic())
+        self._entries[entry_id] = entry
+        for band_key in self._band_keys(scope, entry.signature):
+            self._buckets.setdefault(band_key, set()).add(entry_id)
+        while len(self._entries) > self._max_entries:
+            self._remove(next(iter(self._entries)))
+            self._stats.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        self._stats.size = len(self._entries)
+        return asdict(self._stats)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+
+    def _band_keys(self, scope: Scope, signature: Signature) -> List[BandKey]:
+        rows = self._rows
+        return [(scope, band, signature[band * rows : (band + 1) * rows]) for band in range(self._bands)]
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for band_key in self._band_keys(entry.scope, entry.signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[band_key]
+
+
+def _scope(question: str, job_key: str, mode: str) -> Scope:
+    return (" ".join(question.lower().split()), job_key, mode)
@@ -0,0 +1,143 @@
+"""Per-request latency budgets and results that finish after the response.
+
+Each endpoint has a budget from ``DEADLINE_<ENDPOINT>_SECONDS`` (``0``
+disables it) that clients may override with the ``X-Request-Deadline-Ms``
+header, capped by ``DEADLINE_MAX_SECONDS``. A small margin is held back so
+the deterministic fallback can still be built and sent within the budget.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+
+_DEFAULT_BUDGETS = {
+    "start_interview": 15.0,
+    "evaluate_answer": 25.0,
+}
+
+
+class Deadline:
+    """Monotonic-clock budget for one request; ``None`` means unbounded."""
+
+    __slots__ = ("budget", "margin", "_started")
+
+    def __init__(self, budget: Optional[float], margin: float = 0.0) -> None:
+        self.budget = budget
+        self.margin = margin
+        self._started = time.monotonic()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left for upstream work, after reserving the margin."""
+
+        if self.budget is None:
+            return None
+        return max(0.0, self.budget - self.margin - (time.monotonic() - self._started))
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+
+def endpoint_budget(endpoint: str) -> Optional[float]:
+    """Configured budget in seconds for ``endpoint``, or ``None`` when disabled."""
+
+    raw = os.getenv(f"DEADLINE_{endpoint.upper()}_SECONDS")
+    budget = float(raw) if raw else _DEFAULT_BUDGETS.get(endpoint, 0.0)
+    return budget if budget > 0 else None
+
+
+def request_deadline(endpoint: str, header_ms: Optional[str] = None) -> Deadline:
+    """Build the deadline for a request, honouring a client override header."""
+
+    budget = endpoint_budget(endpoint)
+    if header_ms:
+        try:
+            requested = float(header_ms) / 1000
+        except ValueError:
+            requested = 0.0
+        if requested > 0:
+            budget = min(requested, float(os.getenv("DEADLINE_MAX_SECONDS", "120")))
+    return Deadline(budget, margin=float(os.getenv("DEADLINE_MARGIN_SECONDS", "0.05")))
+
+
+@dataclass
+class DeferredResult:
+    """State of work that outlived the request which started it."""
+
+    status: str  # "pending", "ready" or "failed"
+    value: Any = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+
+
+class DeferredResults:
+    """Bounded registry of background tasks whose results can be fetched later."""
+
+    def __init__(self, *, max_entries: int = 10_000, ttl_seconds: float = 15 * 60) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[str, DeferredResult]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_env(cls) -> "DeferredResults":
+        return cls(
+            max_entries=int(os.getenv("DEFERRED_RESULTS_MAX_ENTRIES", "10000")),
+            ttl_seconds=float(os.getenv("DEFERRED_RESULTS_TTL_SECONDS", str(15 * 60))),
+        )
+
+    def track(self, task: "asyncio.Future[Any]", finalize: Callable[[Any], Any]) -> str:
+        """Register ``task`` and return an id; ``finalize`` maps its result to the stored value."""
+
+        result_id = uuid.uuid4().hex
+        entry = DeferredResult(status="pending", created_at=time.monotonic())
+        self._entries[result_id] = entry
+        self._tasks[result_id] = task
+        self._trim()
+
+        def _done(finished: "asyncio.Future[Any]") -> None:
+            self._tasks.pop(result_id, None)
+            if finished.cancelled():
+                entry.status, entry.error = "failed", "cancelled"
+                return
+            exc = finished.exception()
+            if exc is not None:
+                entry.status, entry.error = "failed", str(exc) or type(exc).__name__
+                return
+            try:
+                entry.value = finalize(finished.result())
+            except Exception as finalize_exc:  # pragma: no cover - defensive branch
+                entry.status, entry.error = "failed", str(finalize_exc)
+            else:
+                entry.status = "ready"
+
+        task.add_done_callback(_done)
+        return result_id
+
+    def get(self, result_id: str) -> Optional[DeferredResult]:
+        entry = self._entries.get(result_id)
+        if entry is not None and self._ttl and time.monotonic() - entry.created_at > self._ttl:
+            self._drop(result_id)
+            return None
+        return entry
+
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def _trim(self) -> None:
+        while len(self._entries) > self._max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, result_id: str) -> None:
+        self._entries.pop(result_id, None)
+        task = self._tasks.pop(result_id, None)
+        if task is not None:
+            task.cancel()
@@ -0,0 +1,524 @@
+"""Columnar store of graded answers for score analytics.
+
+Each graded answer becomes one row of five typed columns: score, mode,
+question ID, job hash and timestamp. Every column is its own raw binary file
+(``<column>.bin``) in the store directory. Rows are buffered in preallocated
+arrays and a background thread appends them one chunk at a time, so request
+handlers never write to disk. Several processes may share the directory:
+appends, and trimming a chunk torn by a crash, hold an exclusive ``flock`` on
+its ``.lock`` file, and row counts are always read back from the files rather
+than tracked per process. The store is off unless ``EVALUATION_STORE_DIR`` is
+set; :meth:`EvaluationStore.open` prepares the directory at startup (or on
+the writer thread if nobody did), so :meth:`~EvaluationStore.record` only
+ever touches memory. Queries memory-map the column files
+and aggregate them block by block with ``numpy.bincount``, so a scan over
+millions of rows never builds per-row Python objects. Job themes live in a
+small ``jobs.jsonl`` side table keyed by job hash.
+
+Question IDs are the pinned IDs of the fixed banks from
+:mod:`services.interning`; generated role questions are stored as ``-1``.
+NumPy is imported on first use rather than at import.
+"""
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from services.interning import QUESTION_BANK
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily at runtime
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODES: Tuple[str, ...] = ("behavioral", "general", "role")
+GROUP_BYS = ("mode", "question", "theme")
+MAX_SCORE = 5
+
+# Column name -> NumPy dtype string; the files are raw little-endian arrays.
+COLUMNS: Dict[str, str] = {
+    "score": "<u1",
+    "mode": "<u1",
+    "question_id": "<i2",
+    "job_hash": "<u8",
+    "timestamp": "<f8",
+}
+
+
+# Sealed buffer: (column arrays, row count, job records to write before the rows).
+_Chunk = Tuple[Dict[str, "np.ndarray"], int, List[Tuple[int, List[str]]]]
+
+
+def job_hash(job_key: str) -> int:
+    """Fold a hex job-analysis key into the 64-bit value stored in the ``job_hash`` column."""
+
+    return int(job_key[:16], 16)
+
+
+class EvaluationStore:
+    """Append-only columnar evaluation results with vectorized aggregates.
+
+    ``chunk_rows`` is the size of the in-memory append buffer; the writer
+    thread writes it out when full or once its oldest row is
+    ``flush_interval`` seconds old. Queries flush first and then scan
+    ``scan_rows`` rows at a time.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str],
+        *,
+        chunk_rows: int = 8192,
+        flush_interval: float = 5.0,
+        scan_rows: int = 1 << 22,
+        question_bank: Sequence[str] = QUESTION_BANK,
+    ) -> None:
+        self.directory = Path(directory) if directory else None
+        self.chunk_rows = max(1, chunk_rows)
+        self.flush_interval = flush_interval
+        self.scan_rows = max(1, scan_rows)
+        self.question_bank = tuple(question_bank)
+        self._cond = threading.Condition()  # guards the buffer, sealed chunks and the jobs table; never held for I/O
+        self._io_lock = threading.Lock()  # serializes this process's disk work and keeps its chunks in order
+        self._buffer: Optional[Dict[str, np.ndarray]] = None
+        self._buffered = 0
+        self._buffer_started = 0.0
+        self._opened = False
+        self._sealed: List[_Chunk] = []
+        self._jobs: Dict[int, List[str]] = {}
+        self._jobs_offset = 0
+        self._new_jobs: List[Tuple[int, List[str]]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+
+    @classmethod
+    def from_env(cls) -> "EvaluationStore":
+        """Build a store configured from EVALUATION_STORE_* variables; disabled unless a directory is set."""
+
+        return cls(
+            os.getenv("EVALUATION_STORE_DIR") or None,
+            chunk_rows=int(os.getenv("EVALUATION_STORE_CHUNK_ROWS", "8192")),
+            flush_interval=float(os.getenv("EVALUATION_STORE_FLUSH_SECONDS", "5")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def open(self) -> None:
+        """Create the directory, trim a chunk torn by a crash and load the jobs table; idempotent.
+
+        Blocks on the file lock, so the app calls it off the event loop during startup.
+        """
+
+        if self.directory is None:
+            return
+        with self._io_lock:
+            self._ensure_open()
+
+    def __len__(self) -> int:
+        self.open()
+        with self._cond:
+            pending = self._buffered + sum(rows for _, rows, _ in self._sealed)
+        with self._file_lock(exclusive=False):
+            return self._disk_rows() + pending
+
+    def record(
+        self,
+        *,
+        score: int,
+        mode: str,
+        question_id: int,
+        job_key: str,
+        themes: Iterable[str] = (),
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Buffer one graded answer; ``question_id`` is a bank question ID or -1."""
+
+        if self.directory is None:
+            return
+        hashed = job_hash(job_key)
+        with self._cond:
+            self._ensure_buffer()  # memory only; the disk is opened by open() or the writer thread
+            if hashed not in self._jobs:
+                self._jobs[hashed] = list(themes)
+                self._new_jobs.append((hashed, self._jobs[hashed]))
+            if not self._buffered:
+                self._buffer_started = time.monotonic()
+            row = self._buffered
+            self._buffer["score"][row] = min(max(int(score), 1), MAX_SCORE)
+            self._buffer["mode"][row] = MODES.index(mode)
+            self._buffer["question_id"][row] = question_id
+            self._buffer["job_hash"][row] = hashed
+            self._buffer["timestamp"][row] = time.time() if timestamp is None else timestamp
+            self._buffered += 1
+            if self._buffered >= self.chunk_rows:
+                self._seal()
+            if self._thread is None or not self._thread.is_alive():
+                self._closing = False
+                self._thread = threading.Thread(target=self._run, name="evaluation-store", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def append(self, columns: Dict[str, Any], jobs: Optional[Dict[int, Sequence[str]]] = None) -> int:
+        """Append whole column arrays of equal length at once; returns the number of rows written.
+
+        ``jobs`` maps job hashes that appear in ``columns`` to their themes.
+        """
+
+        import numpy as np
+
+        if self.directory is None:
+            return 0
+        arrays = {name: np.ascontiguousarray(columns[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        lengths = {len(array) for array in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError("Evaluation columns must all have the same length")
+        with self._io_lock:
+            self._ensure_open()
+            with self._cond:
+                for hashed, themes in (jobs or {}).items():
+                    if hashed not in self._jobs:
+                        self._jobs[hashed] = list(themes)
+                        self._new_jobs.append((hashed, self._jobs[hashed]))
+                self._seal()
+                chunks, self._sealed = self._sealed, []
+            chunks.append((arrays, lengths.pop(), []))
+            self._write_chunks(chunks)
+        return len(arrays["score"])
+
+    def flush(self) -> None:
+        """Write any buffered rows to the column files; blocks, so call it off the event loop."""
+
+        if self.directory is None:
+            return
+        with self._io_lock:
+            self._ensure_open()
+            with self._cond:
+                self._seal()
+                chunks, self._sealed = self._sealed, []
+            self._write_chunks(chunks)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop the writer thread and write whatever is still buffered."""
+
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Read-only memory maps of every column, after flushing buffered rows."""
+
+        import numpy as np
+
+        self.flush()
+        if self.directory is None:
+            rows = 0
+        else:
+            with self._file_lock(exclusive=False):
+                rows = self._disk_rows()
+            with self._io_lock:
+                self._load_jobs()  # rows written by other processes may reference their jobs
+        if not rows:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        return {
+            name: np.memmap(self.directory / f"{name}.bin", dtype=dtype, mode="r", shape=(rows,))
+            for name, dtype in COLUMNS.items()
+        }
+
+    def aggregate(
+        self,
+        group_by: Optional[str] = None,
+        *,
+        mode: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        percentiles: Sequence[float] = (50, 90, 99),
+    ) -> Dict[str, Any]:
+        """Score count, mean, histogram and percentiles, overall or per group.
+
+        ``group_by`` is ``None``, "mode", "question" (fixed bank questions only)
+        or "theme" (an answer counts once for each theme of its job).
+        ``mode``, ``since`` and ``until`` filter rows before grouping.
+        """
+
+        import numpy as np
+
+        if group_by is not None and group_by not in GROUP_BYS:
+            raise ValueError(f"Unsupported group_by {group_by!r}; expected one of {', '.join(GROUP_BYS)}")
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"Unsupported mode {mode!r}")
+
+        columns = self.columns()
+        rows = len(columns["score"])
+        with self._cond:
+            jobs = dict(self._jobs)
+        labels, keys_for = self._grouping(group_by, jobs)
+        bins = MAX_SCORE + 1
+        hist = np.zeros((len(labels) if group_by != "theme" else len(jobs), bins), dtype=np.int64)
+        mode_code = MODES.index(mode) if mode is not None else None
+
+        for start in range(0, rows, self.scan_rows):
+            block = slice(start, min(start + self.scan_rows, rows))
+            scores = columns["score"][block]
+            keep = None
+            if mode_code is not None:
+                keep = columns["mode"][block] == mode_code
+            if since is not None or until is not None:
+                stamps = columns["timestamp"][block]
+                if since is not None:
+                    keep = _and(keep, stamps >= since)
+                if until is not None:
+                    keep = _and(keep, stamps < until)
+            keys, valid = keys_for(columns, block)
+            keep = _and(keep, valid)
+            if keep is not None:
+                scores, keys = scores[keep], keys[keep]
+            flat = keys.astype(np.int64) * bins + scores
+            hist += np.bincount(flat, minlength=hist.size).reshape(hist.shape)
+
+        matched = int(hist.sum())
+        if group_by == "theme":
+            hist = self._theme_histogram(hist, jobs, labels)
+        groups = _summarize(hist, labels, percentiles)
+        if group_by is not None:
+            groups = [group for group in groups if group["count"]]
+        return {"rows": rows, "matched": matched, "groups": groups}
+
+    def _grouping(self, group_by: Optional[str], jobs: Dict[int, List[str]]) -> Tuple[List[str], Any]:
+        """Group labels plus a function mapping a block of columns to (group index, valid mask)."""
+
+        import numpy as np
+
+        if group_by is None:
+            return ["all"], lambda columns, block: (np.zeros(block.stop - block.start, dtype=np.int64), None)
+        if group_by == "mode":
+            return list(MODES), lambda columns, block: (columns["mode"][block], None)
+        if group_by == "question":
+            bank = len(self.question_bank)
+
+            def _question_keys(columns: Dict[str, np.ndarray], block: slice) -> Tuple[np.ndarray, np.ndarray]:
+                ids = columns["question_id"][block]
+                valid = (ids >= 0) & (ids < bank)
+                return np.where(valid, ids, 0), valid
+
+            return list(self.question_bank), _question_keys
+
+        # Themes: histogram per job first, then fold jobs into their themes. Hashes map to job
+        # indexes through a direct-addressed table on their low bits (they are uniformly random);
+        # the few slots shared by two jobs fall back to a binary search.
+        known = np.array(sorted(jobs), dtype=np.uint64)
+        bits = max(10, min(22, (len(known) * 64).bit_length()))
+        mask = np.uint64((1 << bits) - 1)
+        table = np.full(1 << bits, -1, dtype=np.int32)
+        slots = (known & mask).astype(np.intp)
+        table[slots] = np.arange(len(known), dtype=np.int32)
+        shared, counts = np.unique(slots, return_counts=True)
+        table[shared[counts > 1]] = -2
+
+        def _job_keys(columns: Dict[str, np.ndarray], block: slice) -> Tuple[np.ndarray, np.ndarray]:
+            hashes = columns["job_hash"][block]
+            index = table[(hashes & mask).astype(np.intp)].astype(np.int64)
+            ambiguous = np.flatnonzero(index == -2)
+            if len(ambiguous):
+                index[ambiguous] = np.minimum(np.searchsorted(known, hashes[ambiguous]), len(known) - 1)
+            found = index >= 0
+            index[~found] = 0
+            valid = found & (known[index] == hashes) if len(known) else found
+            return index, valid
+
+        themes: Dict[str, str] = {}
+        for hashed in known.tolist():
+            for theme in jobs[hashed]:
+                themes.setdefault(_theme_key(theme), theme.strip())
+        return list(themes.values()), _job_keys
+
+    @staticmethod
+    def _theme_histogram(job_hist: np.ndarray, jobs: Dict[int, List[str]], labels: List[str]) -> np.ndarray:
+        import numpy as np
+
+        position = {_theme_key(label): index for index, label in enumerate(labels)}
+        membership = np.zeros((len(jobs), len(labels)), dtype=np.int64)
+        for row, hashed in enumerate(sorted(jobs)):
+            for theme in jobs[hashed]:
+                membership[row, position[_theme_key(theme)]] = 1
+        return membership.T @ job_hist
+
+    def _ensure_buffer(self) -> None:
+        import numpy as np
+
+        if self._buffer is None:
+            self._buffer = {name: np.zeros(self.chunk_rows, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+    def _ensure_open(self) -> None:
+        """Load the jobs table and trim column files to their common row count; call under ``_io_lock``.
+
+        Jobs recorded before this ran may be written to the table twice; loading keeps the first.
+        """
+
+        if self._opened:
+            return
+        import numpy as np
+
+        with self._cond:
+            self._ensure_buffer()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Writers hold the lock for a whole chunk, so uneven files under it can
+        # only be a chunk torn by a crash, never one another process is writing.
+        with self._file_lock(exclusive=True):
+            rows = self._disk_rows()
+            for name, dtype in COLUMNS.items():
+                path = self.directory / f"{name}.bin"
+                if path.exists() and path.stat().st_size != rows * np.dtype(dtype).itemsize:
+                    with path.open("r+b") as handle:
+                        handle.truncate(rows * np.dtype(dtype).itemsize)
+            jobs_path = self.directory / "jobs.jsonl"
+            if jobs_path.exists() and jobs_path.stat().st_size:
+                with jobs_path.open("r+b") as handle:
+                    handle.seek(-1, os.SEEK_END)
+                    if handle.read(1) != b"\n":
+                        handle.write(b"\n")  # terminate a record torn by a crash
+            self._load_jobs()
+        self._opened = True
+
+    def _disk_rows(self) -> int:
+        """Rows present in every column file; call with the file lock held."""
+
+        import numpy as np
+
+        sizes = []
+        for name, dtype in COLUMNS.items():
+            path = self.directory / f"{name}.bin"
+            sizes.append(path.stat().st_size // np.dtype(dtype).itemsize if path.exists() else 0)
+        return min(sizes)
+
+    def _load_jobs(self) -> None:
+        """Read job records appended since the last call, by this or another process; call under ``_io_lock``."""
+
+        jobs_path = self.directory / "jobs.jsonl"
+        if not jobs_path.exists():
+            return
+        loaded: List[Tuple[int, List[str]]] = []
+        with jobs_path.open("rb") as handle:
+            handle.seek(self._jobs_offset)
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break  # torn by a crash; re-read once it is terminated
+                self._jobs_offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                loaded.append((int(record["job_hash"]), list(record.get("themes") or [])))
+        with self._cond:
+            for hashed, themes in loaded:
+                self._jobs.setdefault(hashed, themes)
+
+    @contextlib.contextmanager
+    def _file_lock(self, *, exclusive: bool) -> Iterator[None]:
+        fd = os.open(self.directory / ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)  # releases the lock
+
+    def _seal(self) -> None:
+        """Queue the buffered rows (and new jobs) as a chunk and start a fresh buffer; call under ``_cond``."""
+
+        import numpy as np
+
+        if not self._buffered and not self._new_jobs:
+            return
+        self._sealed.append((self._buffer, self._buffered, self._new_jobs))
+        self._buffer = {name: np.zeros(self.chunk_rows, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._buffered = 0
+        self._new_jobs = []
+
+    def _run(self) -> None:
+        """Writer thread: write sealed chunks, and the buffer once its oldest row is ``flush_interval`` old."""
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._sealed or self._closing, self.flush_interval)
+                if self._closing:
+                    return  # close() flushes the rest
+                age = time.monotonic() - self._buffer_started
+                if not self._sealed and not (self._buffered and age >= self.flush_interval):
+                    continue
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("evaluation store flush failed")
+
+    def _write_chunks(self, chunks: List[_Chunk]) -> None:
+        if not chunks:
+            return
+        with self._file_lock(exclusive=True):
+            for arrays, rows, jobs in chunks:
+                # Jobs first, so every hash in the columns has its themes on disk.
+                if jobs:
+                    with (self.directory / "jobs.jsonl").open("a", encoding="utf-8") as handle:
+                        handle.write(
+                            "".join(
+                                json.dumps({"job_hash": hashed, "themes": themes}, ensure_ascii=False) + "\n"
+                                for hashed, themes in jobs
+                            )
+                        )
+                if not rows:
+                    continue
+                for name in COLUMNS:
+                    with (self.directory / f"{name}.bin").open("ab") as handle:
+                        handle.write(arrays[name][:rows].tobytes())
+
+
+def _and(left: Optional[np.ndarray], right: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return left & right
+
+
+def _theme_key(theme: str) -> str:
+    return " ".join(theme.split()).casefold()
+
+
+def _summarize(hist: np.ndarray, labels: List[str], percentiles: Sequence[float]) -> List[Dict[str, Any]]:
+    """Turn an (groups, score) count matrix into per-group summaries, vectorized across groups."""
+
+    import numpy as np
+
+    counts = hist.sum(axis=1)
+    totals = hist @ np.arange(hist.shape[1])
+    cumulative = hist.cumsum(axis=1)
+    ranks = {}
+    for pct in percentiles:
+        # Nearest-rank percentile: the lowest score whose cumulative count reaches the rank.
+        target = np.maximum(np.ceil(counts * pct / 100.0), 1)
+        ranks[f"p{pct:g}"] = (cumulative >= target[:, None]).argmax(axis=1)
+    groups = []
+    for index, label in enumerate(labels):
+        count = int(counts[index])
+        groups.append(
+            {
+                "key": label,
+                "count": count,
+                "mean": round(float(totals[index]) / count, 4) if count else None,
+                "histogram": {str(score): int(hist[index, score]) for score in range(1, hist.shape[1])},
+                "percentiles": {name: int(values[index]) if count else None for name, values in ranks.items()},
+            }
+        )
+    return groups
@@ -0,0 +1,162 @@
+"""Refcounted intern tables shared by every in-process session."""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from models.job_models import JobAnalysisResult
+from services.question_bank import BEHAVIORAL_QUESTIONS, GENERAL_QUESTIONS
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class RefCountedRegistry(Generic[K, V]):
+    """Map keys to shared values, freeing them once no long-lived holder remains.
+
+    Holders call :meth:`retain`/:meth:`release`. Entries whose refcount drops to
+    zero are parked in a bounded LRU instead of being dropped immediately, so
+    short-lived readers (e.g. states decoded from a shared store) can still
+    resolve recently used keys without owning a reference.
+    """
+
+    def __init__(self, idle_capacity: int = 4096) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[K, V] = {}
+        self._refcounts: Dict[K, int] = {}
+        self._idle: "OrderedDict[K, None]" = OrderedDict()
+        self._idle_capacity = idle_capacity
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+
+    def get(self, key: K) -> V:
+        try:
+            return self._values[key]
+        except KeyError:
+            raise KeyError(f"Interned value {key!r} is no longer registered") from None
+
+    def refcount(self, key: K) -> int:
+        return self._refcounts.get(key, 0)
+
+    def retain(self, key: K) -> None:
+        with self._lock:
+            if key not in self._values:
+                raise KeyError(f"Interned value {key!r} is no longer registered")
+            self._refcounts[key] = self._refcounts.get(key, 0) + 1
+            self._idle.pop(key, None)
+
+    def release(self, key: K) -> None:
+        with self._lock:
+            count = self._refcounts.get(key, 0) - 1
+            if count > 0:
+                self._refcounts[key] = count
+                return
+            if self._refcounts.pop(key, None) is not None:
+                self._park(key)
+
+    def _register(self, key: K, value: V) -> V:
+        """Insert ``value`` under ``key`` (or return the existing one) without retaining it."""
+
+        with self._lock:
+            existing = self._values.get(key)
+            if existing is not None:
+                if key in self._idle:
+                    self._idle.move_to_end(key)
+                return existing
+            self._values[key] = value
+            self._park(key)
+            return value
+
+    def _park(self, key: K) -> None:
+        self._idle[key] = None
+        self._idle.move_to_end(key)
+        while len(self._idle) > self._idle_capacity:
+            stale, _ = self._idle.popitem(last=False)
+            self._evict(stale)
+
+    def _evict(self, key: K) -> None:
+        self._values.pop(key, None)
+
+
+def job_analysis_key(job_analysis: JobAnalysisResult) -> str:
+    """Content hash of a job analysis, stable across processes."""
+
+    payload = json.dumps(job_analysis.model_dump(), separators=(",", ":"), sort_keys=True)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class JobAnalysisRegistry(RefCountedRegistry[str, JobAnalysisResult]):
+    """Interns job analyses by content hash so sessions share one object."""
+
+    def intern(self, job_analysis: JobAnalysisResult) -> str:
+        key = job_analysis_key(job_analysis)
+        self._register(key, job_analysis)
+        return key
+
+
+class QuestionRegistry(RefCountedRegistry[int, str]):
+    """Maps question text to small integer IDs.
+
+    IDs ``0..len(bank)-1`` are the fixed bank questions (behavioral, then
+    general) and are pinned forever; generated questions get higher IDs that
+    are recycled once released and evicted.
+    """
+
+    def __init__(self, bank: Tuple[str, ...], idle_capacity: int = 4096) -> None:
+        super().__init__(idle_capacity)
+        self.bank = bank
+        self._ids: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._next_id = len(bank)
+        for index, question in enumerate(bank):
+            self._values[index] = question
+            self._ids.setdefault(question, index)
+
+    def is_bank(self, question_id: int) -> bool:
+        return question_id < len(self.bank)
+
+    def intern(self, question: str) -> int:
+        with self._lock:
+            question_id = self._ids.get(question)
+            if question_id is None:
+                if self._free:
+                    question_id = self._free.pop()
+                else:
+                    question_id = self._next_id
+                    self._next_id += 1
+                self._ids[question] = question_id
+                self._values[question_id] = question
+                self._park(question_id)
+            elif question_id in self._idle:
+                self._idle.move_to_end(question_id)
+        return question_id
+
+    def lookup(self, question: str) -> Optional[int]:
+        return self._ids.get(question)
+
+    def retain(self, key: int) -> None:
+        if not self.is_bank(key):
+            super().retain(key)
+
+    def release(self, key: int) -> None:
+        if not self.is_bank(key):
+            super().release(key)
+
+    def _evict(self, key: int) -> None:
+        question = self._values.pop(key, None)
+        if question is not None:
+            self._ids.pop(question, None)
+            self._free.append(key)
+
+
+QUESTION_BANK: Tuple[str, ...] = tuple(BEHAVIORAL_QUESTIONS) + tuple(GENERAL_QUESTIONS)
+
+job_analyses = JobAnalysisRegistry()
+questions = QuestionRegistry(QUESTION_BANK)
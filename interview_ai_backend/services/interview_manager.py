@@ -1,71 +1,124 @@
 """Helpers for managing question banks and lightweight sessions."""
 from __future__ import annotations
 
+import asyncio
+import os
 import uuid
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from collections import deque
+from typing import AbstractSet, Any, Awaitable, Callable, Deque, Dict, Optional, Set
 
 from models.job_models import JobAnalysisResult
+from services import admission, interning
+from services.question_bank import BEHAVIORAL_QUESTIONS, GENERAL_QUESTIONS
+from services.session_store import (
+    InMemorySessionStore,
+    InterviewSessionState,
+    SessionStore,
+    create_session_store_from_env,
+)
+from services.transcript_log import TranscriptLog
 
-BEHAVIORAL_QUESTIONS = [
-    "Tell me about a time you faced a challenge at work or school.",
-    "Describe a time when you had to work under pressure.",
-    "Tell me about a time you took initiative.",
-    "Describe a time you worked on a team project.",
-    "Tell me about a conflict you had and how you resolved it.",
-    "Describe a time you solved a complex problem.",
-    "Tell me about a time you had to learn something quickly.",
-    "Describe a time you made a mistake and how you handled it.",
-    "Tell me about a time you had to persuade someone.",
-    "Describe a time you showed leadership.",
-]
-
-GENERAL_QUESTIONS = [
-    "Tell me about yourself.",
-    "Why do you want this job?",
-    "Why this company?",
-    "What are your strengths?",
-    "What is a weakness you're working on?",
-]
-
-
-@dataclass
-class InterviewSessionState:
-    """In-memory representation of an interview session."""
-
-    session_id: str
-    mode: str
-    job_analysis: JobAnalysisResult
-    pointer: int = 1  # index for the next fixed question (first question already served)
-    asked_questions: List[str] = field(default_factory=list)
+
+_PREFETCH_PRUNE_EVERY = 256
+_PRODUCE_ATTEMPTS = 3
+
+# Called with the job analysis and the questions the session already has or has queued.
+RoleQuestionFactory = Callable[[JobAnalysisResult, AbstractSet[str]], Awaitable[str]]
 
 
 class InterviewManager:
     """Provides question banks and tracks lightweight session state."""
 
-    def __init__(self) -> None:
-        self._sessions: Dict[str, InterviewSessionState] = {}
+    def __init__(
+        self,
+        role_question_factory: Optional[RoleQuestionFactory] = None,
+        prefetch_depth: Optional[int] = None,
+        store: Optional[SessionStore] = None,
+        transcript: Optional[TranscriptLog] = None,
+    ) -> None:
+        self._store = store if store is not None else create_session_store_from_env()
+        self._transcript = transcript if transcript is not None else TranscriptLog(None)
+        if isinstance(self._store, InMemorySessionStore) and self._store.on_evict is None:
+            self._store.on_evict = self._cancel_prefetch
         self._banks = {
             "behavioral": BEHAVIORAL_QUESTIONS,
             "general": GENERAL_QUESTIONS,
         }
+        self._role_question_factory = role_question_factory
+        if prefetch_depth is None:
+            prefetch_depth = int(os.getenv("ROLE_QUESTION_PREFETCH", "2"))
+        self._prefetch_depth = max(0, prefetch_depth)
+        self._prefetched: Dict[str, Deque[asyncio.Task]] = {}
+        self._claimed: Dict[str, Set[str]] = {}
+        self._created = 0
+
+    def create_session(
+        self, mode: str, job_analysis: JobAnalysisResult, initial_question: Optional[str] = None
+    ) -> str:
+        """Register a session; role sessions start prefetching questions immediately."""
 
-    def create_session(self, mode: str, job_analysis: JobAnalysisResult, initial_question: str) -> str:
         session_id = str(uuid.uuid4())
         state = InterviewSessionState(
             session_id=session_id,
             mode=mode,
             job_analysis=job_analysis,
             pointer=1,
-            asked_questions=[initial_question],
+            asked_questions=[initial_question] if initial_question else [],
         )
-        self._sessions[session_id] = state
+        self._store.put(state)
+        self._transcript.session_started(
+            session_id, mode, state.job_key, job_analysis.model_dump(), state.pointer
+        )
+        if initial_question:
+            self._transcript.question_asked(session_id, initial_question, state.pointer)
+        self._created += 1
+        if self._created % _PREFETCH_PRUNE_EVERY == 0:
+            self._prune_prefetch()
+        if mode == "role":
+            self._refill_prefetch(state)
         return session_id
 
+    @property
+    def store(self) -> SessionStore:
+        return self._store
+
+    @property
+    def transcript(self) -> TranscriptLog:
+        return self._transcript
+
+    def resume_sessions(self, max_age_seconds: Optional[float] = None) -> int:
+        """Rebuild sessions from the transcript log that the store no longer has.
+
+        Called once at startup; returns how many sessions were restored. The
+        log is compacted on the way, so the next startup replays only the
+        sessions live now. Prefetching for resumed role sessions starts on
+        their next turn.
+        """
+
+        restored = 0
+        for snapshot in self._transcript.compact(max_age_seconds).values():
+            if self._store.contains(snapshot.session_id):
+                continue
+            state = InterviewSessionState(
+                session_id=snapshot.session_id,
+                mode=snapshot.mode,
+                job_analysis=JobAnalysisResult.model_construct(**snapshot.job_analysis),
+                pointer=snapshot.pointer,
+                asked_questions=snapshot.questions,
+            )
+            self._store.put(state)
+            restored += 1
+        return restored
+
     def get_session(self, session_id: str) -> InterviewSessionState:
-        if session_id not in self._sessions:
+        state = self._store.get(session_id)
+        if state is None:
+            self._cancel_prefetch(session_id)
             raise ValueError("Session not found")
-        return self._sessions[session_id]
+        return state
+
+    def active_sessions(self) -> int:
+        return self._store.count()
 
     def next_fixed_question(self, session_id: str) -> str:
         state = self.get_session(session_id)
@@ -74,16 +127,109 @@ class InterviewManager:
             raise ValueError("No fixed question bank for this mode")
         question = bank[state.pointer % len(bank)]
         state.pointer += 1
-        state.asked_questions.append(question)
+        state.add_question(question)
+        self._store.put(state)
+        self._transcript.question_asked(session_id, question, state.pointer)
         return question
 
     def record_question(self, session_id: str, question: str) -> None:
         state = self.get_session(session_id)
-        state.asked_questions.append(question)
+        state.add_question(question)
+        self._store.put(state)
+        self._transcript.question_asked(session_id, question, state.pointer)
+
+    def record_answer(
+        self, session_id: str, question: str, answer: str, evaluation: Dict[str, Any], source: str
+    ) -> None:
+        """Append a graded answer to the session's transcript."""
+
+        self._transcript.answer_graded(session_id, question, answer, evaluation, source=source)
 
     def last_question(self, session_id: str) -> Optional[str]:
         state = self.get_session(session_id)
-        return state.asked_questions[-1] if state.asked_questions else None
+        if not state.question_ids:
+            return None
+        return interning.questions.get(state.question_ids[-1])
+
+    async def next_role_question(self, session_id: str, timeout: Optional[float] = None) -> str:
+        """Serve the next prefetched role question, generating one if none are queued.
+
+        With ``timeout``, raises :class:`asyncio.TimeoutError` if the question is
+        not ready in time; the pending generation is kept at the head of the
+        queue so a later turn can still use it.
+        """
+
+        state = self.get_session(session_id)
+        if self._role_question_factory is None:
+            raise ValueError("No role question generator configured")
+
+        queue = self._prefetched.get(session_id)
+        if queue:
+            task = queue.popleft()
+        else:
+            task = admission.create_task(self._produce_role_question(session_id, state.job_analysis))
+        # The question served now counts towards the depth, so a session never has more
+        # than ``prefetch_depth`` generations outstanding.
+        self._refill_prefetch(state, self._prefetch_depth - 1)
+
+        if timeout is not None:
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if not done:
+                admission.demote(task)  # a prefetch for a later turn now
+                self._prefetched.setdefault(session_id, deque()).appendleft(task)
+                raise asyncio.TimeoutError(f"Role question not ready within {timeout:.2f}s")
+        question = await task
+        # Re-read the state: other turns may have updated it while we awaited.
+        self.record_question(session_id, question)
+        return question
 
     def close_session(self, session_id: str) -> None:
-        self._sessions.pop(session_id, None)
+        self._store.delete(session_id)
+        self._cancel_prefetch(session_id)
+        self._transcript.session_ended(session_id)
+
+    def _cancel_prefetch(self, session_id: str) -> None:
+        for task in self._prefetched.pop(session_id, ()):
+            task.cancel()
+        self._claimed.pop(session_id, None)
+
+    async def _produce_role_question(self, session_id: str, job_analysis: JobAnalysisResult) -> str:
+        """Ask the factory for a question the session has neither asked nor queued yet.
+
+        Prefetches run concurrently, so two may pick the same stored question
+        while both await the retrieval index; the later one asks again with
+        the grown avoid set, a bounded number of times.
+        """
+
+        claimed = self._claimed.setdefault(session_id, set())
+        state = self._store.get(session_id)
+        asked = set(state.asked_questions) if state is not None else set()
+        for _ in range(_PRODUCE_ATTEMPTS):
+            question = await self._role_question_factory(job_analysis, claimed | asked)
+            if question not in claimed:
+                break
+        claimed.add(question)
+        return question
+
+    def _prune_prefetch(self) -> None:
+        """Drop prefetch queues whose sessions expired in a shared store."""
+
+        for session_id in list(self._prefetched):
+            if not self._store.contains(session_id):
+                self._cancel_prefetch(session_id)
+
+    def _refill_prefetch(self, state: InterviewSessionState, depth: Optional[int] = None) -> None:
+        """Top the session's queue of in-flight role questions back up to ``depth`` (the prefetch depth)."""
+
+        depth = self._prefetch_depth if depth is None else depth
+        if self._role_question_factory is None or depth <= 0:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        queue = self._prefetched.setdefault(state.session_id, deque())
+        while len(queue) < depth:
+            queue.append(
+                admission.create_task(self._produce_role_question(state.session_id, state.job_analysis), "background")
+            )
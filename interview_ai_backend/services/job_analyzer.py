@@ -0,0 +1,214 @@
+"""Deterministic, dependency-free job description analyzer.
+
+Used when the LLM is unavailable and as a low-latency first pass. Keywords are
+ranked by TF-IDF against a small bundled corpus of generic job postings, so
+boilerplate ("experience", "team", "benefits") sinks and role-specific terms
+rise. Term vectors are sparse and array-backed to keep large descriptions
+(hundreds of KB) within a few milliseconds.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import zlib
+from array import array
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_CORPUS_PATH = Path(__file__).parent / "data" / "background_corpus.txt"
+
+_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z+#]{3,}")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_BULLET_RE = re.compile(r"^\s*(?:[-*•·]|\d+[.)])\s*")
+_VALUES_LINE_RE = re.compile(r"^.*\b(?:value|values|culture|mission)\b.*$", re.IGNORECASE | re.MULTILINE)
+_COMPETENCY_SUFFIXES = ("ship", "ment")
+
+# Out-of-vocabulary terms are hashed into a fixed id space after the corpus vocabulary.
+_OOV_BUCKETS = 1 << 20
+
+STOPWORDS = frozenset(
+    """
+    about above across after again also among and any are because been before being below between
+    both but can could does doing down during each either else even every from further have having
+    here hers herself himself into itself just least less like made make many more most much must
+    near need needs often once only other ours over own same shall should some such than that the
+    their theirs them then there these they this those through under until upon very want well were
+    what when where which while whom whose will with within without would your yours yourself
+    able will etc
+    """.split()
+)
+
+
+class SparseVector:
+    """Sorted, array-backed sparse vector of term weights."""
+
+    __slots__ = ("indices", "values")
+
+    def __init__(self, indices: "array[int]", values: "array[float]") -> None:
+        self.indices = indices
+        self.values = values
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[int, float]]) -> "SparseVector":
+        ordered = sorted(items)
+        return cls(array("L", (index for index, _ in ordered)), array("d", (value for _, value in ordered)))
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+
+class JobAnalyzer:
+    """TF-IDF keyword ranking and heuristic section extraction."""
+
+    def __init__(self, background: Optional[Iterable[str]] = None) -> None:
+        documents = list(background) if background is not None else _load_corpus()
+        document_frequency: Counter = Counter()
+        for document in documents:
+            document_frequency.update({token.lower() for token in _TOKEN_RE.findall(document)})
+
+        self.vocabulary: Dict[str, int] = {term: index for index, term in enumerate(sorted(document_frequency))}
+        total = len(documents)
+        self._idf = array(
+            "d",
+            (math.log((1 + total) / (1 + document_frequency[term])) + 1.0 for term in sorted(document_frequency)),
+        )
+        self._oov_idf = math.log(1 + total) + 1.0
+
+    def term_id(self, term: str) -> int:
+        index = self.vocabulary.get(term)
+        if index is not None:
+            return index
+        return len(self.vocabulary) + (zlib.crc32(term.encode("utf-8")) & (_OOV_BUCKETS - 1))
+
+    def idf(self, term_id: int) -> float:
+        return self._idf[term_id] if term_id < len(self._idf) else self._oov_idf
+
+    def vectorize(self, text: str) -> SparseVector:
+        """TF-IDF vector of ``text`` with sublinear term frequency."""
+
+        counts = Counter(token.lower() for token in _TOKEN_RE.findall(text))
+        return SparseVector.from_items(
+            (term_id, (1.0 + math.log(count)) * self.idf(term_id))
+            for term_id, count in self._term_counts(counts).items()
+        )
+
+    def rank_keywords(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """Return distinct keywords ordered by TF-IDF weight, ties by first occurrence."""
+
+        tokens = _TOKEN_RE.findall(text)
+        lowered = list(map(str.lower, tokens))
+        counts = Counter(lowered)
+        for stopword in STOPWORDS.intersection(counts):
+            del counts[stopword]
+        # Built back to front so each term keeps the spelling of its first occurrence.
+        surfaces = dict(zip(reversed(lowered), reversed(tokens)))
+        order = {term: position for position, term in enumerate(dict.fromkeys(lowered))}
+
+        def _key(item: Tuple[str, int]) -> Tuple[float, int]:
+            term, count = item
+            return (-(1.0 + math.log(count)) * self.idf(self.term_id(term)), order[term])
+
+        if limit is None:
+            scored = sorted(counts.items(), key=_key)
+        else:
+            scored = heapq.nsmallest(limit, counts.items(), key=_key)
+        return [_display(surfaces[term]) for term, _ in scored]
+
+    def analyze(self, job_description: str) -> Dict[str, Any]:
+        """Return a job analysis dict with the same keys as the LLM output."""
+
+        raw_lines = [line.strip() for line in job_description.splitlines()]
+        bullets = _unique((_strip_bullet(line) for line in raw_lines if _BULLET_RE.match(line)), 6)
+        lines = _unique(map(_strip_bullet, raw_lines), 6)
+        sentences = list(islice(_iter_sentences(job_description), 6))
+
+        keywords = self.rank_keywords(job_description, limit=64)
+        skills = keywords[:6]
+        skill_set = {skill.lower() for skill in skills}
+
+        competencies = [kw for kw in keywords if kw.lower().endswith(_COMPETENCY_SUFFIXES)][:4]
+        if len(competencies) < 2:
+            chosen = set(competencies)
+            competencies.extend([kw for kw in keywords if kw not in chosen][: 4 - len(competencies)])
+
+        value_lines = (_strip_bullet(match.group().strip()) for match in _VALUES_LINE_RE.finditer(job_description))
+        values = _unique(value_lines, 4)
+        if not values:
+            values = [f"Emphasis on {kw.lower()} excellence" for kw in keywords[:2]]
+
+        themes = [kw for kw in keywords if kw.lower() not in skill_set][:3]
+        responsibilities = (bullets or lines or sentences)[:6]
+        summary = sentences[0] if sentences else "Review the full job description for details."
+
+        return {
+            "skills": skills or ["Communication", "Problem solving"],
+            "responsibilities": responsibilities or ["Deliver high-quality work", "Collaborate across teams"],
+            "competencies": competencies or ["Leadership", "Execution"],
+            "values": values or ["Customer focus", "Integrity"],
+            "themes": themes or ["Impact", "Ownership"],
+            "summary": summary,
+        }
+
+    def _term_counts(self, counts: Counter) -> Dict[int, int]:
+        merged: Dict[int, int] = {}
+        for term, count in counts.items():
+            if term in STOPWORDS:
+                continue
+            term_id = self.term_id(term)
+            merged[term_id] = merged.get(term_id, 0) + count
+        return merged
+
+
+def _unique(items: Iterable[str], limit: int) -> List[str]:
+    """First ``limit`` distinct non-empty items in order, without consuming the rest."""
+
+    seen: set = set()
+    result: List[str] = []
+    for item in items:
+        if item and item not in seen:
+            seen.add(item)
+            result.append(item)
+            if len(result) == limit:
+                break
+    return result
+
+
+def _strip_bullet(line: str) -> str:
+    return _BULLET_RE.sub("", line, count=1)
+
+
+def _display(token: str) -> str:
+    # Keep deliberate casing (FastAPI, PostgreSQL), otherwise capitalize.
+    return token if any(char.isupper() for char in token[1:]) else token.capitalize()
+
+
+def _iter_sentences(text: str) -> Iterator[str]:
+    start = 0
+    for match in _SENTENCE_RE.finditer(text):
+        segment = text[start : match.start()].strip()
+        if segment:
+            yield segment
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        yield tail
+
+
+def _load_corpus() -> List[str]:
+    text = _CORPUS_PATH.read_text(encoding="utf-8")
+    return [document.strip() for document in text.split("\n\n") if document.strip()]
+
+
+_default_analyzer: Optional[JobAnalyzer] = None
+
+
+def get_analyzer() -> JobAnalyzer:
+    """Shared analyzer instance, built on first use."""
+
+    global _default_analyzer
+    if _default_analyzer is None:
+        _default_analyzer = JobAnalyzer()
+    return _default_analyzer
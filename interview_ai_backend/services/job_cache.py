@@ -0,0 +1,213 @@
+"""Content-addressed cache for job analyses with single-flight coalescing."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_description(job_description: str) -> str:
+    """Collapse whitespace so trivially different pastes share a cache entry."""
+
+    return _WHITESPACE_RE.sub(" ", job_description).strip()
+
+
+def description_key(job_description: str) -> str:
+    """Return the content hash used to address a job description."""
+
+    normalized = normalize_description(job_description)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class _SQLiteTier:
+    """Persistent key/value tier so cached analyses survive restarts.
+
+    Calls block on sqlite, so the cache runs them on a worker thread.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float) -> None:
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_analysis_cache ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Return ``(created_at, value)`` for a fresh entry; ``created_at`` is wall-clock time."""
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM job_analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        payload, created_at = row
+        if self._ttl and time.time() - created_at > self._ttl:
+            self.delete(key)
+            return None
+        return created_at, json.loads(payload)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_analysis_cache (key, payload, created_at) VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM job_analysis_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobAnalysisCache:
+    """LRU+TTL memory cache, optional SQLite tier, and single-flight loads.
+
+    Concurrent requests for the same description share one in-flight
+    computation, so N identical requests produce exactly one LLM call. The
+    computation runs in a task the cache owns: a caller that goes away (a
+    client disconnect cancels its request) stops waiting without cancelling
+    it for the others. Failures are propagated to every waiter and never cached.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 512,
+        ttl_seconds: float = 24 * 60 * 60,
+        sqlite_path: Optional[str] = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        # key -> (monotonic expiry or None, value)
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+        self._disk = _SQLiteTier(sqlite_path, ttl_seconds) if sqlite_path else None
+        self._stats = CacheStats()
+
+    @classmethod
+    def from_env(cls) -> "JobAnalysisCache":
+        """Build a cache configured from JOB_CACHE_* environment variables."""
+
+        return cls(
+            max_entries=int(os.getenv("JOB_CACHE_MAX_ENTRIES", "512")),
+            ttl_seconds=float(os.getenv("JOB_CACHE_TTL_SECONDS", str(24 * 60 * 60))),
+            sqlite_path=os.getenv("JOB_CACHE_SQLITE_PATH") or None,
+        )
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached analysis from memory or disk, if still fresh."""
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._entries[key]
+            else:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return value
+
+        if self._disk is not None:
+            stored = await asyncio.to_thread(self._disk.get, key)
+            if stored is not None:
+                created_at, value = stored
+                self._stats.disk_hits += 1
+                # Keep the entry's original expiry rather than granting a fresh TTL.
+                age = max(0.0, time.time() - created_at)
+                self._remember(key, value, age=age)
+                return value
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._remember(key, value)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, value)
+
+    async def get_or_compute(
+        self, job_description: str, compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return the cached analysis or run ``compute`` once per key."""
+
+        key = description_key(job_description)
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats.coalesced += 1
+        else:
+            self._stats.misses += 1
+            task = asyncio.get_running_loop().create_task(self._load(key, compute))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+        # Shielded: cancelling this caller leaves the shared load running.
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        self._stats.size = len(self._entries)
+        return asdict(self._stats)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def close(self) -> None:
+        for task in self._inflight.values():
+            task.cancel()
+        if self._disk is not None:
+            self._disk.close()
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            value = await compute()
+            await self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _remember(self, key: str, value: Dict[str, Any], *, age: float = 0.0) -> None:
+        expires_at = time.monotonic() + self._ttl - age if self._ttl else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+
+def _consume_exception(task: "asyncio.Task[Any]") -> None:
+    # A load whose callers all left must not be logged as an unretrieved failure.
+    if not task.cancelled():
+        task.exception()
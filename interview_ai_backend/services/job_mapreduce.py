@@ -0,0 +1,177 @@
+"""Map-reduce analysis for job descriptions too long for one prompt.
+
+Huge postings (career pages, concatenated PDFs) are split on section
+boundaries into chunks, each chunk is analyzed concurrently under a cap, and
+the per-chunk lists are merged: items are de-duplicated case- and
+punctuation-insensitively and ranked by how many chunks mention them.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+_HEADING_RE = re.compile(
+    r"^(?:#{1,6}\s+\S.*|[A-Z][A-Za-z0-9 &/,'()-]{2,60}:|[A-Z0-9][A-Z0-9 &/,'()-]{2,60})\s*$"
+)
+_BREAK_RE = re.compile(r"\f|\n\s*\n")
+_KEY_RE = re.compile(r"[^a-z0-9+#]+")
+
+LIST_FIELDS = ("skills", "responsibilities", "competencies", "values", "themes")
+_FIELD_LIMITS = {"skills": 12, "responsibilities": 10, "competencies": 8, "values": 6, "themes": 6}
+
+
+@dataclass
+class MapReduceConfig:
+    """Size thresholds and concurrency for chunked job analysis."""
+
+    threshold_chars: int = 12_000
+    chunk_chars: int = 6_000
+    max_chunks: int = 16
+    concurrency: int = 8
+    # Share of chunks that must succeed; below it the analysis fails rather
+    # than returning (and caching) a merge that silently misses sections.
+    min_success_ratio: float = 1.0
+
+    @classmethod
+    def from_env(cls) -> "MapReduceConfig":
+        """Read overrides from JOB_ANALYSIS_* environment variables."""
+
+        defaults = cls()
+        return cls(
+            threshold_chars=int(os.getenv("JOB_ANALYSIS_MAPREDUCE_THRESHOLD_CHARS", defaults.threshold_chars)),
+            chunk_chars=int(os.getenv("JOB_ANALYSIS_CHUNK_CHARS", defaults.chunk_chars)),
+            max_chunks=int(os.getenv("JOB_ANALYSIS_MAX_CHUNKS", defaults.max_chunks)),
+            concurrency=int(os.getenv("JOB_ANALYSIS_MAP_CONCURRENCY", defaults.concurrency)),
+            min_success_ratio=float(os.getenv("JOB_ANALYSIS_MIN_CHUNK_SUCCESS", defaults.min_success_ratio)),
+        )
+
+    def should_split(self, job_description: str) -> bool:
+        return self.threshold_chars > 0 and len(job_description) > self.threshold_chars
+
+
+def split_sections(text: str) -> List[str]:
+    """Split a posting at blank lines, page breaks and heading lines."""
+
+    sections: List[str] = []
+    for block in _BREAK_RE.split(text):
+        current: List[str] = []
+        for line in block.splitlines():
+            if _HEADING_RE.match(line.strip()) and current:
+                sections.append("\n".join(current).strip())
+                current = []
+            current.append(line)
+        if current:
+            sections.append("\n".join(current).strip())
+    return [section for section in sections if section]
+
+
+def chunk_description(text: str, chunk_chars: int, max_chunks: int = 0) -> List[str]:
+    """Pack consecutive sections into chunks of at most ``chunk_chars``.
+
+    With ``max_chunks`` the chunk size grows so the count stays close to that
+    bound, and neighbouring chunks are then joined if packing still overshot
+    it, so the cap always holds. Sections longer than a chunk are cut at
+    line, then character, boundaries.
+    """
+
+    if max_chunks:
+        chunk_chars = max(chunk_chars, math.ceil(len(text) / max_chunks))
+    pieces: List[str] = []
+    for section in split_sections(text):
+        if len(section) <= chunk_chars:
+            pieces.append(section)
+            continue
+        for line in section.splitlines():
+            pieces.extend(line[start : start + chunk_chars] for start in range(0, len(line), chunk_chars))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        if current and size + len(piece) + 2 > chunk_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    if max_chunks and len(chunks) > max_chunks:
+        per_chunk = math.ceil(len(chunks) / max_chunks)
+        chunks = ["\n\n".join(chunks[start : start + per_chunk]) for start in range(0, len(chunks), per_chunk)]
+    return chunks
+
+
+def _item_key(item: str) -> str:
+    return _KEY_RE.sub(" ", item.casefold()).strip()
+
+
+def merge_analyses(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reduce per-chunk analyses into one, de-duplicating and ranking list items."""
+
+    merged: Dict[str, Any] = {}
+    for field in LIST_FIELDS:
+        first_seen: Dict[str, str] = {}
+        mentions: Dict[str, int] = {}
+        for part in parts:
+            seen_here = set()
+            for item in part.get(field) or []:
+                if not isinstance(item, str) or not item.strip():
+                    continue
+                key = _item_key(item)
+                if not key or key in seen_here:
+                    continue
+                seen_here.add(key)
+                first_seen.setdefault(key, item.strip())
+                mentions[key] = mentions.get(key, 0) + 1
+        # sorted() is stable, so equally common items keep first-seen order.
+        ranked = sorted(first_seen, key=lambda key: -mentions[key])
+        merged[field] = [first_seen[key] for key in ranked[: _FIELD_LIMITS[field]]]
+
+    merged["summary"] = next((part["summary"] for part in parts if part.get("summary")), "")
+    return merged
+
+
+async def analyze_in_chunks(
+    job_description: str,
+    analyze_chunk: Callable[[str, int, int], Awaitable[Dict[str, Any]]],
+    config: Optional[MapReduceConfig] = None,
+) -> Dict[str, Any]:
+    """Map ``analyze_chunk(chunk, index, total)`` over the chunks and merge the results.
+
+    If fewer than ``config.min_success_ratio`` of the chunks succeed (by
+    default, if any chunk fails) the first error is raised so the caller can
+    fall back and nothing partial is cached. Chunk calls still running at that
+    point are cancelled rather than left to spend tokens on a discarded result.
+    """
+
+    config = config or MapReduceConfig.from_env()
+    chunks = chunk_description(job_description, config.chunk_chars, config.max_chunks)
+    if not chunks:
+        raise ValueError("Job description is empty")
+    semaphore = asyncio.Semaphore(max(1, config.concurrency))
+
+    async def _map(index: int, chunk: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await analyze_chunk(chunk, index, len(chunks))
+
+    def _enough(successes: int) -> bool:
+        return successes > 0 and successes >= len(chunks) * config.min_success_ratio
+
+    tasks = [asyncio.create_task(_map(index, chunk)) for index, chunk in enumerate(chunks)]
+    pending = set(tasks)
+    errors: List[BaseException] = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            errors.extend(task.exception() for task in done if task.exception() is not None)
+            if errors and not _enough(len(chunks) - len(errors)):
+                raise errors[0]
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return merge_analyses([task.result() for task in tasks if task.exception() is None])
@@ -0,0 +1,106 @@
+"""Incremental JSON parsing for streamed LLM completions."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+FieldEvent = Tuple[Tuple[str, ...], Any]
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_TERMINATORS = ",}]" + _WHITESPACE
+
+
+class IncrementalJSONParser:
+    """Emit object members as soon as their values are fully received.
+
+    Feed raw text chunks with :meth:`feed`; each call returns the
+    ``(path, value)`` pairs completed by that chunk, where ``path`` is the
+    tuple of keys leading to the member (e.g. ``("star", "situation")``).
+    Members nested inside arrays are reported only as part of the array.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[Dict[str, Any]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._string_is_key = False
+        self._scalar_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[FieldEvent]:
+        self._buffer += chunk
+        events: List[FieldEvent] = []
+        buffer = self._buffer
+        for index in range(self._pos, len(buffer)):
+            char = buffer[index]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._close_string(index, events)
+                continue
+
+            if self._scalar_start is not None:
+                if char not in _SCALAR_TERMINATORS:
+                    continue
+                self._close_value(self._scalar_start, index, events)
+                self._scalar_start = None
+
+            if char in _WHITESPACE:
+                continue
+
+            top = self._stack[-1] if self._stack else None
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+                self._string_is_key = top is not None and top["kind"] == "object" and top["state"] == "key"
+            elif char in "{[":
+                self._stack.append(
+                    {"kind": "object" if char == "{" else "array", "state": "key", "key": None, "start": index}
+                )
+            elif char in "}]":
+                frame = self._stack.pop() if self._stack else None
+                if frame is not None:
+                    self._close_value(frame["start"], index + 1, events)
+            elif char == ":":
+                if top is not None:
+                    top["state"] = "value"
+            elif char == ",":
+                if top is not None and top["kind"] == "object":
+                    top["state"] = "key"
+            else:
+                self._scalar_start = index
+
+        self._pos = len(buffer)
+        return events
+
+    def _close_string(self, end: int, events: List[FieldEvent]) -> None:
+        if self._string_is_key:
+            top = self._stack[-1]
+            top["key"] = json.loads(self._buffer[self._string_start : end + 1])
+            top["state"] = "colon"
+        else:
+            self._close_value(self._string_start, end + 1, events)
+
+    def _close_value(self, start: int, end: int, events: List[FieldEvent]) -> None:
+        if not self._stack or any(frame["kind"] != "object" for frame in self._stack):
+            return
+        parent = self._stack[-1]
+        if parent["state"] != "value":
+            return
+        parent["state"] = "done"
+        try:
+            value = json.loads(self._buffer[start:end])
+        except json.JSONDecodeError:
+            return
+        events.append((tuple(frame["key"] for frame in self._stack), value))
@@ -1,52 +1,608 @@
-"""Async OpenAI client wrapper used across the backend."""
+"""Async OpenAI client wrapper used across the backend.
+
+The ``openai`` SDK and ``httpx`` are imported when the client is opened, not
+when this module is imported, so cold starts only pay for them once the app's
+lifespan handler (or the first call) needs a connection.
+"""
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
+import logging
 import os
-from typing import Any, Dict, Optional
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from services import tracing
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily at runtime
+    import httpx
+    from openai import AsyncOpenAI
+
+    from services.admission import AdmissionController
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_SYSTEM_PROMPT = (
+    "You are an AI assistant that always responds with compact JSON "
+    "matching exactly what the user instructs."
+)
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when retries are exhausted; callers treat it like an unconfigured client."""
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """Raised when an attempt or the whole call runs past its deadline."""
+
+
+@dataclass
+class LLMClientConfig:
+    """Connection pool, deadline, retry and hedging knobs for :class:`LLMClient`."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    timeout: float = 60.0
+    # Cap on a single attempt so a hung one leaves budget for a retry; 0 means
+    # ``attempt_timeout_fraction`` of the call's budget. The last attempt
+    # always gets whatever budget is left.
+    attempt_timeout: float = 0.0
+    attempt_timeout_fraction: float = 0.5
+    max_retries: int = 2
+    backoff_base: float = 0.25
+    backoff_max: float = 4.0
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_samples: int = 20
+    hedge_min_delay: float = 0.05
+    warmup_connections: int = 0
+    warmup_timeout: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> "LLMClientConfig":
+        """Read overrides from LLM_* environment variables."""
+
+        defaults = cls()
+        return cls(
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", defaults.max_connections)),
+            max_keepalive_connections=int(
+                os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", defaults.max_keepalive_connections)
+            ),
+            keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", defaults.keepalive_expiry)),
+            connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT", defaults.connect_timeout)),
+            timeout=float(os.getenv("LLM_TIMEOUT", defaults.timeout)),
+            attempt_timeout=float(os.getenv("LLM_ATTEMPT_TIMEOUT", defaults.attempt_timeout)),
+            attempt_timeout_fraction=float(
+                os.getenv("LLM_ATTEMPT_TIMEOUT_FRACTION", defaults.attempt_timeout_fraction)
+            ),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", defaults.max_retries)),
+            backoff_base=float(os.getenv("LLM_BACKOFF_BASE", defaults.backoff_base)),
+            backoff_max=float(os.getenv("LLM_BACKOFF_MAX", defaults.backoff_max)),
+            hedge=os.getenv("LLM_HEDGE", "0").lower() in {"1", "true", "yes"},
+            hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", defaults.hedge_percentile)),
+            hedge_min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", defaults.hedge_min_samples)),
+            hedge_min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY", defaults.hedge_min_delay)),
+            warmup_connections=int(os.getenv("LLM_WARMUP_CONNECTIONS", defaults.warmup_connections)),
+            warmup_timeout=float(os.getenv("LLM_WARMUP_TIMEOUT", defaults.warmup_timeout)),
+        )
+
+
+@dataclass
+class LLMCallStats:
+    """Per-call prompt size and token accounting reported to usage hooks."""
+
+    prompt_type: str
+    prompt_chars: int
+    latency_seconds: float
+    prompt_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    streamed: bool = False
+    attempts: int = 1
+
+
+@dataclass
+class LLMAttempt:
+    """Telemetry for a single HTTP attempt within a call."""
 
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
+    prompt_type: str
+    attempt: int
+    hedged: bool
+    outcome: str  # "ok", "error", "timeout" or "cancelled"
+    latency_seconds: float
+    error: Optional[str] = None
 
-load_dotenv()
+
+UsageHook = Callable[[LLMCallStats], None]
+AttemptHook = Callable[[LLMAttempt], None]
 
 
 class LLMClient:
-    """Thin wrapper around the OpenAI client with JSON helpers."""
+    """Thin wrapper around the OpenAI client with JSON helpers.
+
+    Calls share one tunable httpx connection pool, run under a per-call
+    deadline with a shorter per-attempt timeout, retry retryable failures
+    with exponential backoff and full jitter, and can optionally hedge: if an
+    attempt is slower than the configured latency percentile of its prompt
+    type, a second one is fired and the first response wins.
+
+    Construction only reads configuration; the SDK client and its connection
+    pool are built by :meth:`open`, which the app lifespan starts in the
+    background and which every call awaits if it has not finished yet.
 
-    def __init__(self) -> None:
-        api_key = os.getenv("OPENAI_API_KEY")
+    With an ``admission`` controller every call first waits for one of its
+    slots, so bounded concurrency, priorities and shedding apply to all LLM
+    work regardless of which endpoint started it.
+    """
+
+    def __init__(
+        self, config: Optional[LLMClientConfig] = None, *, admission: Optional["AdmissionController"] = None
+    ) -> None:
+        self._api_key = os.getenv("OPENAI_API_KEY")
+        self._base_url = os.getenv("LLM_BASE_URL") or None
         self.model = os.getenv("LLM_MODEL", "gpt-4o")
-        self._client: Optional[AsyncOpenAI] = AsyncOpenAI(api_key=api_key) if api_key else None
+        self.config = config or LLMClientConfig.from_env()
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[AsyncOpenAI] = None
+        self._opening: Optional[asyncio.Task] = None
+        self._usage_hooks: List[UsageHook] = []
+        self._attempt_hooks: List[AttemptHook] = []
+        # Recent successful attempt latencies per prompt type, so slow job
+        # analyses do not raise the hedge threshold for fast role questions.
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._inflight: Dict[str, int] = {}
+        self.admission = admission
 
     @property
     def is_configured(self) -> bool:
-        return self._client is not None
-
-    async def request_json(self, prompt: str, *, temperature: float = 0.2) -> Dict[str, Any]:
-        """Send the prompt to OpenAI and force a JSON object response."""
-
-        if not self._client:
-            raise RuntimeError("OPENAI_API_KEY is not configured. Unable to reach OpenAI API.")
-
-        response = await self._client.chat.completions.create(
-            model=self.model,
-            temperature=temperature,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an AI assistant that always responds with compact JSON "
-                        "matching exactly what the user instructs."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
+        return bool(self._api_key)
+
+    async def open(self, *, warmup: Optional[int] = None) -> None:
+        """Build the SDK client and optionally pre-open ``warmup`` pooled connections.
+
+        A no-op without an API key or when already open. The SDK is imported on
+        a worker thread so the event loop keeps serving meanwhile; concurrent
+        callers wait for the open already in flight, warm-up included.
+        ``warmup`` defaults to ``LLM_WARMUP_CONNECTIONS``; warm-up failures are
+        logged, never raised.
+        """
+
+        if not self._api_key or self._client is not None:
+            return
+        if self._opening is not None:
+            await asyncio.shield(self._opening)
+            return
+        opening = self._opening = asyncio.create_task(self._open(warmup))
+        opening.add_done_callback(self._opened)
+        await opening
+
+    def _opened(self, task: asyncio.Task) -> None:
+        if self._opening is task:
+            self._opening = None
+
+    async def _open(self, warmup: Optional[int]) -> None:
+        await asyncio.to_thread(_import_sdk)
+        if self._client is not None:
+            return
+
+        import httpx
+        from openai import AsyncOpenAI
+
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(self.config.timeout, connect=self.config.connect_timeout),
+        )
+        self._client = AsyncOpenAI(
+            api_key=self._api_key,
+            base_url=self._base_url,
+            http_client=self._http_client,
+            max_retries=0,  # retries are handled here so they respect the call deadline
+        )
+        connections = self.config.warmup_connections if warmup is None else warmup
+        if connections > 0:
+            await self.warm_up(connections)
+
+    async def warm_up(self, connections: int) -> int:
+        """Open up to ``connections`` keep-alive connections; returns how many succeeded.
+
+        Each probe is a concurrent ``GET /models``, so DNS, TCP and TLS setup
+        happen here instead of on the first user request. Any HTTP status
+        counts as success because the connection is what we are after.
+        """
+
+        if self._client is None or self._http_client is None:
+            return 0
+        connections = min(connections, self.config.max_keepalive_connections)
+        url = str(self._client.base_url).rstrip("/") + "/models"
+        headers = {"Authorization": f"Bearer {self._api_key}"}
+
+        async def _probe() -> bool:
+            try:
+                await self._http_client.get(url, headers=headers, timeout=self.config.warmup_timeout)
+            except Exception as exc:
+                logger.warning("LLM connection warm-up failed: %s", exc)
+                return False
+            return True
+
+        started = time.perf_counter()
+        opened = sum(await asyncio.gather(*(_probe() for _ in range(connections))))
+        logger.info("LLM warm-up opened %d/%d connections in %.3fs", opened, connections, time.perf_counter() - started)
+        return opened
+
+    async def _ensure_client(self) -> AsyncOpenAI:
+        if self._client is None:
+            if not self._api_key:
+                raise RuntimeError("OPENAI_API_KEY is not configured. Unable to reach OpenAI API.")
+            if self._opening is not None:
+                # Wait for the startup open rather than racing its warm-up; if it
+                # was cancelled or failed, open a client without warm-up below.
+                await asyncio.wait({self._opening})
+            await self.open(warmup=0)
+        return self._client
+
+    def add_usage_hook(self, hook: UsageHook) -> None:
+        """Register a callback invoked with :class:`LLMCallStats` after every call."""
+
+        self._usage_hooks.append(hook)
+
+    def add_attempt_hook(self, hook: AttemptHook) -> None:
+        """Register a callback invoked with :class:`LLMAttempt` after every attempt."""
+
+        self._attempt_hooks.append(hook)
+
+    def inflight(self) -> Dict[str, int]:
+        """Number of calls currently awaiting the provider, by prompt type."""
+
+        return dict(self._inflight)
+
+    @contextlib.contextmanager
+    def _track_inflight(self, prompt_type: str) -> Iterator[None]:
+        self._inflight[prompt_type] = self._inflight.get(prompt_type, 0) + 1
+        try:
+            yield
+        finally:
+            self._inflight[prompt_type] -= 1
+
+    def _admit(self) -> AsyncContextManager[None]:
+        if self.admission is None:
+            return contextlib.nullcontext()
+        return self.admission.slot()
+
+    async def aclose(self) -> None:
+        """Close the connection pool; the next call or :meth:`open` builds a fresh one."""
+
+        if self._opening is not None:
+            self._opening.cancel()
+        http_client, self._http_client, self._client = self._http_client, None, None
+        if http_client is not None:
+            await http_client.aclose()
+
+    async def request_json(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.2,
+        prompt_type: str = "generic",
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Send the prompt to OpenAI and force a JSON object response.
+
+        ``deadline`` is the total budget in seconds across every attempt and
+        backoff; it defaults to the configured timeout.
+        """
+
+        client = await self._ensure_client()
+
+        def _call(timeout: float) -> Awaitable[Any]:
+            return client.chat.completions.create(
+                model=self.model,
+                temperature=temperature,
+                response_format={"type": "json_object"},
+                messages=self._messages(prompt),
+                timeout=timeout,
+            )
+
+        async with self._admit():
+            started = time.perf_counter()
+            with self._track_inflight(prompt_type), tracing.phase("llm_wait"):
+                response, attempts = await self._call_with_retries(prompt_type, _call, deadline)
+        self._report(
+            prompt_type, prompt, started, getattr(response, "usage", None), streamed=False, attempts=attempts
         )
 
         content = response.choices[0].message.content
         try:
-            return json.loads(content)
+            with tracing.phase("json_decode"):
+                return json.loads(content)
         except json.JSONDecodeError as exc:  # pragma: no cover - defensive branch
             raise ValueError("LLM response was not valid JSON") from exc
+
+    async def stream_json(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.2,
+        prompt_type: str = "generic",
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Stream the raw JSON completion text as it arrives from OpenAI.
+
+        Retries and hedging apply to opening the stream; once tokens flow the
+        remaining deadline bounds the rest of the completion.
+        """
+
+        client = await self._ensure_client()
+
+        def _call(timeout: float) -> Awaitable[Any]:
+            return client.chat.completions.create(
+                model=self.model,
+                temperature=temperature,
+                response_format={"type": "json_object"},
+                messages=self._messages(prompt),
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=timeout,
+            )
+
+        async with self._admit():
+            started = time.perf_counter()
+            budget = deadline if deadline is not None else self.config.timeout
+            with self._track_inflight(prompt_type):
+                with tracing.phase("llm_wait"):
+                    stream, attempts = await self._call_with_retries(prompt_type, _call, budget)
+                usage = None
+                iterator = stream.__aiter__()
+                while True:
+                    remaining = budget - (time.perf_counter() - started)
+                    if remaining <= 0:
+                        raise LLMTimeoutError("LLM stream exceeded its deadline")
+                    try:
+                        chunk = await asyncio.wait_for(iterator.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError as exc:
+                        raise LLMTimeoutError("LLM stream exceeded its deadline") from exc
+                    if getattr(chunk, "usage", None) is not None:
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+            self._report(prompt_type, prompt, started, usage, streamed=True, attempts=attempts)
+
+    async def _call_with_retries(
+        self,
+        prompt_type: str,
+        call: Callable[[float], Awaitable[T]],
+        deadline: Optional[float],
+    ) -> Tuple[T, int]:
+        """Run ``call`` with backoff between retryable failures until the deadline."""
+
+        budget = deadline if deadline is not None else self.config.timeout
+        deadline_at = time.monotonic() + budget
+        attempt_cap = self.config.attempt_timeout or budget * self.config.attempt_timeout_fraction
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise LLMTimeoutError(f"LLM call exceeded its {budget:.2f}s deadline")
+            # The last attempt has nothing to fall back on, so it may use the whole remainder.
+            timeout = remaining if attempt >= self.config.max_retries else min(remaining, attempt_cap)
+            try:
+                result, used = await self._hedged_attempt(prompt_type, call, timeout, attempt)
+                return result, attempt + used
+            except Exception as exc:
+                if not _is_retryable(exc):
+                    raise
+                if attempt >= self.config.max_retries:
+                    if isinstance(exc, LLMUnavailableError):
+                        raise
+                    raise LLMUnavailableError(f"LLM call failed after {attempt + 1} attempts: {exc}") from exc
+                delay = self._backoff(attempt, exc)
+                if delay >= deadline_at - time.monotonic():
+                    raise LLMTimeoutError("LLM retry budget exhausted before the deadline") from exc
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _hedged_attempt(
+        self,
+        prompt_type: str,
+        call: Callable[[float], Awaitable[T]],
+        timeout: float,
+        attempt: int,
+    ) -> Tuple[T, int]:
+        """Run one attempt, firing a hedge if it outlives the latency percentile.
+
+        Returns the winning result and how many attempts were started.
+        """
+
+        primary = asyncio.ensure_future(self._timed_attempt(prompt_type, call, timeout, attempt, False))
+        hedge_delay = self._hedge_delay(prompt_type)
+        if hedge_delay is None or hedge_delay >= timeout:
+            return await primary, 1
+
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if done:
+                return primary.result(), 1
+            tasks.add(
+                asyncio.ensure_future(
+                    self._timed_attempt(prompt_type, call, timeout - hedge_delay, attempt, True)
+                )
+            )
+            first_error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), 2
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _timed_attempt(
+        self,
+        prompt_type: str,
+        call: Callable[[float], Awaitable[T]],
+        timeout: float,
+        attempt: int,
+        hedged: bool,
+    ) -> T:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(call(timeout), timeout)
+        except asyncio.TimeoutError as exc:
+            self._record_attempt(prompt_type, attempt, hedged, "timeout", started, "deadline exceeded")
+            raise LLMTimeoutError(f"LLM attempt timed out after {timeout:.2f}s") from exc
+        except asyncio.CancelledError:
+            self._record_attempt(prompt_type, attempt, hedged, "cancelled", started, None)
+            raise
+        except Exception as exc:
+            self._record_attempt(prompt_type, attempt, hedged, "error", started, type(exc).__name__)
+            raise
+        latency = self._record_attempt(prompt_type, attempt, hedged, "ok", started, None)
+        self._latencies.setdefault(prompt_type, deque(maxlen=256)).append(latency)
+        return result
+
+    def _record_attempt(
+        self, prompt_type: str, attempt: int, hedged: bool, outcome: str, started: float, error: Optional[str]
+    ) -> float:
+        latency = time.perf_counter() - started
+        record = LLMAttempt(
+            prompt_type=prompt_type,
+            attempt=attempt,
+            hedged=hedged,
+            outcome=outcome,
+            latency_seconds=latency,
+            error=error,
+        )
+        logger.debug(
+            "llm attempt type=%s attempt=%d hedged=%s outcome=%s latency=%.3fs error=%s",
+            prompt_type,
+            attempt,
+            hedged,
+            outcome,
+            latency,
+            error,
+        )
+        for hook in self._attempt_hooks:
+            try:
+                hook(record)
+            except Exception:  # pragma: no cover - hooks must never break a request
+                logger.exception("LLM attempt hook failed")
+        return latency
+
+    def _hedge_delay(self, prompt_type: str) -> Optional[float]:
+        """Latency percentile of recent successful attempts of this prompt type, once enough samples exist."""
+
+        latencies = self._latencies.get(prompt_type, ())
+        if not self.config.hedge or len(latencies) < self.config.hedge_min_samples:
+            return None
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.config.hedge_percentile / 100))
+        return max(self.config.hedge_min_delay, ordered[index])
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        """Exponential backoff with full jitter, honouring Retry-After when present."""
+
+        ceiling = min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        response = getattr(exc, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.config.backoff_max))
+            except ValueError:
+                pass
+        return delay
+
+    def _report(
+        self, prompt_type: str, prompt: str, started: float, usage: Any, *, streamed: bool, attempts: int
+    ) -> None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        stats = LLMCallStats(
+            prompt_type=prompt_type,
+            prompt_chars=len(_SYSTEM_PROMPT) + len(prompt),
+            latency_seconds=time.perf_counter() - started,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            cached_tokens=getattr(details, "cached_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            streamed=streamed,
+            attempts=attempts,
+        )
+        logger.debug(
+            "llm call type=%s prompt_chars=%d prompt_tokens=%s cached_tokens=%s completion_tokens=%s "
+            "attempts=%d latency=%.3fs",
+            stats.prompt_type,
+            stats.prompt_chars,
+            stats.prompt_tokens,
+            stats.cached_tokens,
+            stats.completion_tokens,
+            stats.attempts,
+            stats.latency_seconds,
+        )
+        for hook in self._usage_hooks:
+            try:
+                hook(stats)
+            except Exception:  # pragma: no cover - hooks must never break a request
+                logger.exception("LLM usage hook failed")
+
+    @staticmethod
+    def _messages(prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+
+def _import_sdk() -> None:
+    import httpx  # noqa: F401
+    import openai  # noqa: F401
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, LLMTimeoutError):
+        return True
+    # Only reached after a call, so both packages are already loaded.
+    import httpx
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(exc, APIConnectionError):  # includes APITimeoutError
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in _RETRYABLE_STATUS
+    return isinstance(exc, httpx.TransportError)
@@ -0,0 +1,374 @@
+"""Minimal Prometheus-style metrics: counters, gauges, histograms and an ASGI middleware."""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], Any]] = None
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], Any]) -> None:
+        """Compute the value at scrape time.
+
+        ``function`` returns a number for unlabelled gauges, or a mapping of
+        label-value tuples to numbers for labelled ones.
+        """
+
+        self._function = function
+
+    def _samples(self) -> Iterable[str]:
+        values = dict(self._values)
+        if self._function is not None:
+            computed = self._function()
+            if isinstance(computed, dict):
+                values.update({tuple(str(part) for part in key): value for key, value in computed.items()})
+            else:
+                values[()] = computed
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution with sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    def count(self, **labels: Any) -> int:
+        row = self._values.get(self._key(labels))
+        return int(sum(row[:-1])) if row else 0
+
+    def _samples(self) -> Iterable[str]:
+        for key, row in sorted(self._values.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(row[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(cumulative)}"
+
+
+class Registry:
+    """Ordered collection of metrics rendered in the Prometheus text format."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status.",
+    ("route", "method", "status"),
+)
+LLM_CALL_DURATION = REGISTRY.histogram(
+    "llm_call_duration_seconds",
+    "End-to-end LLM call latency (including retries) by prompt type.",
+    ("prompt_type",),
+)
+LLM_ATTEMPTS = REGISTRY.counter(
+    "llm_attempts_total",
+    "Individual LLM HTTP attempts by prompt type, outcome and whether they were hedges.",
+    ("prompt_type", "outcome", "hedged"),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total",
+    "Tokens reported by the provider by prompt type and kind (prompt, cached, completion).",
+    ("prompt_type", "kind"),
+)
+LLM_INFLIGHT = REGISTRY.gauge(
+    "llm_inflight_requests",
+    "LLM calls currently awaiting the provider, by prompt type.",
+    ("prompt_type",),
+)
+FALLBACKS = REGISTRY.counter(
+    "fallback_responses_total",
+    "Deterministic fallbacks served instead of LLM output, by kind.",
+    ("kind",),
+)
+for _kind in ("job_analysis", "role_question", "star_evaluation"):
+    FALLBACKS.inc(0, kind=_kind)  # export zero-valued series before the first fallback
+ROLE_QUESTIONS = REGISTRY.counter(
+    "role_questions_total",
+    "Role questions served by source: reused from the retrieval index or freshly generated by the LLM.",
+    ("source",),
+)
+PROMPT_TOKENS = REGISTRY.histogram(
+    "prompt_tokens_estimated",
+    "Locally estimated prompt size by prompt type, before (original) and after (sent) budget compression.",
+    ("prompt_type", "stage"),
+    buckets=(64, 128, 256, 512, 1024, 1536, 2048, 4096, 8192, 16384),
+)
+PROMPT_COMPRESSIONS = REGISTRY.counter(
+    "prompt_compressions_total",
+    "Prompts compressed to fit their token budget, by prompt type and technique (trim_analysis, condense_answer).",
+    ("prompt_type", "technique"),
+)
+ADMISSION_QUEUED = REGISTRY.gauge(
+    "admission_queued_calls",
+    "LLM calls waiting for an admission slot, by priority class.",
+    ("priority_class",),
+)
+ADMISSION_SHED = REGISTRY.counter(
+    "admission_shed_total",
+    "LLM calls shed by admission control, by priority class and reason (queue_full, queue_timeout, client_limit).",
+    ("priority_class", "reason"),
+)
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    "interview_active_sessions",
+    "Interview sessions currently held by the session store.",
+)
+
+
+_instrumented_clients: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def instrument_llm_client(client: Any) -> None:
+    """Feed LLM latency, token, attempt and in-flight metrics from ``client``.
+
+    Safe to call repeatedly (e.g. once per ``create_app``); hooks are only added once.
+    """
+
+    if client in _instrumented_clients:
+        return
+    _instrumented_clients.add(client)
+
+    def _on_call(stats: Any) -> None:
+        LLM_CALL_DURATION.observe(stats.latency_seconds, prompt_type=stats.prompt_type)
+        for kind, value in (
+            ("prompt", stats.prompt_tokens),
+            ("cached", stats.cached_tokens),
+            ("completion", stats.completion_tokens),
+        ):
+            if value:
+                LLM_TOKENS.inc(value, prompt_type=stats.prompt_type, kind=kind)
+
+    def _on_attempt(attempt: Any) -> None:
+        LLM_ATTEMPTS.inc(
+            prompt_type=attempt.prompt_type,
+            outcome=attempt.outcome,
+            hedged="true" if attempt.hedged else "false",
+        )
+
+    client.add_usage_hook(_on_call)
+    client.add_attempt_hook(_on_attempt)
+    LLM_INFLIGHT.set_function(lambda: {(prompt_type,): count for prompt_type, count in client.inflight().items()})
+
+
+_prompts_instrumented = False
+
+
+def instrument_prompts(prompts: Any) -> None:
+    """Feed prompt size and compression metrics from the prompt builders' report hook."""
+
+    global _prompts_instrumented
+    if _prompts_instrumented:
+        return
+    _prompts_instrumented = True
+
+    def _on_report(report: Any) -> None:
+        PROMPT_TOKENS.observe(report.original_tokens, prompt_type=report.prompt_type, stage="original")
+        PROMPT_TOKENS.observe(report.final_tokens, prompt_type=report.prompt_type, stage="sent")
+        if report.trimmed_analysis:
+            PROMPT_COMPRESSIONS.inc(prompt_type=report.prompt_type, technique="trim_analysis")
+        if report.condensed_answer:
+            PROMPT_COMPRESSIONS.inc(prompt_type=report.prompt_type, technique="condense_answer")
+
+    prompts.add_report_hook(_on_report)
+
+
+_instrumented_controllers: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def instrument_admission(controller: Any) -> None:
+    """Export queue depth and shed counts from an admission controller; hooks are only added once."""
+
+    if controller in _instrumented_controllers:
+        return
+    _instrumented_controllers.add(controller)
+
+    def _on_shed(priority_class: str, reason: str) -> None:
+        ADMISSION_SHED.inc(priority_class=priority_class, reason=reason)
+
+    controller.add_shed_hook(_on_shed)
+    ADMISSION_QUEUED.set_function(lambda: {(name,): count for name, count in controller.queued().items()})
+
+
+def instrument_interview_manager(manager: Any) -> None:
+    ACTIVE_SESSIONS.set_function(manager.active_sessions)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per matched route template."""
+
+    def __init__(self, app: Any, histogram: Histogram = HTTP_REQUEST_DURATION) -> None:
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def _send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            self.histogram.observe(
+                time.perf_counter() - started,
+                route=template,
+                method=scope.get("method", ""),
+                status=str(status["code"]),
+            )
@@ -1,11 +1,274 @@
-"""Prompt builders to keep instructions consistent."""
+"""Prompt builders to keep instructions consistent.
+
+Prompts that reference a job analysis share a byte-identical prefix (coach
+preamble followed by the compact job context) so the provider's prompt-prefix
+cache is reused across every turn of a session and across prompt types.
+Anything that varies per turn is appended after that prefix.
+
+Job-grounded prompts are also held to a per-prompt-type token budget
+(``PROMPT_BUDGET_<TYPE>_TOKENS``, ``0`` disables it), measured with a local
+token estimate. A prompt over budget is compressed deterministically: the job
+analysis is trimmed to the items most relevant to its own themes and
+responsibilities, a trim that depends only on the job so that over-budget
+prompts still share one prefix, then a long answer is condensed to its
+highest-signal sentences. Every build is reported
+to the hooks registered with :func:`add_report_hook`.
+"""
 from __future__ import annotations
 
 import json
-from typing import Any, Dict
+import logging
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
 
 from models.job_models import JobAnalysisResult
 
+logger = logging.getLogger(__name__)
+
+_CONTEXT_CACHE_SIZE = 1024
+_context_cache: "OrderedDict[int, Tuple[JobAnalysisResult, str]]" = OrderedDict()
+_trimmed_prefix_cache: "OrderedDict[int, Tuple[JobAnalysisResult, str]]" = OrderedDict()
+
+_DEFAULT_TOKEN_BUDGETS = {
+    "star_evaluation": 1500,
+    "role_question": 800,
+}
+# How many items of each list survive when a job analysis is trimmed to fit a budget.
+_TRIMMED_LIMITS = {"skills": 6, "responsibilities": 4, "competencies": 4, "values": 3, "themes": 3}
+_MIN_ANSWER_TOKENS = 120
+_ELISION = " [...] "
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+# Words that mark the situation, action and result parts of a STAR answer.
+_STAR_CUES = frozenset(
+    "because built cut decided delivered grew improved increased launched led learned measured "
+    "reduced resolved result resulted saved shipped so therefore outcome impact percent".split()
+)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it of on or our that the this to was we "
+    "were what when where which who why with you your".split()
+)
+
+
+@dataclass
+class PromptReport:
+    """Size of one built prompt before and after budget enforcement."""
+
+    prompt_type: str
+    budget: Optional[int]
+    original_tokens: int
+    final_tokens: int
+    original_chars: int
+    final_chars: int
+    trimmed_analysis: bool = False
+    condensed_answer: bool = False
+
+    @property
+    def compressed(self) -> bool:
+        return self.trimmed_analysis or self.condensed_answer
+
+    @property
+    def ratio(self) -> float:
+        """Final over original token estimate; 1.0 when nothing was compressed."""
+
+        return self.final_tokens / self.original_tokens if self.original_tokens else 1.0
+
+
+ReportHook = Callable[[PromptReport], None]
+_report_hooks: List[ReportHook] = []
+
+
+def add_report_hook(hook: ReportHook) -> None:
+    """Register a callback invoked with a :class:`PromptReport` for every budgeted prompt."""
+
+    _report_hooks.append(hook)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate a BPE tokenizer's count without loading one.
+
+    Words of up to six letters count as one token and longer words as one per
+    six letters, digit runs as one per three digits and every punctuation
+    mark as one. It is a budgeting heuristic, not a measured match for any
+    particular tokenizer.
+    """
+
+    tokens = 0
+    for piece in _TOKEN_RE.findall(text):
+        if piece.isalpha():
+            tokens += 1 + (len(piece) - 1) // 6
+        elif piece.isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+def token_budget(prompt_type: str) -> Optional[int]:
+    """Configured token budget for ``prompt_type``, or ``None`` when disabled."""
+
+    raw = os.getenv(f"PROMPT_BUDGET_{prompt_type.upper()}_TOKENS")
+    budget = int(raw) if raw else _DEFAULT_TOKEN_BUDGETS.get(prompt_type, 0)
+    return budget if budget > 0 else None
+
+
+def trim_job_analysis(job_analysis: JobAnalysisResult, focus: str) -> JobAnalysisResult:
+    """Keep the items of each list that share the most words with ``focus``.
+
+    Ties keep the analysis' own order, which already puts the most important
+    items first, so the result is deterministic for a given focus text.
+    """
+
+    focus_words = _content_words(focus)
+    trimmed = {}
+    for name, limit in _TRIMMED_LIMITS.items():
+        items = getattr(job_analysis, name)
+        ranked = sorted(
+            range(len(items)), key=lambda index: (-len(focus_words & _content_words(items[index])), index)
+        )
+        trimmed[name] = [items[index] for index in ranked[:limit]]
+    return JobAnalysisResult.model_construct(summary=job_analysis.summary, **trimmed)
+
+
+def condense_answer(answer: str, max_tokens: int, focus: str = "") -> str:
+    """Extractively shorten ``answer`` to about ``max_tokens``.
+
+    The opening and closing sentences (usually the situation and the result)
+    are kept, then the remaining sentences are added by score: words shared
+    with ``focus``, STAR action/result cues and figures, per token. Sentences
+    stay in their original order and gaps are marked with ``[...]``.
+    """
+
+    if estimate_tokens(answer) <= max_tokens:
+        return answer
+    sentences = [sentence.strip() for sentence in _SENTENCE_RE.split(answer) if sentence.strip()]
+    costs = [estimate_tokens(sentence) for sentence in sentences]
+    elision_cost = estimate_tokens(_ELISION)
+    focus_words = _content_words(focus)
+
+    def score(index: int) -> float:
+        words = _content_words(sentences[index])
+        signal = 2 * len(words & focus_words) + len(words & _STAR_CUES)
+        signal += 2 if any(char.isdigit() for char in sentences[index]) else 0
+        return signal / max(costs[index], 1)
+
+    order = [0, len(sentences) - 1] if len(sentences) > 1 else [0]
+    order += sorted(range(1, len(sentences) - 1), key=lambda index: (-score(index), index))
+    chosen: List[int] = []
+    spent = 0
+    for index in order:
+        cost = costs[index] + elision_cost
+        if spent + cost <= max_tokens:
+            chosen.append(index)
+            spent += cost
+
+    if not chosen:  # one huge run-on sentence: keep its head and tail words
+        words = answer.split()
+        keep = max(1, max_tokens // 3)
+        return " ".join(words[:keep]) + _ELISION + " ".join(words[-keep:])
+
+    chosen.sort()
+    parts: List[str] = []
+    previous = -1
+    for index in chosen:
+        if parts and index != previous + 1:
+            parts.append(_ELISION.strip())
+        parts.append(sentences[index])
+        previous = index
+    if previous != len(sentences) - 1:
+        parts.append(_ELISION.strip())
+    return " ".join(parts)
+
+
+def _content_words(text: str) -> frozenset:
+    return frozenset(word for word in _WORD_RE.findall(text.lower()) if word not in _STOPWORDS)
+
+
+def _report(report: PromptReport) -> None:
+    if report.compressed:
+        logger.debug(
+            "compressed %s prompt from %d to %d tokens (budget %s, ratio %.2f)",
+            report.prompt_type,
+            report.original_tokens,
+            report.final_tokens,
+            report.budget,
+            report.ratio,
+        )
+    for hook in _report_hooks:
+        try:
+            hook(report)
+        except Exception:  # pragma: no cover - hooks must never break a request
+            logger.exception("prompt report hook failed")
+
+
+_COACH_PREAMBLE = (
+    "You are an expert interview coach helping a candidate prepare for the role described below.\n"
+    "Ground every answer in the job analysis, which lists the role's skills, responsibilities,\n"
+    "competencies, values, themes and a one-sentence summary.\n\n"
+)
+
+
+def job_context(job_analysis: JobAnalysisResult) -> str:
+    """Return the compact JSON job context, serialized once per analysis object.
+
+    Sessions share interned analysis objects, so caching by identity means the
+    context is serialized once per distinct analysis rather than once per turn.
+    """
+
+    key = id(job_analysis)
+    cached = _context_cache.get(key)
+    if cached is not None and cached[0] is job_analysis:
+        _context_cache.move_to_end(key)
+        return cached[1]
+
+    context = json.dumps(job_analysis.model_dump(), separators=(",", ":"), ensure_ascii=False)
+    _context_cache[key] = (job_analysis, context)
+    if len(_context_cache) > _CONTEXT_CACHE_SIZE:
+        _context_cache.popitem(last=False)
+    return context
+
+
+def job_prefix(job_analysis: JobAnalysisResult, *, cached: bool = True) -> str:
+    """Stable prompt prefix shared by every job-grounded prompt.
+
+    Pass ``cached=False`` for one-off analyses (e.g. trimmed copies) that
+    should not displace shared entries from the context cache.
+    """
+
+    context = (
+        job_context(job_analysis)
+        if cached
+        else json.dumps(job_analysis.model_dump(), separators=(",", ":"), ensure_ascii=False)
+    )
+    return f"{_COACH_PREAMBLE}Job analysis:\n{context}\n\n"
+
+
+def trimmed_job_prefix(job_analysis: JobAnalysisResult) -> str:
+    """Prefix for over-budget prompts, with the analysis trimmed to its own themes and responsibilities.
+
+    The trim depends only on the job, so every over-budget prompt about it,
+    whatever the question or prompt type, shares this prefix. Cached per
+    analysis object like :func:`job_context`.
+    """
+
+    key = id(job_analysis)
+    cached = _trimmed_prefix_cache.get(key)
+    if cached is not None and cached[0] is job_analysis:
+        _trimmed_prefix_cache.move_to_end(key)
+        return cached[1]
+
+    focus = " ".join([*job_analysis.themes, *job_analysis.responsibilities])
+    prefix = job_prefix(trim_job_analysis(job_analysis, focus), cached=False)
+    _trimmed_prefix_cache[key] = (job_analysis, prefix)
+    if len(_trimmed_prefix_cache) > _CONTEXT_CACHE_SIZE:
+        _trimmed_prefix_cache.popitem(last=False)
+    return prefix
+
 
 def build_job_analysis_prompt(job_description: str) -> str:
     """Prompt LLM to extract structured insights from a job description."""
@@ -19,18 +282,44 @@ def build_job_analysis_prompt(job_description: str) -> str:
     )
 
 
-def build_role_question_prompt(job_analysis: JobAnalysisResult) -> str:
-    """Prompt LLM to craft a role-specific interview question."""
+def build_job_analysis_chunk_prompt(chunk: str, index: int, total: int) -> str:
+    """Prompt LLM to analyze one section-aligned part of a long job description."""
 
-    context = json.dumps(job_analysis.model_dump(), indent=2)
     return (
-        "Given the analyzed job data below, craft ONE thoughtful role-specific interview question\n"
-        "that probes the candidate's fit for the themes and responsibilities. Return JSON like:\n"
-        '{"question": "..."}\n\n'
-        f"Job Analysis:\n{context}\n"
+        f"The following is part {index + 1} of {total} of a long job posting; other parts are analyzed separately.\n"
+        f"Extract only what this part states. Return ONLY valid minified JSON with the keys: "
+        f"skills, responsibilities, competencies, values, themes, summary.\n"
+        f"Use empty lists for keys this part does not cover. Each list item is a concise phrase (max 12 words). "
+        f"The summary is one sentence about the role, or empty if this part does not describe it.\n\n"
+        f"Job Description (part {index + 1}/{total}):\n"
+        f"{chunk}\n"
     )
 
 
+def build_role_question_prompt(job_analysis: JobAnalysisResult, *, budget: Optional[int] = None) -> str:
+    """Prompt LLM to craft a role-specific interview question.
+
+    ``budget`` overrides the configured token budget; ``0`` disables it.
+    """
+
+    def render(prefix: str) -> str:
+        return (
+            f"{prefix}"
+            "Task: craft ONE thoughtful role-specific interview question\n"
+            "that probes the candidate's fit for the themes and responsibilities. Return JSON like:\n"
+            '{"question": "..."}\n'
+        )
+
+    budget = token_budget("role_question") if budget is None else (budget or None)
+    prompt = render(job_prefix(job_analysis))
+    report = PromptReport("role_question", budget, estimate_tokens(prompt), 0, len(prompt), 0)
+    if budget is not None and report.original_tokens > budget:
+        prompt = render(trimmed_job_prefix(job_analysis))
+        report.trimmed_analysis = True
+    _finish_report(report, prompt, None if report.trimmed_analysis else report.original_tokens)
+    return prompt
+
+
 def build_star_prompt(
     *,
     question: str,
@@ -38,27 +327,59 @@ def build_star_prompt(
     job_analysis: JobAnalysisResult,
     mode: str,
     include_next_question: bool,
+    budget: Optional[int] = None,
 ) -> str:
-    """Prompt the LLM to evaluate an answer using the STAR method."""
+    """Prompt the LLM to evaluate an answer using the STAR method.
+
+    Over the ``star_evaluation`` token budget (``budget`` overrides it, ``0``
+    disables it) the job-trimmed prefix is used first, and the answer is
+    condensed (towards the question) only if that is not enough.
+    """
 
-    job_json = json.dumps(job_analysis.model_dump(), indent=2)
     next_q_instruction = (
         "Include a `next_question` field with a follow-up question aligned to the job themes."
         if include_next_question
         else "Do NOT include `next_question`."
     )
 
-    return (
-        "You are an expert interview coach analyzing a candidate's answer.\n"
-        "Use the STAR method and evaluate the response to the provided question.\n"
-        f"Return ONLY JSON with keys: star, strengths, weaknesses, fit_summary, score, improvements"
-        f"{', next_question' if include_next_question else ''}.\n"
-        "score must be an integer between 1 and 5.\n"
-        "STAR must contain situation, task, action, result fields.\n"
-        f"{next_q_instruction}\n\n"
-        f"Interview mode: {mode}\n"
-        "Job analysis:\n"
-        f"{job_json}\n\n"
-        f"Question: {question}\n"
-        f"Answer: {answer}\n"
-    )
+    def render(prefix: str, answer_text: str) -> str:
+        return (
+            f"{prefix}"
+            "Task: analyze the candidate's answer below.\n"
+            "Use the STAR method and evaluate the response to the provided question.\n"
+            f"Return ONLY JSON with keys: star, strengths, weaknesses, fit_summary, score, improvements"
+            f"{', next_question' if include_next_question else ''}.\n"
+            "score must be an integer between 1 and 5.\n"
+            "STAR must contain situation, task, action, result fields.\n"
+            f"{next_q_instruction}\n\n"
+            f"Interview mode: {mode}\n"
+            f"Question: {question}\n"
+            f"Answer: {answer_text}\n"
+        )
+
+    budget = token_budget("star_evaluation") if budget is None else (budget or None)
+    prompt = render(job_prefix(job_analysis), answer)
+    report = PromptReport("star_evaluation", budget, estimate_tokens(prompt), 0, len(prompt), 0)
+    if budget is None or report.original_tokens <= budget:
+        _finish_report(report, prompt, report.original_tokens)
+        return prompt
+
+    # Trimming depends only on the job, so over-budget prompts keep a shared cacheable prefix.
+    prefix = trimmed_job_prefix(job_analysis)
+    prompt = render(prefix, answer)
+    report.trimmed_analysis = True
+    tokens = estimate_tokens(prompt)
+    if tokens > budget:
+        answer_tokens = estimate_tokens(answer)
+        allowance = max(_MIN_ANSWER_TOKENS, budget - (tokens - answer_tokens))
+        prompt = render(prefix, condense_answer(answer, allowance, question))
+        report.condensed_answer = True
+        tokens = None
+    _finish_report(report, prompt, tokens)
+    return prompt
+
+
+def _finish_report(report: PromptReport, prompt: str, tokens: Optional[int] = None) -> None:
+    report.final_chars = len(prompt)
+    report.final_tokens = estimate_tokens(prompt) if tokens is None else tokens
+    _report(report)
@@ -0,0 +1,22 @@
+"""Fixed interview question banks."""
+
+BEHAVIORAL_QUESTIONS = [
+    "Tell me about a time you faced a challenge at work or school.",
+    "Describe a time when you had to work under pressure.",
+    "Tell me about a time you took initiative.",
+    "Describe a time you worked on a team project.",
+    "Tell me about a conflict you had and how you resolved it.",
+    "Describe a time you solved a complex problem.",
+    "Tell me about a time you had to learn something quickly.",
+    "Describe a time you made a mistake and how you handled it.",
+    "Tell me about a time you had to persuade someone.",
+    "Describe a time you showed leadership.",
+]
+
+GENERAL_QUESTIONS = [
+    "Tell me about yourself.",
+    "Why do you want this job?",
+    "Why this company?",
+    "What are your strengths?",
+    "What is a weakness you're working on?",
+]
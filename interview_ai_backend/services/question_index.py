@@ -0,0 +1,273 @@
+"""Retrieval index that reuses previously generated role questions.
+
+Each LLM-generated question is stored with an embedding of the job analysis
+that produced it: TF-IDF weights from the local job analyzer, folded into a
+fixed number of hashed dimensions and L2-normalized. Embeddings live in one
+NumPy matrix, so a lookup is a single matrix-vector product followed by a
+top-k selection. When a path is configured the matrix is a memory-mapped
+``.npy`` file and the questions are an append-only JSONL sidecar, so the index
+survives restarts and grows one row at a time. Worker processes may share the
+files: every append (and every growth of the matrix) holds an exclusive
+``flock`` on a ``.lock`` sidecar and first catches up with rows the other
+processes added, so sidecar line ``i`` always describes matrix row ``i``.
+Lookups pick up other processes' rows as their sidecar lines appear. NumPy
+and the stored matrix are loaded on first use rather than at import.
+"""
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, AbstractSet, Iterator, List, Optional, Tuple
+
+from models.job_models import JobAnalysisResult
+from services.interning import job_analysis_key
+from services.job_analyzer import get_analyzer
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily at runtime
+    import numpy as np
+
+_INITIAL_CAPACITY = 256
+
+
+def embed_job_analysis(job_analysis: JobAnalysisResult, dim: int) -> np.ndarray:
+    """Hashed, L2-normalized TF-IDF embedding of a job analysis' themes, responsibilities and skills."""
+
+    import numpy as np
+
+    text = "\n".join([*job_analysis.themes, *job_analysis.responsibilities, *job_analysis.skills])
+    sparse = get_analyzer().vectorize(text)
+    vector = np.zeros(dim, dtype=np.float32)
+    if len(sparse):
+        indices = np.frombuffer(sparse.indices, dtype=np.uint64 if sparse.indices.itemsize == 8 else np.uint32)
+        np.add.at(vector, (indices % dim).astype(np.intp), np.frombuffer(sparse.values, dtype=np.float64))
+    norm = float(np.linalg.norm(vector))
+    if norm:
+        vector /= norm
+    return vector
+
+
+class QuestionIndex:
+    """Cosine top-k lookup of stored role questions by job-analysis similarity."""
+
+    def __init__(
+        self,
+        *,
+        path: Optional[str] = None,
+        dim: int = 512,
+        threshold: float = 0.75,
+        top_k: int = 5,
+        enabled: bool = True,
+    ) -> None:
+        self.dim = dim
+        self.threshold = threshold
+        self.top_k = top_k
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # Row -> question; None marks a row whose sidecar line was torn by a crash.
+        self._questions: List[Optional[str]] = []
+        self._known: set = set()
+        self._matrix_path: Optional[Path] = None
+        self._questions_path: Optional[Path] = None
+        self._lock_path: Optional[Path] = None
+        if path:
+            base = Path(path)
+            self._matrix_path = base.with_suffix(".npy")
+            self._questions_path = base.with_suffix(".jsonl")
+            self._lock_path = base.with_suffix(".lock")
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_inode: Optional[int] = None
+        self._sidecar_offset = 0
+
+    @classmethod
+    def from_env(cls) -> "QuestionIndex":
+        """Build an index configured from ROLE_QUESTION_INDEX_* environment variables."""
+
+        return cls(
+            path=os.getenv("ROLE_QUESTION_INDEX_PATH") or None,
+            dim=int(os.getenv("ROLE_QUESTION_INDEX_DIM", "512")),
+            threshold=float(os.getenv("ROLE_QUESTION_INDEX_THRESHOLD", "0.75")),
+            top_k=int(os.getenv("ROLE_QUESTION_INDEX_TOP_K", "5")),
+            enabled=os.getenv("ROLE_QUESTION_INDEX", "1").lower() in {"1", "true", "yes"},
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._questions)
+
+    def search(
+        self, job_analysis: JobAnalysisResult, k: Optional[int] = None, exclude: AbstractSet[str] = frozenset()
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``k`` (question, cosine) pairs at or above the threshold, best first."""
+
+        import numpy as np
+
+        k = k or self.top_k
+        with self._lock:
+            self._ensure_loaded()
+            self._catch_up()
+            count = len(self._questions)
+            if not self.enabled or not count:
+                return []
+            query = embed_job_analysis(job_analysis, self.dim)
+            scores = self._matrix[:count] @ query
+            # Over-fetch so excluded questions do not starve the result.
+            fetch = min(count, k + len(exclude))
+            top = np.argpartition(-scores, fetch - 1)[:fetch]
+            top = top[np.argsort(-scores[top])]
+            results: List[Tuple[str, float]] = []
+            for row in top:
+                score = float(scores[row])
+                if score < self.threshold:
+                    break
+                question = self._questions[row]
+                if question is None or question in exclude:
+                    continue
+                results.append((question, score))
+                if len(results) == k:
+                    break
+            return results
+
+    def best_match(self, job_analysis: JobAnalysisResult, exclude: AbstractSet[str] = frozenset()) -> Optional[str]:
+        matches = self.search(job_analysis, k=1, exclude=exclude)
+        return matches[0][0] if matches else None
+
+    def add(self, job_analysis: JobAnalysisResult, question: str) -> bool:
+        """Index ``question`` under ``job_analysis``; returns False if it was already stored."""
+
+        if not self.enabled:
+            return False
+        vector = embed_job_analysis(job_analysis, self.dim)
+        with self._lock:
+            self._ensure_loaded()  # takes the file lock itself; flock does not nest across descriptors
+            with self._file_lock():
+                self._catch_up(terminate=True)
+                if question in self._known:
+                    return False
+                row = len(self._questions)
+                if row >= self._matrix.shape[0]:
+                    self._grow()
+                self._matrix[row] = vector
+                if self._questions_path is not None:
+                    self._matrix.flush()
+                    # The sidecar is the commit point: a row without a line is ignored on load.
+                    record = {"question": question, "job_key": job_analysis_key(job_analysis)}
+                    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+                    with self._questions_path.open("ab") as handle:
+                        handle.write(line)
+                    self._sidecar_offset += len(line)
+                self._questions.append(question)
+                self._known.add(question)
+                return True
+
+    def _ensure_loaded(self) -> None:
+        if self._matrix is None:
+            with self._file_lock():
+                self._matrix = self._load()
+                self._catch_up()
+
+    def _load(self) -> np.ndarray:
+        import numpy as np
+
+        if self._matrix_path is None or self._questions_path is None:
+            return np.zeros((_INITIAL_CAPACITY, self.dim), dtype=np.float32)
+
+        self._matrix_path.parent.mkdir(parents=True, exist_ok=True)
+        if self._matrix_path.exists():
+            matrix = np.load(self._matrix_path, mmap_mode="r+")
+            if matrix.shape[1] != self.dim:
+                raise ValueError(
+                    f"Question index at {self._matrix_path} has dimension {matrix.shape[1]}, expected {self.dim}"
+                )
+        else:
+            matrix = self._create(self._matrix_path, _INITIAL_CAPACITY)
+        self._matrix_inode = os.stat(self._matrix_path).st_ino
+        return matrix
+
+    def _catch_up(self, *, terminate: bool = False) -> None:
+        """Adopt rows other processes committed since the last look; call with ``_lock`` held.
+
+        With ``terminate`` (only under the file lock) a line torn by a crash is
+        closed off so that the next append starts on a line of its own.
+        """
+
+        if self._questions_path is None or not self._questions_path.exists():
+            return
+        if os.stat(self._matrix_path).st_ino != self._matrix_inode:
+            self._reopen()  # another process grew the matrix
+        with self._questions_path.open("r+b" if terminate else "rb") as handle:
+            handle.seek(self._sidecar_offset)
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    if terminate:
+                        handle.seek(0, os.SEEK_END)
+                        handle.write(b"\n")
+                        self._sidecar_offset += len(line) + 1
+                        self._questions.append(None)
+                    break
+                if len(self._questions) >= self._matrix.shape[0]:
+                    self._reopen()
+                    if len(self._questions) >= self._matrix.shape[0]:
+                        break
+                self._sidecar_offset += len(line)
+                try:
+                    question = json.loads(line)["question"]
+                except (ValueError, KeyError):
+                    question = None  # torn by a crash; the row stays so later rows keep their line
+                self._questions.append(question)
+                if question is not None:
+                    self._known.add(question)
+
+    def _reopen(self) -> None:
+        import numpy as np
+
+        self._matrix = None
+        self._matrix = np.load(self._matrix_path, mmap_mode="r+")
+        self._matrix_inode = os.stat(self._matrix_path).st_ino
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive lock shared with other processes using the same index files."""
+
+        if self._lock_path is None:
+            yield
+            return
+        self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # releases the lock
+
+    def _create(self, path: Path, capacity: int) -> np.ndarray:
+        import numpy as np
+
+        return np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+
+    def _grow(self) -> None:
+        """Double the matrix capacity, swapping in a new memory map atomically when persisted."""
+
+        import numpy as np
+
+        capacity = self._matrix.shape[0] * 2
+        rows = len(self._questions)
+        if self._matrix_path is None:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[:rows] = self._matrix[:rows]
+            self._matrix = grown
+            return
+
+        staging = self._matrix_path.with_suffix(".npy.tmp")
+        grown = self._create(staging, capacity)
+        grown[:rows] = self._matrix[:rows]
+        grown.flush()
+        del grown
+        self._matrix.flush()
+        self._matrix = None  # release the old mapping before replacing the file
+        os.replace(staging, self._matrix_path)
+        self._reopen()
@@ -0,0 +1,677 @@
+"""Pluggable storage backends for interview session state."""
+from __future__ import annotations
+
+import json
+import math
+import os
+import socket
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from models.job_models import JobAnalysisResult
+from services import interning
+
+_ANALYSIS_FIELDS = ("skills", "responsibilities", "competencies", "values", "themes", "summary")
+_CODEC_VERSION = 2
+_COMPRESS_THRESHOLD = 512
+# Redis values are prefixed with b"t" and the session's creation time (a big-endian double).
+_CREATED_TAG = b"t"
+_CREATED_HEADER = struct.Struct(">cd")
+_CREATED_CACHE_SIZE = 4096
+
+
+class InterviewSessionState:
+    """Compact in-memory representation of an interview session.
+
+    The job analysis is held by content hash in the shared
+    :data:`services.interning.job_analyses` registry and asked questions are
+    stored as question IDs (bank indices or interned generated questions).
+    The state only owns registry references after :meth:`retain`, which the
+    in-memory store calls for sessions it keeps alive and :func:`decode_session`
+    calls for states read back from a shared store; references still held when
+    the state is garbage collected are released then.
+    """
+
+    __slots__ = ("session_id", "mode", "job_key", "pointer", "question_ids", "_retained")
+
+    def __init__(
+        self,
+        session_id: str,
+        mode: str,
+        job_analysis: Optional[JobAnalysisResult] = None,
+        pointer: int = 1,  # index for the next fixed question (first question already served)
+        asked_questions: Optional[List[str]] = None,
+        *,
+        job_key: Optional[str] = None,
+        question_ids: Optional[List[int]] = None,
+    ) -> None:
+        if job_key is None:
+            if job_analysis is None:
+                raise ValueError("Either job_analysis or job_key is required")
+            job_key = interning.job_analyses.intern(job_analysis)
+        self.session_id = session_id
+        self.mode = mode
+        self.job_key = job_key
+        self.pointer = pointer
+        self.question_ids = array("I", question_ids or ())
+        for question in asked_questions or ():
+            self.question_ids.append(interning.questions.intern(question))
+        self._retained = False
+
+    @property
+    def job_analysis(self) -> JobAnalysisResult:
+        return interning.job_analyses.get(self.job_key)
+
+    @property
+    def asked_questions(self) -> List[str]:
+        lookup = interning.questions.get
+        return [lookup(question_id) for question_id in self.question_ids]
+
+    def add_question(self, question: str) -> None:
+        question_id = interning.questions.intern(question)
+        if self._retained:
+            interning.questions.retain(question_id)
+        self.question_ids.append(question_id)
+
+    def retain(self) -> None:
+        """Take registry references for the analysis and every asked question."""
+
+        if self._retained:
+            return
+        interning.job_analyses.retain(self.job_key)
+        for question_id in self.question_ids:
+            interning.questions.retain(question_id)
+        self._retained = True
+
+    def release(self) -> None:
+        if not self._retained:
+            return
+        interning.job_analyses.release(self.job_key)
+        for question_id in self.question_ids:
+            interning.questions.release(question_id)
+        self._retained = False
+
+    def __del__(self) -> None:
+        if getattr(self, "_retained", False):
+            self.release()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, InterviewSessionState):
+            return NotImplemented
+        return (
+            self.session_id == other.session_id
+            and self.mode == other.mode
+            and self.job_key == other.job_key
+            and self.pointer == other.pointer
+            and self.asked_questions == other.asked_questions
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"InterviewSessionState(session_id={self.session_id!r}, mode={self.mode!r}, "
+            f"job_key={self.job_key!r}, pointer={self.pointer}, question_ids={list(self.question_ids)})"
+        )
+
+
+def encode_session(state: InterviewSessionState) -> bytes:
+    """Serialize a session as a positional JSON array, deflated when large.
+
+    Bank questions are written as their index and generated questions as text,
+    so the encoding does not depend on process-local intern IDs.
+    """
+
+    analysis = state.job_analysis
+    asked: List[Any] = [
+        question_id if interning.questions.is_bank(question_id) else interning.questions.get(question_id)
+        for question_id in state.question_ids
+    ]
+    payload = [
+        _CODEC_VERSION,
+        state.session_id,
+        state.mode,
+        state.job_key,
+        [getattr(analysis, name) for name in _ANALYSIS_FIELDS],
+        state.pointer,
+        asked,
+    ]
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(raw) >= _COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(raw, 6)
+    return b"j" + raw
+
+
+def decode_session(data: bytes) -> InterviewSessionState:
+    """Inverse of :func:`encode_session`."""
+
+    tag, body = data[:1], data[1:]
+    if tag == b"z":
+        body = zlib.decompress(body)
+    elif tag != b"j":
+        raise ValueError("Unknown session encoding")
+    version, session_id, mode, job_key, analysis, pointer, asked = json.loads(body)
+    if version != _CODEC_VERSION:
+        raise ValueError(f"Unsupported session encoding version {version}")
+    if job_key not in interning.job_analyses:
+        job_analysis = JobAnalysisResult.model_construct(**dict(zip(_ANALYSIS_FIELDS, analysis)))
+        job_key = interning.job_analyses.intern(job_analysis)
+    question_ids = [item if isinstance(item, int) else interning.questions.intern(item) for item in asked]
+    state = InterviewSessionState(
+        session_id=session_id,
+        mode=mode,
+        pointer=pointer,
+        job_key=job_key,
+        question_ids=question_ids,
+    )
+    # Hold the entries while the state is in use: an idle entry may otherwise be
+    # evicted and its question ID handed to a different question.
+    state.retain()
+    return state
+
+
+class SessionStore:
+    """Interface shared by every session backend.
+
+    ``get`` refreshes the idle timer of a live session; expired sessions are
+    reported as missing. ``put`` must be called after mutating a state object
+    so that shared backends observe the change.
+    """
+
+    def get(self, session_id: str) -> Optional[InterviewSessionState]:
+        raise NotImplementedError
+
+    def put(self, state: InterviewSessionState) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def contains(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def evict_expired(self) -> int:
+        """Drop expired sessions and return how many were removed."""
+
+        return 0
+
+    def put_analysis(self, analysis_id: str, body: bytes, ttl_seconds: float) -> None:
+        """Share an analysis handle's response body with other workers; process-local stores skip it."""
+
+    def get_analysis(self, analysis_id: str) -> Optional[bytes]:
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class _Shard:
+    __slots__ = ("lock", "entries")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # session_id -> (state, created_at, last_access)
+        self.entries: Dict[str, Tuple[InterviewSessionState, float, float]] = {}
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store sharded by session id with TTL and idle eviction."""
+
+    def __init__(
+        self,
+        *,
+        shards: int = 16,
+        ttl_seconds: float = 6 * 60 * 60,
+        idle_seconds: float = 60 * 60,
+        sweep_every: int = 256,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._ttl = ttl_seconds
+        self._idle = idle_seconds
+        self._sweep_every = sweep_every
+        self._ops = 0
+        self.on_evict = on_evict
+
+    def get(self, session_id: str) -> Optional[InterviewSessionState]:
+        shard = self._shard(session_id)
+        now = time.monotonic()
+        with shard.lock:
+            entry = shard.entries.get(session_id)
+            if entry is None:
+                return None
+            state, created_at, last_access = entry
+            if self._expired(now, created_at, last_access):
+                del shard.entries[session_id]
+                state.release()
+                expired = True
+            else:
+                shard.entries[session_id] = (state, created_at, now)
+                expired = False
+        if expired:
+            self._notify_evicted([session_id])
+            return None
+        return state
+
+    def put(self, state: InterviewSessionState) -> None:
+        shard = self._shard(state.session_id)
+        now = time.monotonic()
+        with shard.lock:
+            entry = shard.entries.get(state.session_id)
+            created_at = entry[1] if entry is not None else now
+            if entry is not None and entry[0] is not state:
+                entry[0].release()
+            state.retain()
+            shard.entries[state.session_id] = (state, created_at, now)
+        self._ops += 1
+        if self._sweep_every and self._ops % self._sweep_every == 0:
+            self.evict_expired()
+
+    def delete(self, session_id: str) -> None:
+        shard = self._shard(session_id)
+        with shard.lock:
+            entry = shard.entries.pop(session_id, None)
+        if entry is not None:
+            entry[0].release()
+
+    def count(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def evict_expired(self) -> int:
+        now = time.monotonic()
+        evicted: List[str] = []
+        for shard in self._shards:
+            with shard.lock:
+                stale = [
+                    session_id
+                    for session_id, (_, created_at, last_access) in shard.entries.items()
+                    if self._expired(now, created_at, last_access)
+                ]
+                for session_id in stale:
+                    shard.entries.pop(session_id)[0].release()
+            evicted.extend(stale)
+        self._notify_evicted(evicted)
+        return len(evicted)
+
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _expired(self, now: float, created_at: float, last_access: float) -> bool:
+        return bool(
+            (self._ttl and now - created_at > self._ttl) or (self._idle and now - last_access > self._idle)
+        )
+
+    def _notify_evicted(self, session_ids: List[str]) -> None:
+        if self.on_evict is None:
+            return
+        for session_id in session_ids:
+            self.on_evict(session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite (WAL) store that lets several worker processes share sessions."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttl_seconds: float = 6 * 60 * 60,
+        idle_seconds: float = 60 * 60,
+        sweep_every: int = 256,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._idle = idle_seconds
+        self._sweep_every = sweep_every
+        self._ops = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS interview_sessions ("
+            "session_id TEXT PRIMARY KEY, payload BLOB NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS interview_sessions_last_access ON interview_sessions (last_access)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_handles ("
+            "analysis_id TEXT PRIMARY KEY, body BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, session_id: str) -> Optional[InterviewSessionState]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at, last_access FROM interview_sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            payload, created_at, last_access = row
+            if self._expired(now, created_at, last_access):
+                self._conn.execute("DELETE FROM interview_sessions WHERE session_id = ?", (session_id,))
+                return None
+            self._conn.execute(
+                "UPDATE interview_sessions SET last_access = ? WHERE session_id = ?", (now, session_id)
+            )
+        return decode_session(payload)
+
+    def put(self, state: InterviewSessionState) -> None:
+        now = time.time()
+        payload = encode_session(state)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO interview_sessions (session_id, payload, created_at, last_access) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT(session_id) DO UPDATE SET "
+                "payload = excluded.payload, last_access = excluded.last_access",
+                (state.session_id, payload, now, now),
+            )
+        self._ops += 1
+        if self._sweep_every and self._ops % self._sweep_every == 0:
+            self.evict_expired()
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM interview_sessions WHERE session_id = ?", (session_id,))
+
+    def contains(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM interview_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row is not None
+
+    def count(self) -> int:
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COUNT(*) FROM interview_sessions").fetchone()
+        return total
+
+    def evict_expired(self) -> int:
+        now = time.time()
+        clauses, params = [], []
+        if self._ttl:
+            clauses.append("created_at < ?")
+            params.append(now - self._ttl)
+        if self._idle:
+            clauses.append("last_access < ?")
+            params.append(now - self._idle)
+        if not clauses:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM interview_sessions WHERE {' OR '.join(clauses)}", params
+            )
+            self._conn.execute("DELETE FROM analysis_handles WHERE expires_at < ?", (now,))
+        return cursor.rowcount
+
+    def put_analysis(self, analysis_id: str, body: bytes, ttl_seconds: float) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else float("inf")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_handles (analysis_id, body, expires_at) VALUES (?, ?, ?)",
+                (analysis_id, body, expires_at),
+            )
+
+    def get_analysis(self, analysis_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM analysis_handles WHERE analysis_id = ? AND expires_at >= ?",
+                (analysis_id, time.time()),
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _expired(self, now: float, created_at: float, last_access: float) -> bool:
+        return bool(
+            (self._ttl and now - created_at > self._ttl) or (self._idle and now - last_access > self._idle)
+        )
+
+
+class RedisProtocolError(RuntimeError):
+    """Raised when a Redis-protocol server returns an error reply."""
+
+
+class _RESPConnection:
+    """Minimal blocking RESP2 client; enough for the session store commands."""
+
+    def __init__(self, host: str, port: int, db: int, password: Optional[str], timeout: float) -> None:
+        self._address = (host, port)
+        self._db = db
+        self._password = password
+        self._timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader: Any = None
+
+    def execute(self, *args: Any) -> Any:
+        try:
+            return self._roundtrip(args)
+        except (OSError, EOFError):
+            # One reconnect attempt covers idle connections closed by the server.
+            self.close()
+            return self._roundtrip(args)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+                self._reader = None
+
+    def _roundtrip(self, args: Tuple[Any, ...]) -> Any:
+        if self._sock is None:
+            self._connect()
+        self._sock.sendall(_encode_command(args))
+        return self._read_reply()
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection(self._address, timeout=self._timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self._password:
+            self._sock.sendall(_encode_command(("AUTH", self._password)))
+            self._read_reply()
+        if self._db:
+            self._sock.sendall(_encode_command(("SELECT", self._db)))
+            self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise EOFError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisProtocolError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RedisProtocolError(f"Unexpected reply type {kind!r}")
+
+
+def _encode_command(args: Tuple[Any, ...]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        else:
+            data = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+class RedisSessionStore(SessionStore):
+    """Store sessions in any Redis-protocol server with idle expiry via EX.
+
+    Each value starts with the session's creation time, and every ``EX`` is
+    capped at the time left until ``ttl_seconds`` after it, so sessions also
+    expire absolutely like in the other stores.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://127.0.0.1:6379/0",
+        *,
+        ttl_seconds: float = 6 * 60 * 60,
+        idle_seconds: float = 60 * 60,
+        key_prefix: str = "interview:session:",
+        analysis_prefix: str = "interview:analysis:",
+        timeout: float = 2.0,
+    ) -> None:
+        parsed = urlparse(url)
+        db = int(parsed.path.lstrip("/") or 0)
+        self._conn = _RESPConnection(
+            parsed.hostname or "127.0.0.1", parsed.port or 6379, db, parsed.password, timeout
+        )
+        self._lock = threading.Lock()
+        self._ttl = ttl_seconds
+        self._idle = max(1, int(idle_seconds))
+        self._prefix = key_prefix
+        self._analysis_prefix = analysis_prefix
+        # session_id -> created_at for sessions this process read or wrote, so put skips a GET.
+        self._created: "OrderedDict[str, float]" = OrderedDict()
+
+    def get(self, session_id: str) -> Optional[InterviewSessionState]:
+        key = self._key(session_id)
+        now = time.time()
+        with self._lock:
+            value = self._conn.execute("GET", key)
+            if value is None:
+                self._created.pop(session_id, None)
+                return None
+            created_at, payload = _split_created(value, now)
+            expire = self._expire_seconds(now, created_at)
+            if expire is None:
+                self._conn.execute("DEL", key)
+                self._created.pop(session_id, None)
+                return None
+            self._conn.execute("EXPIRE", key, expire)
+            self._remember_created(session_id, created_at)
+        return decode_session(payload)
+
+    def put(self, state: InterviewSessionState) -> None:
+        key = self._key(state.session_id)
+        payload = encode_session(state)
+        now = time.time()
+        with self._lock:
+            created_at = self._created.get(state.session_id)
+            if created_at is None:
+                existing = self._conn.execute("GET", key)
+                created_at = _split_created(existing, now)[0] if existing is not None else now
+            expire = self._expire_seconds(now, created_at)
+            if expire is None:
+                self._conn.execute("DEL", key)
+                self._created.pop(state.session_id, None)
+                return
+            self._conn.execute("SET", key, _CREATED_HEADER.pack(_CREATED_TAG, created_at) + payload, "EX", expire)
+            self._remember_created(state.session_id, created_at)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DEL", self._key(session_id))
+            self._created.pop(session_id, None)
+
+    def contains(self, session_id: str) -> bool:
+        with self._lock:
+            return bool(self._conn.execute("EXISTS", self._key(session_id)))
+
+    def count(self) -> int:
+        return sum(1 for _ in self._scan_keys())
+
+    def put_analysis(self, analysis_id: str, body: bytes, ttl_seconds: float) -> None:
+        key = f"{self._analysis_prefix}{analysis_id}"
+        with self._lock:
+            if ttl_seconds:
+                self._conn.execute("SET", key, body, "EX", max(1, int(ttl_seconds)))
+            else:
+                self._conn.execute("SET", key, body)
+
+    def get_analysis(self, analysis_id: str) -> Optional[bytes]:
+        with self._lock:
+            return self._conn.execute("GET", f"{self._analysis_prefix}{analysis_id}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _scan_keys(self) -> Iterator[bytes]:
+        cursor = b"0"
+        while True:
+            with self._lock:
+                cursor, keys = self._conn.execute("SCAN", cursor, "MATCH", f"{self._prefix}*", "COUNT", 1000)
+            yield from keys
+            if cursor in (b"0", "0"):
+                return
+
+    def _key(self, session_id: str) -> str:
+        return f"{self._prefix}{session_id}"
+
+    def _expire_seconds(self, now: float, created_at: float) -> Optional[int]:
+        """Idle expiry capped at the remaining absolute lifetime; None once that has run out."""
+
+        if not self._ttl:
+            return self._idle
+        remaining = created_at + self._ttl - now
+        if remaining <= 0:
+            return None
+        return max(1, min(self._idle, math.ceil(remaining)))
+
+    def _remember_created(self, session_id: str, created_at: float) -> None:
+        self._created[session_id] = created_at
+        self._created.move_to_end(session_id)
+        while len(self._created) > _CREATED_CACHE_SIZE:
+            self._created.popitem(last=False)
+
+
+def _split_created(value: bytes, now: float) -> Tuple[float, bytes]:
+    """Split a stored Redis value into its creation time and encoded session."""
+
+    if value[:1] == _CREATED_TAG:
+        _, created_at = _CREATED_HEADER.unpack_from(value)
+        return created_at, value[_CREATED_HEADER.size :]
+    return now, value  # written before values carried their creation time
+
+
+def create_session_store_from_env() -> SessionStore:
+    """Build the store selected by SESSION_STORE (memory, sqlite or redis)."""
+
+    backend = os.getenv("SESSION_STORE", "memory").lower()
+    ttl = float(os.getenv("SESSION_TTL_SECONDS", str(6 * 60 * 60)))
+    idle = float(os.getenv("SESSION_IDLE_SECONDS", str(60 * 60)))
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            os.getenv("SESSION_SQLITE_PATH", "sessions.db"), ttl_seconds=ttl, idle_seconds=idle
+        )
+    if backend == "redis":
+        return RedisSessionStore(
+            os.getenv("SESSION_REDIS_URL", "redis://127.0.0.1:6379/0"), ttl_seconds=ttl, idle_seconds=idle
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_STORE backend: {backend}")
+    return InMemorySessionStore(
+        shards=int(os.getenv("SESSION_STORE_SHARDS", "16")), ttl_seconds=ttl, idle_seconds=idle
+    )
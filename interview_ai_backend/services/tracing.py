@@ -0,0 +1,237 @@
+"""Per-request phase timings and an opt-in sampling profiler.
+
+Code marks phases with ``with phase("prompt_build"):`` or the ``@traced``
+decorator. :class:`TracingMiddleware` collects the phases of each HTTP
+request into a ``Server-Timing`` header and one structured log record on the
+``interview.trace`` logger. Outside a traced request the phase helpers are a
+context-variable lookup and nothing else.
+
+With ``TRACE_PROFILE_SAMPLE_RATE`` above zero, that fraction of requests is
+also sampled by a background thread that snapshots the event-loop thread's
+stack every ``TRACE_PROFILE_INTERVAL_SECONDS``. Stacks are written to
+``TRACE_PROFILE_DIR`` in the folded format read by ``flamegraph.pl``,
+speedscope and inferno. Concurrent requests share the loop thread, so a
+profile shows everything the loop did while the sampled request was open.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger("interview.trace")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current: "contextvars.ContextVar[Optional[RequestTrace]]" = contextvars.ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    """Phase durations recorded for one request, summed per phase name in first-seen order."""
+
+    __slots__ = ("started", "phases")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Render the phases plus the elapsed total as a ``Server-Timing`` header value."""
+
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.phases.items()]
+        entries.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(entries)
+
+
+class phase:
+    """Context manager timing the enclosed block as ``name`` in the current request's trace."""
+
+    __slots__ = ("name", "_trace", "_started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "phase":
+        self._trace = _current.get()
+        if self._trace is not None:
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._trace is not None:
+            self._trace.add(self.name, time.perf_counter() - self._started)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator form of :class:`phase` for sync and async functions; defaults to the function name."""
+
+    def decorate(function: F) -> F:
+        label = name or function.__name__
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with phase(label):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with phase(label):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer into folded-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: "Counter[str]" = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trace-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> "Counter[str]":
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def folded(self) -> str:
+        """``frame;frame;frame count`` lines, root first, as flamegraph tools expect."""
+
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class TracingMiddleware:
+    """ASGI middleware that installs a :class:`RequestTrace` for every HTTP request.
+
+    The ``Server-Timing`` header is added when the response starts, so for
+    streaming endpoints it covers the phases finished before the first byte;
+    the log record, written once the response completes, covers all of them.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        *,
+        server_timing: Optional[bool] = None,
+        log_records: Optional[bool] = None,
+        profile_rate: Optional[float] = None,
+        profile_interval: Optional[float] = None,
+        profile_dir: Optional[str] = None,
+    ) -> None:
+        self.app = app
+        self.server_timing = _env_flag("TRACE_SERVER_TIMING", True) if server_timing is None else server_timing
+        self.log_records = _env_flag("TRACE_LOG", True) if log_records is None else log_records
+        self.profile_rate = (
+            float(os.getenv("TRACE_PROFILE_SAMPLE_RATE", "0")) if profile_rate is None else profile_rate
+        )
+        self.profile_interval = (
+            float(os.getenv("TRACE_PROFILE_INTERVAL_SECONDS", "0.005"))
+            if profile_interval is None
+            else profile_interval
+        )
+        self.profile_dir = profile_dir or os.getenv("TRACE_PROFILE_DIR", "profiles")
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current.set(trace)
+        status = {"code": 500}
+        sampler: Optional[StackSampler] = None
+        if self.profile_rate > 0 and random.random() < self.profile_rate:
+            sampler = StackSampler(threading.get_ident(), self.profile_interval).start()
+
+        async def _send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                    message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            profile_path = None
+            if sampler is not None:
+                profile_path = await asyncio.to_thread(self._finish_profile, sampler, route)
+            if self.log_records:
+                self._log(trace, scope, route, status["code"], profile_path)
+
+    def _log(
+        self, trace: RequestTrace, scope: Dict[str, Any], route: str, status: int, profile: Optional[str]
+    ) -> None:
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        record = {
+            "route": route,
+            "method": scope.get("method", ""),
+            "status": status,
+            "total_ms": round(trace.elapsed() * 1000, 3),
+            "phases": {name: round(seconds * 1000, 3) for name, seconds in trace.phases.items()},
+        }
+        if profile:
+            record["profile"] = profile
+        logger.info(json.dumps(record, separators=(",", ":")), extra={"trace": record})
+
+    def _finish_profile(self, sampler: StackSampler, route: str) -> Optional[str]:
+        if not sampler.stop():
+            return None
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        path = os.path.join(self.profile_dir, f"{int(time.time())}-{slug}-{uuid.uuid4().hex[:8]}.folded")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(sampler.folded())
+        return path
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").lower() in {"1", "true", "yes"}
@@ -0,0 +1,381 @@
+"""Append-only interview transcript log with write-behind group commit.
+
+Every session start, question, graded answer and session end is appended as
+one JSON line. ``append`` only queues the record in memory; a background
+thread writes whatever has accumulated, one ``os.write`` per record on an
+``O_APPEND`` descriptor so records from several processes never interleave,
+followed by a single ``fsync`` (group commit). Request handlers never touch
+the disk.
+
+The log is off unless ``TRANSCRIPT_LOG_PATH`` is set. On startup, and
+whenever the file outgrows ``compact_bytes``, it is compacted: records of
+ended or expired sessions move to an append-only ``.archive`` segment next to
+the log, and the log keeps every record of the sessions still live, so the
+next replay only covers live sessions and no answer is ever discarded.
+A sidecar ``.lock`` file (``flock``) keeps writers out while the file is
+swapped; they reopen the new file on their next batch.
+"""
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MAX_WRITTEN_JOBS = 100_000
+
+
+@dataclass
+class SessionSnapshot:
+    """Session state folded from the transcript, enough to resume the interview."""
+
+    session_id: str
+    mode: str
+    job_key: str
+    job_analysis: Dict[str, Any]
+    pointer: int = 1
+    questions: List[str] = field(default_factory=list)
+    last_event_at: float = 0.0
+
+
+class TranscriptLog:
+    """JSONL transcript written by a group-committing background thread.
+
+    ``flush_interval`` is how long the writer lingers after the first pending
+    record to gather a larger group; ``max_batch`` cuts that short. When more
+    than ``max_pending`` records are waiting (the disk has stalled), new ones
+    are dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        *,
+        flush_interval: float = 0.05,
+        max_batch: int = 512,
+        max_pending: int = 100_000,
+        fsync: bool = True,
+        retain_seconds: Optional[float] = 60 * 60,
+        compact_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.path = path
+        self.retain_seconds = retain_seconds
+        self._compact_bytes = compact_bytes
+        self._flush_interval = flush_interval
+        self._max_batch = max(1, max_batch)
+        self._max_pending = max_pending
+        self._fsync = fsync
+        self._cond = threading.Condition()
+        self._pending: List[str] = []
+        self._appended = 0  # sequence number of the newest queued record
+        self._durable = 0  # sequence number of the newest record on disk
+        self._dropped = 0
+        self._batches = 0
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self._compactions = 0
+        # job_key -> when its analysis was last written. Compaction keeps job
+        # records younger than retain_seconds, so rewriting them after half
+        # that guarantees every new start record has its job on file.
+        self._written_jobs: Dict[str, float] = {}
+
+    @classmethod
+    def from_env(cls) -> "TranscriptLog":
+        """Build a log configured from TRANSCRIPT_LOG_* variables; disabled unless a path is set."""
+
+        return cls(
+            os.getenv("TRANSCRIPT_LOG_PATH") or None,
+            flush_interval=float(os.getenv("TRANSCRIPT_LOG_FLUSH_SECONDS", "0.05")),
+            max_batch=int(os.getenv("TRANSCRIPT_LOG_MAX_BATCH", "512")),
+            max_pending=int(os.getenv("TRANSCRIPT_LOG_MAX_PENDING", "100000")),
+            fsync=os.getenv("TRANSCRIPT_LOG_FSYNC", "1").lower() in {"1", "true", "yes"},
+            # Sessions idle longer than this are neither resumed nor kept by compaction.
+            retain_seconds=float(
+                os.getenv("TRANSCRIPT_RESUME_MAX_AGE_SECONDS", os.getenv("SESSION_IDLE_SECONDS", str(60 * 60)))
+            ),
+            compact_bytes=int(os.getenv("TRANSCRIPT_LOG_COMPACT_BYTES", str(64 * 1024 * 1024))),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def session_started(
+        self, session_id: str, mode: str, job_key: str, job_analysis: Dict[str, Any], pointer: int
+    ) -> None:
+        # Write each analysis once per process (and per half retention); replay resolves sessions by key.
+        now = time.time()
+        written_at = self._written_jobs.get(job_key)
+        if written_at is None or (self.retain_seconds and now - written_at > self.retain_seconds / 2):
+            if len(self._written_jobs) >= _MAX_WRITTEN_JOBS:
+                self._written_jobs.clear()
+            self._written_jobs[job_key] = now
+            self.append({"type": "job", "job_key": job_key, "analysis": job_analysis})
+        self.append(
+            {"type": "start", "session_id": session_id, "mode": mode, "job_key": job_key, "pointer": pointer}
+        )
+
+    def question_asked(self, session_id: str, question: str, pointer: int) -> None:
+        self.append({"type": "question", "session_id": session_id, "question": question, "pointer": pointer})
+
+    def answer_graded(
+        self, session_id: str, question: str, answer: str, evaluation: Dict[str, Any], *, source: str
+    ) -> None:
+        """Record a graded answer; ``source`` is "llm", "cache", "fallback", "provisional" or "deferred"."""
+
+        self.append(
+            {
+                "type": "answer",
+                "session_id": session_id,
+                "question": question,
+                "answer": answer,
+                "evaluation": evaluation,
+                "source": source,
+            }
+        )
+
+    def session_ended(self, session_id: str) -> None:
+        self.append({"type": "end", "session_id": session_id})
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Queue one record for the writer thread; never blocks on I/O."""
+
+        if self.path is None:
+            return
+        line = _dumps(dict(record, ts=time.time()))
+        with self._cond:
+            if len(self._pending) >= self._max_pending:
+                self._dropped += 1
+                if self._dropped == 1 or self._dropped % 1000 == 0:
+                    logger.warning("transcript log backlog full; %d records dropped", self._dropped)
+                return
+            self._pending.append(line)
+            self._appended += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._closing = False
+                self._thread = threading.Thread(target=self._run, name="transcript-log", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every record queued so far is on disk; returns False on timeout."""
+
+        with self._cond:
+            target = self._appended
+            return self._cond.wait_for(lambda: self._durable >= target, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Flush outstanding records and stop the writer thread."""
+
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "appended": self._appended,
+                "durable": self._durable,
+                "pending": len(self._pending),
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "compactions": self._compactions,
+            }
+
+    def replay_sessions(self, max_age_seconds: Optional[float] = None) -> Dict[str, SessionSnapshot]:
+        """Fold the log into snapshots of sessions that were not ended.
+
+        Sessions whose last event is older than ``max_age_seconds`` are left
+        out, as the session store would already have expired them.
+        """
+
+        return self._fold(max_age_seconds)[1]
+
+    def compact(self, max_age_seconds: Optional[float] = None) -> Dict[str, SessionSnapshot]:
+        """Move retired records to the archive segment and return the live sessions.
+
+        Every record of a live session (start, questions, answers with their
+        evaluations) stays in the log in order; records of ended or expired
+        sessions are appended to ``<path>.archive`` before the log is rewritten,
+        so nothing is deleted. ``max_age_seconds`` defaults to ``retain_seconds``.
+        Job records younger than that stay too, since this or another process
+        may still reference them from a start record it has not written yet.
+        """
+
+        if self.path is None:
+            return {}
+        max_age_seconds = self.retain_seconds if max_age_seconds is None else max_age_seconds
+        with self._locked(exclusive=True):
+            if not os.path.exists(self.path):
+                return {}
+            jobs, sessions = self._fold(max_age_seconds)
+            cutoff = time.time() - max_age_seconds if max_age_seconds else None
+            live_jobs = {snapshot.job_key for snapshot in sessions.values()}
+            kept_jobs = {
+                job_key for job_key, (ts, _) in jobs.items() if job_key in live_jobs or cutoff is None or ts >= cutoff
+            }
+            kept: List[str] = []
+            retired: List[str] = []
+            for record in self.read():
+                if record.get("type") == "job":
+                    live = record["job_key"] in kept_jobs
+                else:
+                    live = record.get("session_id") in sessions
+                (kept if live else retired).append(_dumps(record))
+            if retired:
+                with open(f"{self.path}.archive", "a", encoding="utf-8") as handle:
+                    handle.writelines(line + "\n" for line in retired)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            temporary = f"{self.path}.compact"
+            with open(temporary, "w", encoding="utf-8") as handle:
+                handle.writelines(line + "\n" for line in kept)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary, self.path)
+        with self._cond:
+            self._compactions += 1
+        return sessions
+
+    def _fold(
+        self, max_age_seconds: Optional[float]
+    ) -> Tuple[Dict[str, Tuple[float, Dict[str, Any]]], Dict[str, SessionSnapshot]]:
+        jobs: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        sessions: Dict[str, SessionSnapshot] = {}
+        for record in self.read():
+            kind = record.get("type")
+            if kind == "job":
+                jobs[record["job_key"]] = (record.get("ts", 0.0), record["analysis"])
+                continue
+            session_id = record.get("session_id")
+            if kind in {"start", "snapshot"}:  # "snapshot" records come from logs compacted by older versions
+                job = jobs.get(record["job_key"])
+                if job is None:
+                    continue
+                sessions[session_id] = SessionSnapshot(
+                    session_id=session_id,
+                    mode=record["mode"],
+                    job_key=record["job_key"],
+                    job_analysis=job[1],
+                    pointer=record.get("pointer", 1),
+                    questions=list(record.get("questions", ())),
+                    last_event_at=record["ts"],
+                )
+                continue
+            snapshot = sessions.get(session_id)
+            if snapshot is None:
+                continue
+            if kind == "end":
+                del sessions[session_id]
+                continue
+            snapshot.last_event_at = record["ts"]
+            if kind == "question":
+                snapshot.questions.append(record["question"])
+                snapshot.pointer = record["pointer"]
+
+        if max_age_seconds:
+            cutoff = time.time() - max_age_seconds
+            sessions = {key: value for key, value in sessions.items() if value.last_event_at >= cutoff}
+        return jobs, sessions
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Yield every durable record in order, skipping lines torn by a crash."""
+
+        if self.path is None or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning("skipping a partial record in transcript log %s", self.path)
+
+    @contextlib.contextmanager
+    def _locked(self, *, exclusive: bool) -> Iterator[None]:
+        """Hold the sidecar lock: shared to append, exclusive to swap in a compacted file."""
+
+        assert self.path is not None
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)  # releases the lock
+
+    def _open_for_append(self, fd: Optional[int]) -> int:
+        """Return an O_APPEND descriptor for the current file, reopening after a compaction swapped it."""
+
+        assert self.path is not None
+        if fd is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(fd).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        size = os.fstat(fd).st_size
+        if size:
+            with open(self.path, "rb") as reader:
+                reader.seek(size - 1)
+                if reader.read(1) != b"\n":
+                    os.write(fd, b"\n")  # terminate a record torn by a crash
+        return fd
+
+    def _run(self) -> None:
+        fd: Optional[int] = None
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._pending or self._closing)
+                    if not self._closing and len(self._pending) < self._max_batch:
+                        # Linger briefly so concurrent requests share one fsync.
+                        self._cond.wait_for(
+                            lambda: len(self._pending) >= self._max_batch or self._closing, self._flush_interval
+                        )
+                    batch, self._pending = self._pending, []
+                    target = self._appended
+                    if not batch and self._closing:
+                        return
+                size = 0
+                try:
+                    with self._locked(exclusive=False):
+                        fd = self._open_for_append(fd)
+                        for line in batch:
+                            # One write per record: O_APPEND keeps it whole next to other processes' records.
+                            os.write(fd, (line + "\n").encode("utf-8"))
+                        if self._fsync:
+                            os.fsync(fd)
+                        size = os.fstat(fd).st_size
+                except OSError:
+                    logger.exception("transcript log write failed; %d records lost", len(batch))
+                with self._cond:
+                    self._durable = target
+                    self._batches += 1
+                    self._cond.notify_all()
+                if self._compact_bytes and size > self._compact_bytes:
+                    try:
+                        self.compact()
+                    except OSError:
+                        logger.exception("transcript log compaction failed")
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False)
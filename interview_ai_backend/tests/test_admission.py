@@ -0,0 +1,48 @@
+import asyncio
+
+from services import admission
+from services.admission import AdmissionController, AdmissionMiddleware
+
+
+def _scope(peer, client_id=None):
+    headers = [(b"x-client-id", client_id.encode())] if client_id else []
+    return {"type": "http", "path": "/api/analyze-job", "client": (peer, 50000), "headers": headers}
+
+
+def test_client_header_is_ignored_from_untrusted_peers():
+    middleware = AdmissionMiddleware(None, trusted_proxies=[])
+    assert middleware.client_id(_scope("203.0.113.7", "someone-else")) == "203.0.113.7"
+
+
+def test_trusted_proxy_names_the_client():
+    middleware = AdmissionMiddleware(None, trusted_proxies=["10.0.0.2"])
+    assert middleware.client_id(_scope("10.0.0.2", "tenant-a")) == "tenant-a"
+    assert middleware.client_id(_scope("10.0.0.2")) == "10.0.0.2"
+    assert middleware.client_id(_scope("10.0.0.3", "tenant-a")) == "10.0.0.3"
+
+
+def test_capped_waiter_does_not_block_other_clients():
+    async def scenario():
+        controller = AdmissionController(max_inflight=4, max_per_client=1)
+        async with controller.slot("interview", "busy"):
+            queued = asyncio.ensure_future(controller._acquire("interview", "busy"))
+            await asyncio.sleep(0)  # "busy" now waits on its own per-client limit
+            await asyncio.wait_for(controller._acquire("analysis", "other"), 0.5)
+            queued.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_speculative_tasks_run_in_the_background_class():
+    async def current_class():
+        await asyncio.sleep(0)
+        return admission._request_class.get()
+
+    async def scenario():
+        admission._request_class.set("interview")
+        prefetch = admission.create_task(current_class(), "background")
+        deferred = admission.create_task(current_class())
+        admission.demote(deferred)
+        return await prefetch, await deferred, admission._request_class.get()
+
+    assert asyncio.run(scenario()) == ("background", "background", "interview")
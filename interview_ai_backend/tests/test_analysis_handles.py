@@ -0,0 +1,31 @@
+import asyncio
+
+from services.analysis_handles import AnalysisHandleStore
+from services.session_store import InMemorySessionStore, SQLiteSessionStore
+
+_ANALYSIS = {
+    "skills": ["python"],
+    "responsibilities": ["Ship APIs"],
+    "competencies": [],
+    "values": [],
+    "themes": ["ownership"],
+    "summary": "Backend role",
+}
+
+
+def test_handle_registered_by_one_worker_resolves_in_another(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first = AnalysisHandleStore(shared=SQLiteSessionStore(path))
+    second = AnalysisHandleStore(shared=SQLiteSessionStore(path))
+
+    registered = asyncio.run(first.register(dict(_ANALYSIS)))
+    resolved = asyncio.run(second.get(registered.analysis_id))
+
+    assert resolved is not None
+    assert resolved.analysis == registered.analysis
+    assert resolved.body == registered.body
+
+
+def test_process_local_store_misses_unknown_ids():
+    store = AnalysisHandleStore(shared=InMemorySessionStore())
+    assert asyncio.run(store.get("0" * 64)) is None
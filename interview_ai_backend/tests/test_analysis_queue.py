@@ -0,0 +1,103 @@
+import asyncio
+import sqlite3
+import time
+from collections import Counter
+
+from services.analysis_queue import DONE, AnalysisQueue
+
+
+def _queue(path, processor, owner, **kwargs):
+    queue = AnalysisQueue(
+        str(path), processor, workers=2, poll_interval=0.02, lease_seconds=0.3, owner=owner, **kwargs
+    )
+    queue.open()
+    return queue
+
+
+async def _wait_done(queue, job_ids, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        jobs = [await queue.get(job_id) for job_id in job_ids]
+        if all(job.status == DONE for job in jobs):
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError(jobs)
+
+
+def test_starting_a_second_worker_does_not_requeue_live_jobs(tmp_path):
+    calls = Counter()
+
+    async def slow(description, final):
+        calls[description] += 1
+        await asyncio.sleep(0.6)  # outlives the lease, so only the heartbeat keeps it claimed
+        return {"summary": description}, False
+
+    async def scenario():
+        first = _queue(tmp_path / "q.db", slow, "first")
+        first.start()
+        job_ids = await first.submit_many(["a", "b"])
+        await asyncio.sleep(0.1)
+        second = _queue(tmp_path / "q.db", slow, "second")
+        second.start()
+        try:
+            await _wait_done(first, job_ids)
+        finally:
+            await first.stop()
+            await second.stop()
+            first.close()
+            second.close()
+
+    asyncio.run(scenario())
+    assert calls == {"a": 1, "b": 1}
+
+
+def test_expired_lease_is_requeued_by_another_worker(tmp_path):
+    async def fast(description, final):
+        return {"summary": description}, False
+
+    async def scenario():
+        crashed = _queue(tmp_path / "q.db", fast, "crashed")
+        (job_id,) = await crashed.submit_many(["orphan"])
+        assert crashed._claim()[0] == job_id  # claimed, then the owner dies without a heartbeat
+        crashed.close()
+
+        survivor = _queue(tmp_path / "q.db", fast, "survivor")
+        survivor.start()
+        try:
+            await _wait_done(survivor, [job_id])
+            return await survivor.get(job_id)
+        finally:
+            await survivor.stop()
+            survivor.close()
+
+    job = asyncio.run(scenario())
+    assert job.result == {"summary": "orphan"}
+    assert job.attempts == 2
+
+
+def test_worker_survives_database_errors(tmp_path):
+    async def fast(description, final):
+        return {"summary": description}, False
+
+    async def scenario():
+        queue = _queue(tmp_path / "q.db", fast, "only")
+        real_claim = queue._claim
+        failures = []
+
+        def flaky_claim():
+            if len(failures) < 3:
+                failures.append(1)
+                raise sqlite3.OperationalError("database is locked")
+            return real_claim()
+
+        queue._claim = flaky_claim
+        queue.start()
+        try:
+            (job_id,) = await queue.submit_many(["x"])
+            await _wait_done(queue, [job_id])
+            assert (await queue.stats())["workers"] == 2
+        finally:
+            await queue.stop()
+            queue.close()
+
+    asyncio.run(scenario())
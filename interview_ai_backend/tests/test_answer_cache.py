@@ -0,0 +1,30 @@
+from services.answer_cache import AnswerEvaluationCache, MinHasher, answer_shingles
+
+_ANSWER = (
+    "When our billing migration slipped I owned the cutover plan, set up dual writes, "
+    "ran nightly reconciliation and we shipped two weeks later with zero data loss "
+    "and a fifteen percent drop in support tickets over the following quarter"
+)
+
+
+def test_signature_matches_the_scalar_definition():
+    hasher = MinHasher(8)
+    shingles = answer_shingles(_ANSWER)
+    expected = tuple(
+        min((int(a) * value + int(b)) % 4294967291 for value in shingles)
+        for a, b in zip(hasher._a[:, 0], hasher._b[:, 0])
+    )
+    assert hasher.signature(shingles) == expected
+
+
+def test_near_duplicate_hits_and_different_answer_misses():
+    cache = AnswerEvaluationCache()
+    cache.set("Tell me about a delay", "job", "role", cache.sign(_ANSWER), {"score": 4})
+
+    edited = _ANSWER.replace("two weeks", "2 weeks")
+    hit = cache.get("Tell me about a delay", "job", "role", cache.sign(edited))
+    miss = cache.get("Tell me about a delay", "job", "role", cache.sign("I prefer working alone on small tasks"))
+
+    assert hit is not None and hit[0] == {"score": 4}
+    assert miss is None
+    assert cache.sign("") is None
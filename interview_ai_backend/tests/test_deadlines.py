@@ -0,0 +1,76 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from models.interview_models import EvaluateAnswerRequest
+from models.job_models import JobAnalysisResult
+from routers import interview
+from services import deadlines
+from services.deadlines import Deadline, DeferredResults, request_deadline
+from tools.fake_llm_server import DEFAULT_PAYLOADS
+
+_ANALYSIS = JobAnalysisResult(skills=["kafka"], responsibilities=["Run the pipeline"], themes=["latency"], summary="Data")
+
+
+def test_deadline_reserves_the_margin_and_expires():
+    deadline = Deadline(0.05, margin=0.02)
+    assert 0 < deadline.remaining() <= 0.03
+    time.sleep(0.04)
+    assert deadline.remaining() == 0.0 and deadline.expired
+    assert Deadline(None).remaining() is None and not Deadline(None).expired
+
+
+def test_header_overrides_the_endpoint_budget_up_to_the_cap(monkeypatch):
+    monkeypatch.setenv("DEADLINE_EVALUATE_ANSWER_SECONDS", "0")
+    monkeypatch.setenv("DEADLINE_MAX_SECONDS", "2")
+    assert request_deadline("evaluate_answer").budget is None
+    assert request_deadline("evaluate_answer", "500").budget == 0.5
+    assert request_deadline("evaluate_answer", "60000").budget == 2.0
+    assert request_deadline("evaluate_answer", "soon").budget is None
+
+
+def test_deferred_results_record_failures_and_expire(monkeypatch):
+    async def scenario():
+        results = DeferredResults(ttl_seconds=60)
+
+        async def broken():
+            raise RuntimeError("provider down")
+
+        task = asyncio.ensure_future(broken())
+        result_id = results.track(task, lambda value: value)
+        assert results.get(result_id).status == "pending" and results.pending() == 1
+        await asyncio.wait({task})
+        await asyncio.sleep(0)  # let the done callback run
+        entry = results.get(result_id)
+        monkeypatch.setattr(deadlines, "time", SimpleNamespace(monotonic=lambda: entry.created_at + 61))
+        return entry.status, entry.error, results.get(result_id)
+
+    assert asyncio.run(scenario()) == ("failed", "provider down", None)
+
+
+def test_expired_deadline_returns_provisional_feedback_and_the_full_result_later(monkeypatch):
+    async def slow_evaluation(prompt, prompt_type, **kwargs):
+        await asyncio.sleep(0.3)
+        return dict(DEFAULT_PAYLOADS["star_evaluation"])
+
+    monkeypatch.setattr(interview.llm_client, "request_json", slow_evaluation)
+    session_id = interview.interview_manager.create_session("general", _ANALYSIS)
+    payload = EvaluateAnswerRequest(
+        session_id=session_id, question="Tell me about a backlog you drained.", answer="We drained a Kafka backlog."
+    )
+
+    async def scenario():
+        response = json.loads((await interview.evaluate_answer(payload, x_request_deadline_ms="50")).body)
+        pending = await interview.get_deferred_evaluation(response["evaluation_id"])
+        await asyncio.sleep(0.5)
+        ready = await interview.get_deferred_evaluation(response["evaluation_id"])
+        return response, pending, ready
+
+    response, pending, ready = asyncio.run(scenario())
+
+    assert response["provisional"] is True
+    assert pending.status == "pending"
+    assert ready.status == "ready"
+    assert ready.result.score == DEFAULT_PAYLOADS["star_evaluation"]["score"]
+    assert ready.result.next_question == response["next_question"]
@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+from models.interview_models import EvaluateAnswerRequest
+from models.job_models import JobAnalysisResult
+from routers import interview
+
+_ANALYSIS = JobAnalysisResult(skills=["go"], responsibilities=["Run the API"], themes=["uptime"], summary="SRE")
+
+
+def _events(body):
+    return [
+        (event.split("\n")[0].removeprefix("event: "), json.loads(event.split("data: ", 1)[1]))
+        for event in body.split("\n\n")
+        if event.strip()
+    ]
+
+
+def _collect(payload):
+    async def scenario():
+        response = await interview.evaluate_answer_stream(payload)
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    return _events(asyncio.run(scenario()))
+
+
+def test_stream_failure_after_fields_resets_before_the_fallback(monkeypatch):
+    async def broken_stream(prompt, prompt_type):
+        yield '{"strengths":["Clear"],"score":4,'
+        raise RuntimeError("upstream dropped the stream")
+
+    monkeypatch.setattr(interview.llm_client, "stream_json", broken_stream)
+    session_id = interview.interview_manager.create_session("general", _ANALYSIS)
+    payload = EvaluateAnswerRequest(session_id=session_id, question="Why us?", answer="I like uptime work.")
+
+    kinds = [kind for kind, _ in _collect(payload)]
+
+    assert kinds[-2:] == ["reset", "result"]
+    assert "field" in kinds[: kinds.index("reset")]
+
+
+def test_cache_hit_skips_building_the_prompt(monkeypatch):
+    session_id = interview.interview_manager.create_session("general", _ANALYSIS)
+    session = interview.interview_manager.get_session(session_id)
+    answer = "I kept the API up through a launch."
+    signature = interview.answer_cache.sign(answer)
+    interview.answer_cache.set("Why us?", session.job_key, session.mode, signature, {"score": 4, "strengths": []})
+    built = []
+    monkeypatch.setattr(interview.prompts, "build_star_prompt", lambda **kwargs: built.append(kwargs) or "")
+
+    events = _collect(EvaluateAnswerRequest(session_id=session_id, question="Why us?", answer=answer))
+
+    assert [kind for kind, _ in events] == ["result"]
+    assert built == []
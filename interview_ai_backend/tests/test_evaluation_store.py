@@ -0,0 +1,77 @@
+import fcntl
+import os
+import time
+
+import numpy as np
+
+from services.evaluation_store import COLUMNS, EvaluationStore, job_hash
+
+_JOB_A = "a" * 64
+_JOB_B = "b" * 64
+
+
+def _record(store, job_key, score, count=1):
+    for _ in range(count):
+        store.record(score=score, mode="role", question_id=-1, job_key=job_key, themes=[job_key[:1]])
+
+
+def test_reopening_keeps_rows_another_process_appended(tmp_path):
+    first = EvaluationStore(str(tmp_path), chunk_rows=4)
+    _record(first, _JOB_A, 5, count=3)
+    first.flush()
+
+    second = EvaluationStore(str(tmp_path), chunk_rows=4)
+    assert len(second) == 3
+    _record(first, _JOB_A, 4, count=2)  # the first process keeps appending
+    first.flush()
+    _record(second, _JOB_B, 2, count=1)
+    second.flush()
+
+    third = EvaluationStore(str(tmp_path))
+    assert len(third) == 6
+    result = third.aggregate("theme")
+    assert {group["key"]: group["count"] for group in result["groups"]} == {"a": 5, "b": 1}
+    for store in (first, second, third):
+        store.close()
+
+
+def test_reopen_trims_a_chunk_torn_by_a_crash(tmp_path):
+    store = EvaluationStore(str(tmp_path))
+    _record(store, _JOB_A, 3, count=4)
+    store.close()
+    with (tmp_path / "score.bin").open("ab") as handle:  # crash after one column of the next chunk
+        handle.write(b"\x05\x05")
+
+    reopened = EvaluationStore(str(tmp_path))
+    assert len(reopened) == 4
+    sizes = {(tmp_path / f"{name}.bin").stat().st_size // np.dtype(dtype).itemsize for name, dtype in COLUMNS.items()}
+    assert sizes == {4}
+    assert reopened.aggregate()["groups"][0]["histogram"]["3"] == 4
+
+
+def test_record_leaves_writing_to_the_background_thread(tmp_path):
+    store = EvaluationStore(str(tmp_path), chunk_rows=2, flush_interval=60)
+    _record(store, _JOB_A, 4, count=2)
+    assert store._thread is not None
+    store.close()
+    columns = EvaluationStore(str(tmp_path)).columns()
+    assert columns["job_hash"].tolist() == [job_hash(_JOB_A)] * 2
+
+
+def test_record_never_touches_the_disk(tmp_path):
+    directory = tmp_path / "evaluations"
+    store = EvaluationStore(str(directory), flush_interval=60)
+    _record(store, _JOB_A, 4)
+    assert not directory.exists()  # nothing opened yet: the row only sits in the buffer
+
+    store.open()
+    fd = os.open(directory / ".lock", os.O_RDWR)
+    fcntl.flock(fd, fcntl.LOCK_EX)  # another process is mid-append
+    try:
+        started = time.monotonic()
+        _record(store, _JOB_B, 2)
+        assert time.monotonic() - started < 0.5
+    finally:
+        os.close(fd)
+    store.close()
+    assert len(EvaluationStore(str(directory))) == 2
@@ -0,0 +1,45 @@
+import asyncio
+
+from models.job_models import JobAnalysisResult
+from services.interview_manager import InterviewManager
+from services.session_store import InMemorySessionStore
+
+_ANALYSIS = JobAnalysisResult(skills=["rust"], responsibilities=["Own the compiler"], themes=["rust"], summary="Rust")
+
+
+def test_concurrent_prefetches_do_not_share_an_indexed_question():
+    stored = ["Stored A", "Stored B", "Stored C", "Stored D"]
+
+    async def from_index(job_analysis, avoid):
+        await asyncio.sleep(0)  # retrieval runs in a worker thread
+        return next(question for question in stored if question not in avoid)
+
+    async def scenario():
+        manager = InterviewManager(from_index, prefetch_depth=2, store=InMemorySessionStore())
+        session_id = manager.create_session("role", _ANALYSIS)
+        return [await manager.next_role_question(session_id) for _ in range(3)]
+
+    questions = asyncio.run(scenario())
+    assert len(set(questions)) == 3
+
+
+def test_prefetch_keeps_at_most_depth_generations_outstanding():
+    calls = []
+
+    async def generate(job_analysis, avoid):
+        calls.append(job_analysis)
+        number = len(calls)
+        await asyncio.sleep(0)
+        return f"Question {number}"
+
+    async def scenario():
+        manager = InterviewManager(generate, prefetch_depth=2, store=InMemorySessionStore())
+        session_id = manager.create_session("role", _ANALYSIS)
+        await manager.next_role_question(session_id)
+        await asyncio.sleep(0.01)
+        started_before_answer = len(calls)
+        await manager.next_role_question(session_id)
+        await asyncio.sleep(0.01)
+        return started_before_answer, len(calls)
+
+    assert asyncio.run(scenario()) == (2, 3)
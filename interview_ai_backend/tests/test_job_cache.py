@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from services.job_cache import JobAnalysisCache, description_key
+
+
+def test_coalesced_waiters_survive_leader_cancellation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"summary": "done"}
+
+    async def scenario():
+        cache = JobAnalysisCache()
+        leader = asyncio.ensure_future(cache.get_or_compute("Backend engineer", compute))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(cache.get_or_compute("Backend  engineer", compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        assert leader.cancelled()
+        return results, cache.stats(), await cache.get_or_compute("Backend engineer", compute)
+
+    results, stats, again = asyncio.run(scenario())
+    assert results == [{"summary": "done"}] * 3
+    assert again == {"summary": "done"}
+    assert len(calls) == 1
+    assert stats["misses"] == 1 and stats["coalesced"] == 3
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("LLM response was not valid JSON")
+
+    async def scenario():
+        cache = JobAnalysisCache()
+        outcomes = await asyncio.gather(
+            *(cache.get_or_compute("Data analyst", compute) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+        assert await cache.get(description_key("Data analyst")) is None
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_disk_hit_keeps_original_expiry(tmp_path):
+    path = str(tmp_path / "cache.db")
+    key = description_key("Product manager")
+
+    async def scenario():
+        writer = JobAnalysisCache(ttl_seconds=10, sqlite_path=path)
+        await writer.set(key, {"summary": "pm"})
+        writer._disk._conn.execute("UPDATE job_analysis_cache SET created_at = created_at - 8")
+        writer._disk._conn.commit()
+        writer.close()
+
+        reader = JobAnalysisCache(ttl_seconds=10, sqlite_path=path)
+        assert await reader.get(key) == {"summary": "pm"}
+        expires_at, _ = reader._entries[key]
+        reader.close()
+        return expires_at
+
+    before = time.monotonic()
+    expires_at = asyncio.run(scenario())
+    assert expires_at < before + 3
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from services.job_mapreduce import MapReduceConfig, analyze_in_chunks, chunk_description
+
+
+def _posting(sections):
+    return "\n\n".join(f"SECTION {index}\n" + "Build reliable services. " * 40 for index in range(sections))
+
+
+def test_max_chunks_is_a_hard_cap():
+    text = _posting(40)
+    assert len(chunk_description(text, 200, 0)) > 5
+    chunks = chunk_description(text, 200, 5)
+    assert len(chunks) <= 5
+    assert "".join("".join(chunks).split()) == "".join(text.split())
+
+
+def test_a_failed_chunk_fails_the_whole_analysis():
+    async def analyze(chunk, index, total):
+        if index == 1:
+            raise RuntimeError("LLM unavailable")
+        return {"skills": [f"skill {index}"], "summary": "role"}
+
+    config = MapReduceConfig(chunk_chars=1000, max_chunks=4)
+    with pytest.raises(RuntimeError):
+        asyncio.run(analyze_in_chunks(_posting(8), analyze, config))
+
+    lenient = MapReduceConfig(chunk_chars=1000, max_chunks=4, min_success_ratio=0.5)
+    merged = asyncio.run(analyze_in_chunks(_posting(8), analyze, lenient))
+    assert "skill 1" not in merged["skills"] and "skill 0" in merged["skills"]
+
+
+def test_a_failed_chunk_cancels_the_chunks_still_running():
+    cancelled = []
+
+    async def analyze(chunk, index, total):
+        if index == 0:
+            raise RuntimeError("LLM unavailable")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return {"skills": [f"skill {index}"], "summary": "role"}
+
+    config = MapReduceConfig(chunk_chars=1000, max_chunks=4)
+    with pytest.raises(RuntimeError):
+        asyncio.run(asyncio.wait_for(analyze_in_chunks(_posting(8), analyze, config), 2))
+    assert sorted(cancelled) == [1, 2, 3]
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+
+from services.llm_client import LLMClient, LLMClientConfig
+from tools.fake_llm_server import FakeLLMConfig, FakeLLMServer, LatencyModel
+
+
+class _ScriptedLatency(LatencyModel):
+    """Serves the given latencies to requests in arrival order, then ``fallback``."""
+
+    def __init__(self, latencies, fallback=0.01):
+        super().__init__("fixed", [fallback])
+        self.latencies = list(latencies)
+
+    def sample(self, rng):
+        return self.latencies.pop(0) if self.latencies else self.params[0]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    servers = []
+
+    def _start(latencies):
+        server = FakeLLMServer(FakeLLMConfig(latency=_ScriptedLatency(latencies))).start()
+        servers.append(server)
+        monkeypatch.setenv("OPENAI_API_KEY", "fake")
+        monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+        return server
+
+    yield _start
+    for server in servers:
+        server.stop()
+
+
+async def _timed_call(client, prompt_type, **kwargs):
+    started = time.perf_counter()
+    await client.request_json("Return the JSON", prompt_type=prompt_type, **kwargs)
+    return time.perf_counter() - started
+
+
+def test_hung_attempt_is_retried_within_the_deadline(fake_llm):
+    fake_llm([1.5])
+    client = LLMClient(LLMClientConfig(attempt_timeout=0.3, max_retries=2, backoff_base=0.01))
+    outcomes = []
+    client.add_attempt_hook(lambda attempt: outcomes.append(attempt.outcome))
+
+    async def scenario():
+        await client.open()
+        try:
+            return await _timed_call(client, "role_question", deadline=3.0)
+        finally:
+            await client.aclose()
+
+    elapsed = asyncio.run(scenario())
+    assert outcomes == ["timeout", "ok"]
+    assert elapsed < 1.0
+
+
+def test_hedge_threshold_is_kept_per_prompt_type(fake_llm):
+    fake_llm([0.3] * 5 + [0.01] * 5 + [1.5])
+    client = LLMClient(LLMClientConfig(hedge=True, hedge_min_samples=5, hedge_min_delay=0.05))
+    hedged = []
+    client.add_attempt_hook(lambda attempt: hedged.append(attempt.hedged) if attempt.outcome == "ok" else None)
+
+    async def scenario():
+        await client.open()
+        try:
+            for _ in range(5):
+                await _timed_call(client, "job_analysis")
+            for _ in range(5):
+                await _timed_call(client, "role_question")
+            return await _timed_call(client, "role_question")
+        finally:
+            await client.aclose()
+
+    elapsed = asyncio.run(scenario())
+    # Pooled with the 0.3s job analyses the threshold would be 0.3s; role questions alone hedge much sooner.
+    assert hedged[-1] is True
+    assert elapsed < 0.25
+
+
+def test_early_call_waits_for_the_startup_warm_up(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    client = LLMClient(LLMClientConfig(warmup_connections=2))
+    warmed = []
+
+    async def slow_warm_up(connections):
+        await asyncio.sleep(0.2)
+        warmed.append(connections)
+        return connections
+
+    monkeypatch.setattr(client, "warm_up", slow_warm_up)
+
+    async def scenario():
+        opening = asyncio.create_task(client.open())
+        await asyncio.sleep(0)
+        try:
+            sdk_client = await client._ensure_client()
+            return sdk_client, list(warmed)
+        finally:
+            await opening
+            await client.aclose()
+
+    sdk_client, warmed_before_call = asyncio.run(scenario())
+    assert sdk_client is not None
+    assert warmed_before_call == [2]
@@ -0,0 +1,51 @@
+from models.job_models import JobAnalysisResult
+from services import prompts
+
+_ANALYSIS = JobAnalysisResult(
+    skills=[f"Skill number {index} with distributed systems depth" for index in range(12)],
+    responsibilities=[f"Own reliability area {index} for payments, search and onboarding" for index in range(10)],
+    competencies=[f"Competency {index}" for index in range(8)],
+    values=[f"Value {index}" for index in range(6)],
+    themes=["Reliability", "Payments", "Mentoring", "Cost control", "Hiring"],
+    summary="Staff engineer for the payments platform.",
+)
+
+
+def _star(question, answer, budget=None):
+    return prompts.build_star_prompt(
+        question=question,
+        answer=answer,
+        job_analysis=_ANALYSIS,
+        mode="role",
+        include_next_question=True,
+        budget=budget,
+    )
+
+
+def test_prompts_for_the_same_job_share_a_byte_identical_prefix():
+    prefix = prompts.job_prefix(_ANALYSIS)
+    built = [
+        _star("Tell me about mentoring.", "I mentored two engineers.", budget=0),
+        _star("How did you cut payment costs?", "We moved to batch settlement.", budget=0),
+        prompts.build_role_question_prompt(_ANALYSIS, budget=0),
+        prompts.build_role_question_prompt(_ANALYSIS.model_copy(deep=True), budget=0),  # equal content, new object
+    ]
+
+    for prompt in built:
+        assert prompt.encode("utf-8").startswith(prefix.encode("utf-8"))
+    assert prefix.startswith(prompts._COACH_PREAMBLE)
+    assert "Job analysis:" in prefix and "Question:" not in prefix
+
+
+def test_over_budget_prompts_keep_one_prefix_per_job():
+    prefix = prompts.trimmed_job_prefix(_ANALYSIS)
+    assert prefix != prompts.job_prefix(_ANALYSIS)
+
+    built = [
+        _star("Tell me about mentoring.", "I mentored two engineers.", budget=150),
+        _star("How did you cut payment costs?", "We moved to batch settlement.", budget=150),
+        prompts.build_role_question_prompt(_ANALYSIS, budget=150),
+    ]
+
+    for prompt in built:
+        assert prompt.startswith(prefix)
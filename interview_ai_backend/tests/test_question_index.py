@@ -0,0 +1,37 @@
+import json
+
+from models.job_models import JobAnalysisResult
+from services import question_index
+from services.question_index import QuestionIndex
+
+_SKILLS = ["kubernetes", "payroll", "oncology", "typescript", "forklift", "tax law", "pastry", "welding"]
+
+
+def _analysis(index):
+    skill = _SKILLS[index]
+    return JobAnalysisResult(skills=[skill], responsibilities=[f"Own {skill} work"], themes=[skill])
+
+
+def test_workers_sharing_files_keep_rows_and_questions_aligned(tmp_path, monkeypatch):
+    monkeypatch.setattr(question_index, "_INITIAL_CAPACITY", 2)  # force growth while both are writing
+    path = str(tmp_path / "questions")
+    workers = [QuestionIndex(path=path, threshold=0.5), QuestionIndex(path=path, threshold=0.5)]
+    for worker in workers:
+        len(worker)  # both map the matrix before anyone writes
+
+    for index in range(len(_SKILLS)):
+        assert workers[index % 2].add(_analysis(index), f"Question about {_SKILLS[index]}")
+
+    with open(tmp_path / "questions.jsonl", encoding="utf-8") as handle:
+        assert [json.loads(line)["question"] for line in handle] == [f"Question about {skill}" for skill in _SKILLS]
+    for worker in [*workers, QuestionIndex(path=path, threshold=0.5)]:
+        for index, skill in enumerate(_SKILLS):
+            assert worker.best_match(_analysis(index)) == f"Question about {skill}"
+
+
+def test_duplicate_added_by_another_worker_is_skipped(tmp_path):
+    path = str(tmp_path / "questions")
+    first, second = QuestionIndex(path=path), QuestionIndex(path=path)
+    assert first.add(_analysis(0), "Same question")
+    assert not second.add(_analysis(1), "Same question")
+    assert len(second) == 1
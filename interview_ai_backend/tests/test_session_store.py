@@ -0,0 +1,104 @@
+import time
+import types
+
+import pytest
+
+from models.job_models import JobAnalysisResult
+from services import interning, session_store
+from services.session_store import (
+    InMemorySessionStore,
+    InterviewSessionState,
+    RedisSessionStore,
+    SQLiteSessionStore,
+    decode_session,
+    encode_session,
+)
+from tools.fake_redis import FakeRedisServer
+
+
+def _analysis(skill):
+    return JobAnalysisResult(skills=[skill], responsibilities=[f"Own {skill}"], themes=[skill], summary=skill)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(session_store, "time", types.SimpleNamespace(time=lambda: now[0], monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedisServer().start_in_thread()
+    yield server
+    server.stop_thread()
+
+
+def _expires_in(server, session_id):
+    _, expires_at = server._data[f"interview:session:{session_id}".encode()]
+    return expires_at - time.monotonic()
+
+
+def test_encoding_round_trips_bank_and_generated_questions():
+    state = InterviewSessionState(
+        "s1", "role", _analysis("python"), pointer=3, asked_questions=[interning.QUESTION_BANK[0], "Why " + "x" * 600]
+    )
+
+    data = encode_session(state)
+
+    assert data[:1] == b"z"  # long enough to be deflated
+    assert decode_session(data) == state
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_absolute_ttl_and_idle_expiry(backend, tmp_path, clock):
+    if backend == "memory":
+        store = InMemorySessionStore(ttl_seconds=100, idle_seconds=30)
+    else:
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds=100, idle_seconds=30)
+    store.put(InterviewSessionState("busy", "general", _analysis("sql")))
+    store.put(InterviewSessionState("idle", "general", _analysis("sql")))
+
+    for _ in range(4):  # "busy" stays active, "idle" is never read again
+        clock[0] += 25
+        assert store.get("busy") is not None
+    assert store.get("idle") is None
+    clock[0] += 25  # 125 s after creation: past the absolute TTL despite the activity
+    assert store.get("busy") is None
+
+
+def test_redis_store_caps_idle_expiry_at_the_absolute_ttl(redis_server, clock):
+    store = RedisSessionStore(redis_server.url, ttl_seconds=100, idle_seconds=60)
+    other = RedisSessionStore(redis_server.url, ttl_seconds=100, idle_seconds=60)  # another worker
+    state = InterviewSessionState("s1", "role", _analysis("go"), asked_questions=["Why Go?"])
+    store.put(state)
+    assert 59 < _expires_in(redis_server, "s1") <= 60
+    assert other.get("s1") == state
+    assert other.count() == 1
+
+    clock[0] += 90
+    restored = other.get("s1")
+    restored.add_question("Tell me more.")
+    other.put(restored)
+    assert _expires_in(redis_server, "s1") <= 10  # only 10 s of lifetime left
+    assert store.get("s1").asked_questions == ["Why Go?", "Tell me more."]
+
+    clock[0] += 11
+    assert store.get("s1") is None
+    assert not other.contains("s1")
+    store.close()
+    other.close()
+
+
+def test_restored_state_keeps_its_entries_while_other_sessions_churn(tmp_path, monkeypatch):
+    monkeypatch.setattr(interning, "questions", interning.QuestionRegistry(interning.QUESTION_BANK, idle_capacity=1))
+    monkeypatch.setattr(interning, "job_analyses", interning.JobAnalysisRegistry(idle_capacity=1))
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    store.put(InterviewSessionState("s1", "role", _analysis("welding"), asked_questions=["Generated one"]))
+
+    restored = store.get("s1")
+    for index in range(5):  # evicts every idle entry and would hand out the freed IDs again
+        InterviewSessionState(f"other-{index}", "role", _analysis(f"skill {index}"), asked_questions=[f"Q{index}"])
+
+    assert restored.asked_questions == ["Generated one"]
+    assert restored.job_analysis.skills == ["welding"]
@@ -0,0 +1,54 @@
+import json
+
+from services.transcript_log import TranscriptLog
+
+_ANALYSIS = {"skills": ["sql"], "responsibilities": [], "competencies": [], "values": [], "themes": [], "summary": ""}
+
+
+def _records(path):
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_compaction_archives_ended_sessions_and_keeps_live_answers(tmp_path):
+    path = str(tmp_path / "transcripts.jsonl")
+    log = TranscriptLog(path, fsync=False)
+    log.session_started("live", "role", "job-1", _ANALYSIS, 1)
+    log.question_asked("live", "Tell me about a launch.", 2)
+    log.answer_graded("live", "Tell me about a launch.", "A long raw answer", {"score": 4}, source="llm")
+    log.session_started("ended", "general", "job-1", _ANALYSIS, 1)
+    log.session_ended("ended")
+    log.close()
+
+    sessions = TranscriptLog(path).compact()
+
+    assert list(sessions) == ["live"]
+    records = _records(path)
+    assert [record["type"] for record in records] == ["job", "start", "question", "answer"]
+    assert records[-1]["answer"] == "A long raw answer"
+    assert records[-1]["evaluation"] == {"score": 4}
+    archived = _records(path + ".archive")
+    assert [(record["type"], record["session_id"]) for record in archived] == [("start", "ended"), ("end", "ended")]
+    (snapshot,) = TranscriptLog(path).replay_sessions().values()
+    assert snapshot.questions == ["Tell me about a launch."]
+    assert snapshot.pointer == 2
+    assert snapshot.job_analysis == _ANALYSIS
+
+
+def test_writer_follows_the_file_after_a_compaction(tmp_path):
+    path = str(tmp_path / "transcripts.jsonl")
+    writer = TranscriptLog(path, fsync=False)
+    writer.session_started("s1", "role", "job-1", _ANALYSIS, 1)
+    assert writer.flush(5)
+
+    TranscriptLog(path).compact()  # another process swaps the file
+    writer.question_asked("s1", "Why this team?", 2)
+    writer.close()
+
+    (snapshot,) = TranscriptLog(path).replay_sessions().values()
+    assert snapshot.questions == ["Why this team?"]
+
+
+def test_disabled_without_a_path(monkeypatch):
+    monkeypatch.delenv("TRANSCRIPT_LOG_PATH", raising=False)
+    assert not TranscriptLog.from_env().enabled
@@ -0,0 +1 @@
+"""Local stand-ins and tooling for development and benchmarking."""
@@ -0,0 +1,298 @@
+"""OpenAI-compatible stand-in for exercising LLMClient without spending tokens.
+
+Run with ``python -m tools.fake_llm_server --port 8100 --latency lognormal:0.8,0.5``
+and start the backend with ``OPENAI_API_KEY=fake LLM_BASE_URL=http://127.0.0.1:8100/v1``.
+
+Latency specs: ``fixed:SECONDS``, ``uniform:LOW,HIGH`` or
+``lognormal:MEDIAN,SIGMA``; ``--prompt-latency`` adds seconds per 1k prompt
+tokens to model prefill cost on long prompts; ``--max-concurrency`` queues
+requests beyond that many in flight, like a provider at capacity. Responses
+are picked from the prompt (job analysis, role question or STAR evaluation)
+and can be overridden with a JSON file mapping those prompt kinds to payloads.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_PAYLOADS: Dict[str, Dict[str, Any]] = {
+    "job_analysis": {
+        "skills": ["Python", "FastAPI", "Distributed systems", "SQL"],
+        "responsibilities": ["Build backend APIs", "Own service reliability", "Mentor engineers"],
+        "competencies": ["Leadership", "Communication", "Ownership"],
+        "values": ["Customer obsession", "Bias for action"],
+        "themes": ["Scalability", "Cross-functional partnership", "Quality"],
+        "summary": "Lead backend development for a fast-growing SaaS platform.",
+    },
+    "role_question": {
+        "question": "Tell me about a time you scaled a service through a sudden traffic increase.",
+    },
+    "star_evaluation": {
+        "star": {
+            "situation": "Candidate describes a production outage during a launch.",
+            "task": "They owned restoring service within the SLA.",
+            "action": "Added caching, shed load and coordinated the incident response.",
+            "result": "Latency returned to normal within an hour and the launch succeeded.",
+        },
+        "strengths": ["Clear ownership", "Concrete technical actions"],
+        "weaknesses": ["Result lacks quantified business impact"],
+        "fit_summary": "Strong alignment with the scalability theme.",
+        "score": 4,
+        "improvements": ["Quantify the impact", "Mention follow-up prevention work"],
+        "next_question": "How did you prevent a similar incident from happening again?",
+    },
+}
+
+_PREFIX_BLOCK_CHARS = 512  # granularity of the simulated prompt-prefix cache
+
+
+@dataclass
+class LatencyModel:
+    """Samples artificial response latency in seconds."""
+
+    kind: str = "fixed"
+    params: List[float] = field(default_factory=lambda: [0.0])
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, raw = spec.partition(":")
+        params = [float(part) for part in raw.split(",") if part] if raw else []
+        if kind == "fixed" and len(params) == 1:
+            return cls(kind, params)
+        if kind == "uniform" and len(params) == 2:
+            return cls(kind, params)
+        if kind == "lognormal" and len(params) == 2:
+            return cls(kind, params)
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(max(median, 1e-6)), sigma)
+        return self.params[0]
+
+
+@dataclass
+class FakeLLMConfig:
+    """Behaviour of the fake server."""
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    prompt_latency_per_1k_tokens: float = 0.0
+    max_concurrency: int = 0  # 0 = unlimited; extra requests queue FIFO before their latency starts
+    error_rate: float = 0.0
+    error_statuses: List[int] = field(default_factory=lambda: [429, 500, 503])
+    stream_chunk_chars: int = 16
+    seed: Optional[int] = None
+    payloads: Dict[str, Dict[str, Any]] = field(default_factory=lambda: dict(DEFAULT_PAYLOADS))
+
+
+def classify_prompt(prompt: str) -> str:
+    """Guess which backend prompt builder produced ``prompt``."""
+
+    if "STAR method" in prompt:
+        return "star_evaluation"
+    if "interview question" in prompt:
+        return "role_question"
+    return "job_analysis"
+
+
+class _PrefixCache:
+    """Approximates provider prompt caching by remembering prefix blocks."""
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._capacity = capacity
+
+    def cached_chars(self, text: str) -> int:
+        cached = 0
+        digest = hashlib.blake2b(digest_size=16)
+        for end in range(_PREFIX_BLOCK_CHARS, len(text) + 1, _PREFIX_BLOCK_CHARS):
+            digest.update(text[end - _PREFIX_BLOCK_CHARS : end].encode("utf-8"))
+            key = digest.copy().hexdigest()
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                cached = end
+            else:
+                self._seen[key] = None
+                if len(self._seen) > self._capacity:
+                    self._seen.popitem(last=False)
+        return cached
+
+
+def create_app(config: Optional[FakeLLMConfig] = None) -> FastAPI:
+    """Build the fake ``/v1/chat/completions`` application."""
+
+    config = config or FakeLLMConfig()
+    rng = random.Random(config.seed)
+    prefix_cache = _PrefixCache()
+    app = FastAPI(title="Fake LLM server")
+    app.state.requests = 0
+    capacity: Dict[str, asyncio.Semaphore] = {}
+
+    def _slot() -> Any:
+        if config.max_concurrency <= 0:
+            return contextlib.nullcontext()
+        if "semaphore" not in capacity:
+            capacity["semaphore"] = asyncio.Semaphore(config.max_concurrency)
+        return capacity["semaphore"]
+
+    @app.get("/v1/models")
+    async def list_models():
+        app.state.model_listings = getattr(app.state, "model_listings", 0) + 1
+        return {"object": "list", "data": [{"id": "fake-model", "object": "model", "owned_by": "fake"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        messages = body.get("messages", [])
+        text = "".join(str(message.get("content", "")) for message in messages)
+        user_prompt = str(messages[-1].get("content", "")) if messages else ""
+
+        if config.error_rate and rng.random() < config.error_rate:
+            status = rng.choice(config.error_statuses)
+            await asyncio.sleep(config.latency.sample(rng) / 4)
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "fake_error", "code": status}},
+                status_code=status,
+            )
+
+        kind = classify_prompt(user_prompt)
+        content = json.dumps(config.payloads.get(kind, {}), separators=(",", ":"))
+        usage = {
+            "prompt_tokens": max(1, len(text) // 4),
+            "completion_tokens": max(1, len(content) // 4),
+            "total_tokens": max(1, len(text) // 4) + max(1, len(content) // 4),
+            "prompt_tokens_details": {"cached_tokens": prefix_cache.cached_chars(text) // 4},
+        }
+        model = body.get("model", "fake-model")
+        latency = config.latency.sample(rng) + usage["prompt_tokens"] / 1000 * config.prompt_latency_per_1k_tokens
+
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+            async def _held_stream() -> AsyncIterator[str]:
+                async with _slot():
+                    async for event in _stream(
+                        content, model, latency, usage if include_usage else None, config.stream_chunk_chars
+                    ):
+                        yield event
+
+            return StreamingResponse(_held_stream(), media_type="text/event-stream")
+
+        async with _slot():
+            await asyncio.sleep(latency)
+        return {
+            "id": f"chatcmpl-fake-{app.state.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": usage,
+        }
+
+    return app
+
+
+async def _stream(
+    content: str, model: str, latency: float, usage: Optional[Dict[str, Any]], chunk_chars: int
+) -> AsyncIterator[str]:
+    chunks = [content[i : i + chunk_chars] for i in range(0, len(content), chunk_chars)] or [""]
+    # Spend roughly a quarter of the latency before the first token, the rest while streaming.
+    await asyncio.sleep(latency / 4)
+    per_chunk = (latency * 3 / 4) / len(chunks)
+    base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+    for index, piece in enumerate(chunks):
+        delta = {"content": piece}
+        if index == 0:
+            delta["role"] = "assistant"
+        event = dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+        yield f"data: {json.dumps(event)}\n\n"
+        await asyncio.sleep(per_chunk)
+    yield f"data: {json.dumps(dict(base, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))}\n\n"
+    if usage is not None:
+        yield f"data: {json.dumps(dict(base, choices=[], usage=usage))}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+class FakeLLMServer:
+    """Run the fake server with uvicorn on a background thread."""
+
+    def __init__(self, config: Optional[FakeLLMConfig] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.app = create_app(config)
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, host=host, port=port, log_level="warning", lifespan="off")
+        )
+        self._thread: Optional[threading.Thread] = None
+        self.host = host
+        self.port = port
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._server.run, name="fake-llm", daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible fake LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="fixed:0.5", help="fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--prompt-latency", type=float, default=0.0, help="Extra seconds per 1k prompt tokens")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Queue requests beyond this many in flight")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payloads", help="JSON file mapping prompt kinds to response payloads")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    payloads = dict(DEFAULT_PAYLOADS)
+    if args.payloads:
+        with open(args.payloads, encoding="utf-8") as handle:
+            payloads.update(json.load(handle))
+    config = FakeLLMConfig(
+        latency=LatencyModel.parse(args.latency),
+        prompt_latency_per_1k_tokens=args.prompt_latency,
+        max_concurrency=args.max_concurrency,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        payloads=payloads,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Tiny in-process Redis-protocol server for exercising RedisSessionStore locally.
+
+Run with ``python -m tools.fake_redis --port 6390`` and point the backend at it
+via ``SESSION_STORE=redis SESSION_REDIS_URL=redis://127.0.0.1:6390/0``.
+Only the commands used by the session store are implemented.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import fnmatch
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class FakeRedisServer:
+    """RESP2 server keeping keys in a dict with optional expiry."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+    def start_in_thread(self) -> "FakeRedisServer":
+        """Serve from a background event loop so blocking clients can connect."""
+
+        ready = threading.Event()
+
+        def _run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name="fake-redis", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop_thread(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                command = await _read_command(reader)
+                if command is None:
+                    break
+                writer.write(self._dispatch(command))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    def _dispatch(self, command: List[bytes]) -> bytes:
+        name = command[0].upper().decode()
+        args = command[1:]
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        if handler is None:
+            return _error(f"ERR unknown command '{name}'")
+        try:
+            return handler(*args)
+        except (TypeError, ValueError) as exc:
+            return _error(f"ERR {exc}")
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def _cmd_ping(self, *args: bytes) -> bytes:
+        return _bulk(args[0]) if args else b"+PONG\r\n"
+
+    def _cmd_auth(self, *args: bytes) -> bytes:
+        return b"+OK\r\n"
+
+    def _cmd_select(self, db: bytes) -> bytes:
+        return b"+OK\r\n"
+
+    def _cmd_get(self, key: bytes) -> bytes:
+        return _bulk(self._live(key))
+
+    def _cmd_set(self, key: bytes, value: bytes, *options: bytes) -> bytes:
+        expires_at = None
+        opts = [opt.upper() for opt in options]
+        if b"EX" in opts:
+            expires_at = time.monotonic() + float(options[opts.index(b"EX") + 1])
+        elif b"PX" in opts:
+            expires_at = time.monotonic() + float(options[opts.index(b"PX") + 1]) / 1000
+        self._data[key] = (value, expires_at)
+        return b"+OK\r\n"
+
+    def _cmd_del(self, *keys: bytes) -> bytes:
+        removed = 0
+        for key in keys:
+            if self._live(key) is not None:
+                del self._data[key]
+                removed += 1
+        return _integer(removed)
+
+    def _cmd_exists(self, *keys: bytes) -> bytes:
+        return _integer(sum(1 for key in keys if self._live(key) is not None))
+
+    def _cmd_expire(self, key: bytes, seconds: bytes) -> bytes:
+        value = self._live(key)
+        if value is None:
+            return _integer(0)
+        self._data[key] = (value, time.monotonic() + float(seconds))
+        return _integer(1)
+
+    def _cmd_dbsize(self) -> bytes:
+        return _integer(sum(1 for key in list(self._data) if self._live(key) is not None))
+
+    def _cmd_flushdb(self) -> bytes:
+        self._data.clear()
+        return b"+OK\r\n"
+
+    def _cmd_scan(self, cursor: bytes, *options: bytes) -> bytes:
+        opts = [opt.upper() for opt in options]
+        pattern = options[opts.index(b"MATCH") + 1].decode() if b"MATCH" in opts else "*"
+        keys = [
+            key for key in list(self._data)
+            if self._live(key) is not None and fnmatch.fnmatchcase(key.decode(), pattern)
+        ]
+        body = b"".join(_bulk(key) for key in keys)
+        return b"*2\r\n" + _bulk(b"0") + b"*%d\r\n" % len(keys) + body
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.strip().split()
+    count = int(line[1:-2])
+    parts: List[bytes] = []
+    for _ in range(count):
+        header = await reader.readline()
+        length = int(header[1:-2])
+        data = await reader.readexactly(length + 2)
+        parts.append(data[:-2])
+    return parts
+
+
+def _bulk(value: Optional[Any]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _integer(value: int) -> bytes:
+    return b":%d\r\n" % value
+
+
+def _error(message: str) -> bytes:
+    return f"-{message}\r\n".encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    async def _serve() -> None:
+        server = FakeRedisServer(args.host, args.port)
+        await server.start()
+        print(f"Fake Redis listening on {server.url}")
+        await asyncio.Event().wait()
+
+    asyncio.run(_serve())
+
+
+if __name__ == "__main__":
+    main()